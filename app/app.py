@@ -1,4 +1,6 @@
+import os
 from flask import Flask
+from sqlalchemy.pool import QueuePool
 import logging.config
 from config import logger_config
 from database.db import DATABASE_NAME
@@ -6,15 +8,36 @@ from database.db import DATABASE_NAME
 
 app = Flask(__name__)
 
+#Ключ подписи токенов кук задается переменной окружения SECRET_KEY. Без
+#ключа приложение не запускается: куки нельзя подписать
+app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
+if not app.config['SECRET_KEY']:
+    raise RuntimeError("Не задана переменная окружения SECRET_KEY")
+
 
 #SQLAlchemy
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///./database/{DATABASE_NAME}'
+#Адрес БД можно задать переменной окружения DATABASE_URI (тесты)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URI', f'sqlite:///./database/{DATABASE_NAME}')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'poolclass': QueuePool,
+    'pool_size': 5,
+    'max_overflow': 10,
+    'connect_args': {'check_same_thread': False}
+}
 
 #Logging
 logging.config.dictConfig(logger_config)
 app.logger = logging.getLogger('app_logger')
 
 
+#Authentication: once per request, the result is kept in flask.g
+from controller.service_layer.authentication_info import authenticates_request
+app.before_request(authenticates_request)
+
 #Load Routes
 from views import *
+
+#Load CLI commands
+import commands
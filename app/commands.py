@@ -0,0 +1,29 @@
+import click
+from pathlib import Path
+from app import app
+from database.models.database import db
+from controller.service_layer.importing import IMPORTERS, ErrorImport
+
+
+FORMATS_IMPORT = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+
+@app.cli.command('import')
+@click.argument('table', type=click.Choice(list(IMPORTERS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def imports(table: str, path: str) -> None:
+    """Импортирует CSV или NDJSON файл в таблицу одной транзакцией.
+    Формат определяется по расширению файла."""
+    format = FORMATS_IMPORT.get(Path(path).suffix.lower())
+    if format is None:
+        raise click.UsageError("Ожидается файл .csv, .ndjson или .jsonl")
+    text = Path(path).read_text(encoding='utf-8-sig')
+    try:
+        result = IMPORTERS[table]().imports(text, format)
+        db.session.commit()
+    except ErrorImport as e:
+        db.session.rollback()
+        raise click.ClickException(e.source)
+    click.echo(
+        f"{result.table}: {result.rows} строк за {result.seconds} с "
+        f"({result.rows_per_second} строк/с)")
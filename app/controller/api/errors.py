@@ -14,7 +14,10 @@ class Errors(Enum):
 	NO_AUTHENTICATION = "Сессия не установлена", 401
 	NOT_FOUND_PATH = "Неопознанный путь", 400
 	FILTER_ERROR = "Ошибка фильтрации", 400
+	FIELDS_ERROR = "Ошибка выбора полей", 400
+	IMPORT_ERROR = "Ошибка импорта", 400
 	BAD_REQUEST = "Некорректный запрос", 400
+	INTERNAL_ERROR = "Внутренняя ошибка сервера", 500
 
 #Пример ошибки:
 #{
@@ -2,6 +2,10 @@ from flask import request
 from utilities.const import prefix_api
 
 
+def get_href_api() -> str:
+	"""Получает корень href API: 'http://web/api/1.0'."""
+	return request.url_root + prefix_api
+
 def make_href(path: str) -> str:
 	"""Создает href."""
-	return request.url_root + prefix_api + path
+	return get_href_api() + path
@@ -4,8 +4,10 @@ from .handler import HandlerPostRequest, HandlerResult, HandlerError
 from controller.api.errors import Errors
 from database import db_auth
 from utilities.validations import ValidationPassword
-from database.models.user import User
 from controller.service_layer.cookies import CreatorCookieAuth
+from controller.service_layer.authentication import (
+revokes_verified_cookies_after_commit)
+from database.models.database import db
 
 
 def _get_hash_password(password: str) -> str:
@@ -24,27 +26,28 @@ class HandlerRequestСhangePassword(HandlerPostRequest):
     _user_id: int
     _model_data: ModelСhangePassword
     _cookie_auth: str | None
+    _generation: int
 
     def __init__(self, user_id, data_from_request):
         super().__init__(data_from_request, model=ModelСhangePassword)
         self._user_id = user_id
-        self._model_data = self._get_model_data_post_request()
         self._cookie_auth = None
 
     def handle(self) -> HandlerResult:
         """Обрабатывает запрос на изменение пароля."""
         try:
             self._check_user_id()
+            self._model_data = self._get_model_data_post_request()
             self._check_cur_password()
             self._check_new_password()
         except HandlerError:
             return self._handler_result
         hash_new_password = _get_hash_password(self._model_data.new_password)
         self._change_password_in_db(hash_new_password)
-        self._set_cookie_auth(hash_new_password)
+        self._set_cookie_auth()
         self._handler_result.document = {"message": "Пароль успешно изменен"}
         self._handler_result.status_code = 201
-        return self._result
+        return self._handler_result
 
     def _check_user_id(self) -> None:
         """Проверяет аутентификацию пользователя.
@@ -79,16 +82,19 @@ class HandlerRequestСhangePassword(HandlerPostRequest):
             raise HandlerError
 
     def _change_password_in_db(self, hash_new_password: str) -> None:
-        """Изменяет пароль в базе данных."""
+        """Изменяет пароль в базе данных. Счетчик смены пароля
+        увеличивается: выданные ранее куки перестают проходить проверку."""
         db_auth.remove_user_authentication(self._user_id)
         db_auth.add_user_authentication(self._user_id, hash_new_password)
+        self._generation = db_auth.increments_password_generation(self._user_id)
+        revokes_verified_cookies_after_commit(
+            db.session, self._user_id, self._generation)
 
-    def _set_cookie_auth(self, hash_new_password: str) -> None:
-        """Устанавливает куки авторизации."""
-        user = User.query.get(self._user_id)
+    def _set_cookie_auth(self) -> None:
+        """Устанавливает куки авторизации с новым счетчиком смены пароля."""
         self._cookie_auth = CreatorCookieAuth().creates(
-            email=user.email,
-            hashed_password=hash_new_password
+            user_id=self._user_id,
+            generation=self._generation
         )
 
     def get_cookie_auth(self) -> str | None:
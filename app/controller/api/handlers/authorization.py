@@ -49,7 +49,7 @@ class EmailAndPasswordHandler(ResponseHandler):
 		user_id = authentication.authenticates_user()
 		if user_id is not None:
 			self._response = common.make_json_response(
-				response={"message": "Сессия успешно установлена"},
+				document={"message": "Сессия успешно установлена"},
 				status_code=201
 			)
 			common.add_cookies_to_response(
@@ -82,7 +82,7 @@ class CookieSessionHandler(ResponseHandler):
 		if user_id is None:
 			return False
 		self._response = common.make_json_response(
-			response={"message": "Сессия успешно установлена"},
+			document={"message": "Сессия успешно установлена"},
 			status_code=201
 		)
 		return True
@@ -101,7 +101,7 @@ class CookieAuthHandler(ResponseHandler):
 		if user_id is None:
 			return False
 		self._response = common.make_json_response(
-			response={"message": "Сессия успешно установлена"},
+			document={"message": "Сессия успешно установлена"},
 			status_code=201
 		)
 		common.add_cookies_to_response(
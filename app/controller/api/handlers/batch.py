@@ -0,0 +1,114 @@
+from typing import TypedDict, Any, Literal
+from urllib.parse import urlsplit
+import logging
+from pydantic import BaseModel, conlist, constr
+from flask import request
+from werkzeug.exceptions import HTTPException
+from .handler import HandlerPostRequest, HandlerResult, HandlerError
+from controller.api.errors import Errors
+from controller import common
+from database.models.database import db
+
+
+#Наибольшее число подзапросов в пакете
+BATCH_MAX = 50
+
+
+class ModelSubRequest(BaseModel):
+    method: Literal['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+    path: constr(regex=r'^/')
+    body: Any = None
+
+class ModelBatch(BaseModel):
+    requests: conlist(ModelSubRequest, min_items=1, max_items=BATCH_MAX)
+
+
+class DocumentSubResponse(TypedDict):
+    method: str
+    path: str
+    status: int
+    body: Any
+
+class DocumentBatch(TypedDict):
+    responses: list[DocumentSubResponse]
+
+
+class HandlerRequestBatch(HandlerPostRequest):
+    """Обработчик пакетного запроса. Подзапросы выполняются по порядку
+    существующими обработчиками в одном процессе: пользователь
+    аутентифицируется один раз, чтения идут в одной сессии БД. Хуки
+    before_request и after_request для подзапросов не вызываются:
+    аутентификация берется из g пакетного запроса, а изменяющий подзапрос
+    фиксируется или откатывается здесь сразу, как отдельный запрос.
+    Исключение подзапроса откатывает только его и дает ответ 500."""
+
+    def __init__(self, data_from_request):
+        super().__init__(data_from_request, model=ModelBatch)
+
+    def handle(self) -> HandlerResult:
+        """Обрабатывает пакетный запрос."""
+        if not self._check_authentication_user():
+            return self._handler_result
+        try:
+            model_data = self._get_model_data_post_request()
+        except HandlerError:
+            return self._handler_result
+        self._handler_result.document = DocumentBatch(
+            responses=[self._dispatches(sub) for sub in model_data.requests])
+        self._handler_result.status_code = 200
+        return self._handler_result
+
+    def _dispatches(self, sub: ModelSubRequest) -> DocumentSubResponse:
+        """Выполняет подзапрос."""
+        if urlsplit(sub.path).path.rstrip("/") == request.path.rstrip("/"):
+            return self._creates_error(sub, Errors.BAD_REQUEST)
+        try:
+            response = common.dispatches_subrequest(
+                sub.method, sub.path, sub.body)
+        except HTTPException as e:
+            db.session.rollback()
+            if e.code in (404, 405):
+                return self._creates_error(sub, Errors.NOT_FOUND_PATH)
+            return DocumentSubResponse(
+                method=sub.method,
+                path=sub.path,
+                status=e.code,
+                body=getattr(e, 'data', None) or {"message": e.description}
+            )
+        except Exception:
+            db.session.rollback()
+            logging.getLogger('app_logger').exception(
+                f"BATCH {sub.method} {sub.path}")
+            return self._creates_error(sub, Errors.INTERNAL_ERROR)
+        if sub.method != 'GET':
+            if response.status_code < 400:
+                db.session.commit()
+            else:
+                db.session.rollback()
+        return DocumentSubResponse(
+            method=sub.method,
+            path=sub.path,
+            status=response.status_code,
+            body=self._get_body(response)
+        )
+
+    def _get_body(self, response) -> Any:
+        """Получает тело ответа подзапроса. Не JSON ответ не передается."""
+        if response.mimetype != 'application/json' or response.is_streamed:
+            response.close()
+            return None
+        data = response.get_data()
+        return common.loads_json(data) if data else None
+
+    def _creates_error(
+        self,
+        sub: ModelSubRequest,
+        error: Errors) -> DocumentSubResponse:
+        """Создает ответ подзапроса с ошибкой."""
+        message, status_code = error.value
+        return DocumentSubResponse(
+            method=sub.method,
+            path=sub.path,
+            status=status_code,
+            body={"source": sub.path, "type": error.name, "message": message}
+        )
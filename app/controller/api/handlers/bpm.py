@@ -1,7 +1,17 @@
 from typing import TypedDict
-from .handler import HandlerRequestGetAllResourcesUsingFilter
+from dataclasses import dataclass
+from sqlalchemy import select
+from sqlalchemy.orm import Query
+from .handler import (HandlerRequestGetAllResourcesUsingFilter, FieldDocument,
+HandlerRequestGetResources, HandlerError, ParamsQuery, RowSerializer,
+FieldExpand)
 from controller.api import for_api
-from database.models.bpm import Bpm
+from controller.api.errors import Errors
+from database.models.bpm import Bpm, BpmClosure
+from database.models.company import Company
+from database.models.user import User
+from .company import SERIALIZER_COMPANY
+from .user import SERIALIZER_USER
 from controller.api.query_string_parser import FieldQuery
 
 
@@ -22,17 +32,86 @@ class MetaAllBpm(TypedDict):
     href: str
     type: str
     size: int
+    next: str | None
 
 class DocumentAllBpm(TypedDict):
     meta: MetaAllBpm
     rows: list[DocumentBpm]
 
 
+FIELDS_BPM: dict[str, FieldDocument] = {
+    'meta': FieldDocument(
+        columns=('id',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/bpm/{model.id}",
+            type="process management"
+        )
+    ),
+    'id': FieldDocument(columns=('id',), creates=lambda model, api: model.id),
+    'code': FieldDocument(columns=('code',), creates=lambda model, api: model.code),
+    'name': FieldDocument(columns=('name',), creates=lambda model, api: model.name),
+    'lvl': FieldDocument(columns=('lvl',), creates=lambda model, api: model.lvl),
+    'company': FieldDocument(
+        columns=('id_company',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/company/{model.id_company}",
+            type="company"
+        )
+    ),
+    'parent': FieldDocument(
+        columns=('id_parent', 'lvl'),
+        creates=lambda model, api: Meta(
+            href=f"{api}/bpm/{model.id_parent}",
+            type="process management"
+        ) if model.lvl > 1 else None
+    ),
+}
+
+SERIALIZER_BPM = RowSerializer(FIELDS_BPM)
+
+EXPAND_BPM: dict[str, FieldExpand] = {
+    'company': FieldExpand('id_company', Company, SERIALIZER_COMPANY),
+    'parent': FieldExpand('id_parent', Bpm, SERIALIZER_BPM),
+    'owner': FieldExpand('id_owner', User, SERIALIZER_USER),
+}
+
+
+@dataclass(slots=True, frozen=True)
+class ParamsQueryBpm(ParamsQuery):
+    """Параметры строки запроса списка бизнес процессов"""
+    descendant_of: int | None = None
+    ancestors_of: int | None = None
+
+
 class HandlerRequestGetAllBpm(HandlerRequestGetAllResourcesUsingFilter):
     """Обработчик запроса на получение всех бизнес процессов"""
 
-    def __init__(self, query_string):
-        super().__init__(query_string, cls_orm_model=Bpm)
+    _tables = ('bpm',)
+    _cached = True
+    _params: ParamsQueryBpm
+
+    def __init__(self, params):
+        super().__init__(params, cls_orm_model=Bpm)
+
+    def _get_query(self) -> Query:
+        """Получает запрос ORM моделей с учетом фильтра и положения в
+        дереве. Поддерево и предки берутся из таблицы замыкания."""
+        query = super()._get_query()
+        if self._params.descendant_of is not None:
+            query = query.filter(Bpm.id.in_(
+                select(BpmClosure.id_descendant).where(
+                    BpmClosure.id_ancestor == self._params.descendant_of,
+                    BpmClosure.depth > 0
+                )
+            ))
+        if self._params.ancestors_of is not None:
+            query = query.filter(Bpm.id.in_(
+                select(BpmClosure.id_ancestor).where(
+                    BpmClosure.id_descendant == self._params.ancestors_of,
+                    BpmClosure.depth > 0
+                )
+            ))
+        return query
 
     def _get_fields_query(self) -> list[FieldQuery]:
         """Получает поля запроса."""
@@ -45,30 +124,86 @@ class HandlerRequestGetAllBpm(HandlerRequestGetAllResourcesUsingFilter):
             type=str
         )]
 
+    def _get_serializer_document(self) -> RowSerializer:
+        """Получает сериализатор всех полей строки документа."""
+        return SERIALIZER_BPM
+
+    def _get_fields_expand(self) -> dict[str, FieldExpand]:
+        """Получает раскрываемые поля."""
+        return EXPAND_BPM
+
     def _create_document(self, orm_models: list[Bpm]) -> DocumentAllBpm:
         """Создает документ."""
         meta = MetaAllBpm(
             href=for_api.make_href(path="/bpm"),
             type="process management",
-            size=len(orm_models)
+            size=len(orm_models),
+            next=self._get_href_next(path="/bpm")
         )
-        rows = [
-            DocumentBpm(
-                meta=Meta(
-                    href=for_api.make_href(path=f"/bpm/{model.id}"),
-                    type="process management"
-                ),
-                id=model.id,
-                code=model.code,
-                name=model.name,
-                lvl=model.lvl,
-                company=Meta(
-                    href=for_api.make_href(path=f"/company/{model.id_company}"),
-                    type="company"
-                ),
-                parent=Meta(
-                    href=for_api.make_href(path=f"/bpm/{model.id_parent}"),
-                    type="process management"
-                ) if model.lvl > 1 else None,
-            ) for model in orm_models]
+        rows = self._create_rows(orm_models)
         return DocumentAllBpm(meta=meta, rows=rows)
+
+
+class DocumentNodeBpm(DocumentBpm):
+    children: list['DocumentNodeBpm']
+
+class MetaTreeBpm(TypedDict):
+    href: str
+    type: str
+    size: int
+
+class DocumentTreeBpm(TypedDict):
+    meta: MetaTreeBpm
+    rows: list[DocumentNodeBpm]
+
+
+class HandlerRequestGetTreeBpm(HandlerRequestGetResources):
+    """Обработчик запроса на получение дерева бизнес процессов"""
+
+    _tables = ('bpm',)
+    _cached = True
+    _id_root: int | None
+
+    def __init__(self, id_root):
+        super().__init__()
+        self._id_root = id_root
+
+    def _get_orm_models(self) -> list[Bpm]:
+        """Получает ORM модели дерева одним запросом. С корнем - только
+        его поддерево."""
+        query = Bpm.query
+        if self._id_root is not None:
+            query = query.filter(Bpm.id.in_(
+                select(BpmClosure.id_descendant).where(
+                    BpmClosure.id_ancestor == self._id_root)
+            ))
+        orm_models = query.order_by(Bpm.id).all()
+        if self._id_root is not None and len(orm_models) == 0:
+            self._set_error_in_handler_result(
+                source=f"/bpm/{self._id_root}",
+                error=Errors.NOT_FOUND_PATH
+            )
+            raise HandlerError
+        return orm_models
+
+    def _create_document(self, orm_models: list[Bpm]) -> DocumentTreeBpm:
+        """Создает документ. Дерево строится за один проход по моделям."""
+        nodes = {
+            model.id: DocumentNodeBpm(**row, children=[])
+            for model, row in zip(
+                orm_models, SERIALIZER_BPM.iterates_rows(orm_models))
+        }
+        rows = []
+        for model in orm_models:
+            parent = (nodes.get(model.id_parent)
+                if model.id != self._id_root else None)
+            if parent is None:
+                rows.append(nodes[model.id])
+            else:
+                parent['children'].append(nodes[model.id])
+        meta = MetaTreeBpm(
+            href=for_api.make_href(path="/bpm/tree"),
+            type="process management",
+            size=len(orm_models)
+        )
+        return DocumentTreeBpm(meta=meta, rows=rows)
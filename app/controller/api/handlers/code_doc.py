@@ -1,11 +1,21 @@
-from pydantic import BaseModel, validator
+import sqlite3
+from pydantic import BaseModel, validator, conlist
 from controller.api import post_req_parser
-from typing import TypedDict
+from typing import TypedDict, Iterator, Any
 from .handler import (HandlerRequestAddData, HandlerRequestDelData,
-HandlerError, HandlerRequestGetAllResourcesUsingFilter)
+HandlerError, HandlerRequestGetAllResourcesUsingFilter, HandlerPostRequest,
+HandlerResult, FieldDocument, RowSerializer, FieldExpand)
 from controller.api.errors import Errors
 from database import db_docs
 from database.models.code_doc import CodeDoc
+from database.models.bpm import Bpm
+from database.models.company import Company
+from database.models.type_doc import TypeDoc
+from database.models.user import User
+from .bpm import SERIALIZER_BPM
+from .company import SERIALIZER_COMPANY
+from .type_doc import SERIALIZER_TYPE_DOC
+from .user import SERIALIZER_USER
 from controller.api import for_api
 from controller.api.query_string_parser import FieldQuery
 
@@ -53,6 +63,10 @@ class ModelCodeDoc(BaseModel):
         return id
 
 
+class ModelCodeDocs(BaseModel):
+    rows: conlist(ModelCodeDoc, min_items=1, max_items=1000)
+
+
 class Meta(TypedDict):
     href: str
     type: str
@@ -65,6 +79,68 @@ class DocumentCodeDoc(TypedDict):
     company: Meta
     used: bool
 
+class MetaAllCodeDocs(TypedDict):
+    href: str
+    type: str
+    size: int
+    next: str | None
+
+class DocumentAllCodeDocs(TypedDict):
+    meta: MetaAllCodeDocs
+    rows: list[DocumentCodeDoc]
+
+class MetaChangedCodeDocs(TypedDict):
+    href: str
+    type: str
+    size: int
+    changed_since: int              #Курсор для следующей синхронизации
+    next: str | None
+
+class DocumentChangedCodeDocs(TypedDict):
+    meta: MetaChangedCodeDocs
+    rows: list[DocumentCodeDoc]
+    deleted: list[Meta]
+
+
+FIELDS_CODE_DOC: dict[str, FieldDocument] = {
+    'meta': FieldDocument(
+        columns=('id',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/docs/code/{model.id}",
+            type="document management system"
+        )
+    ),
+    'id': FieldDocument(columns=('id',), creates=lambda model, api: model.id),
+    'code': FieldDocument(columns=('code',), creates=lambda model, api: model.code),
+    'creator': FieldDocument(
+        columns=('id_creator',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/users/{model.id_creator}",
+            type="app users"
+        )
+    ),
+    'company': FieldDocument(
+        columns=('id_company',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/company/{model.id_company}",
+            type="company"
+        )
+    ),
+    'used': FieldDocument(
+        columns=('used',),
+        creates=lambda model, api: bool(model.used)
+    ),
+}
+
+SERIALIZER_CODE_DOC = RowSerializer(FIELDS_CODE_DOC)
+
+EXPAND_CODE_DOC: dict[str, FieldExpand] = {
+    'creator': FieldExpand('id_creator', User, SERIALIZER_USER),
+    'company': FieldExpand('id_company', Company, SERIALIZER_COMPANY),
+    'bpm': FieldExpand('id_bpm', Bpm, SERIALIZER_BPM),
+    'type_doc': FieldExpand('id_type_doc', TypeDoc, SERIALIZER_TYPE_DOC),
+}
+
 
 class HandlerRequestAddCodeDoc(HandlerRequestAddData):
     """Обработчик запроса на добавление кода документа"""
@@ -74,8 +150,7 @@ class HandlerRequestAddCodeDoc(HandlerRequestAddData):
 
     def _forms_code_doc(self, id_code_doc: int) -> str:
         """Формирует код документа."""
-        code_doc = CodeDoc.query.filter_by(id=id_code_doc).first()
-        return f"{code_doc.bpm.code}-{code_doc.type_doc.abv}{code_doc.number}"
+        return CodeDoc.query.get(id_code_doc).code
 
     def _add_record_to_db(self, model_data: ModelCodeDoc) -> int:
         """Добавляет запись в базу данных. Возвращает id записи."""
@@ -87,7 +162,7 @@ class HandlerRequestAddCodeDoc(HandlerRequestAddData):
         )
         try:
             id_record = db_docs.add_code_doc(data)
-        except Exception:
+        except sqlite3.IntegrityError:
             self._set_error_in_handler_result(
                 source="ID не найдены",
                 error=Errors.BAD_REQUEST
@@ -122,6 +197,59 @@ class HandlerRequestAddCodeDoc(HandlerRequestAddData):
         )
 
 
+class HandlerRequestAddCodeDocs(HandlerPostRequest):
+    """Обработчик запроса на добавление нескольких кодов документов"""
+
+    def __init__(self, data_from_request):
+        super().__init__(data_from_request, model=ModelCodeDocs)
+
+    def handle(self) -> HandlerResult:
+        """Обрабатывает запрос на добавление кодов документов."""
+        if not self._check_authentication_user():
+            return self._handler_result
+        try:
+            model_data = self._get_model_data_post_request()
+            ids = self._add_records_to_db(model_data)
+        except HandlerError:
+            return self._handler_result
+        self._handler_result.document = self._create_document(ids)
+        self._handler_result.status_code = 201
+        return self._handler_result
+
+    def _add_records_to_db(self, model_data: ModelCodeDocs) -> list[int]:
+        """Добавляет записи в базу данных. Возвращает id записей."""
+        list_data = [
+            db_docs.DataForAddCodeDoc(
+                id_bpm=row.bpm,
+                id_type_doc=row.type_doc,
+                id_company=row.company,
+                id_creator=self._authentication_user.user_id
+            ) for row in model_data.rows]
+        try:
+            ids = db_docs.add_code_docs(list_data)
+        except sqlite3.IntegrityError:
+            self._set_error_in_handler_result(
+                source="ID не найдены",
+                error=Errors.BAD_REQUEST
+            )
+            raise HandlerError
+        return ids
+
+    def _create_document(self, ids: list[int]) -> DocumentAllCodeDocs:
+        """Создает документ."""
+        orm_models = CodeDoc.query.filter(CodeDoc.id.in_(ids)).all()
+        positions = {id: i for i, id in enumerate(ids)}
+        orm_models.sort(key=lambda model: positions[model.id])
+        meta = MetaAllCodeDocs(
+            href=for_api.make_href(path="/docs/code"),
+            type="document management system",
+            size=len(orm_models),
+            next=None
+        )
+        rows = SERIALIZER_CODE_DOC.creates_rows(orm_models)
+        return DocumentAllCodeDocs(meta=meta, rows=rows)
+
+
 class HandlerRequestDelCodeDoc(HandlerRequestDelData):
     """Обработчик запроса на удаление кода документа"""
 
@@ -150,21 +278,13 @@ class HandlerRequestDelCodeDoc(HandlerRequestDelData):
             raise HandlerError
 
 
-class MetaAllCodeDocs(TypedDict):
-    href: str
-    type: str
-    size: int
-
-class DocumentAllCodeDocs(TypedDict):
-    meta: MetaAllCodeDocs
-    rows: list[DocumentCodeDoc]
-
-
 class HandlerRequestGetAllCodeDocs(HandlerRequestGetAllResourcesUsingFilter):
     """Обработчик запроса на получение всех кодов документов"""
 
-    def __init__(self, query_string):
-        super().__init__(query_string, cls_orm_model=CodeDoc)
+    _tables = ('code_documents',)
+
+    def __init__(self, params):
+        super().__init__(params, cls_orm_model=CodeDoc)
 
     def _get_fields_query(self) -> list[FieldQuery]:
         """Получает запрашиваемые поля."""
@@ -187,29 +307,64 @@ class HandlerRequestGetAllCodeDocs(HandlerRequestGetAllResourcesUsingFilter):
             )
         ]
 
+    def _get_serializer_document(self) -> RowSerializer:
+        """Получает сериализатор всех полей строки документа."""
+        return SERIALIZER_CODE_DOC
+
+    def _get_fields_expand(self) -> dict[str, FieldExpand]:
+        """Получает раскрываемые поля."""
+        return EXPAND_CODE_DOC
+
     def _create_document(self, orm_models:list[CodeDoc]) -> DocumentAllCodeDocs:
         """Создает документ."""
         meta = MetaAllCodeDocs(
             href=for_api.make_href(path="/docs/code"),
             type="document management system",
-            size=len(orm_models)
+            size=len(orm_models),
+            next=self._get_href_next(path="/docs/code")
         )
-        rows = [
-            DocumentCodeDoc(
-                meta=Meta(
-                    href=for_api.make_href(path=f"/docs/code/{model.id}"),
-                    type="document management system"
-                ),
-                id=model.id,
-                code=f"{model.bpm.code}-{model.type_doc.abv}{model.number}",
-                creator=Meta(
-                    href=for_api.make_href(path=f"/users/{model.id_creator}"),
-                    type="app users"
-                ),
-                company=Meta(
-                    href=for_api.make_href(path=f"/company/{model.id_company}"),
-                    type="company"
-                ),
-                used=bool(model.used)
-            ) for model in orm_models]
+        rows = self._create_rows(orm_models)
         return DocumentAllCodeDocs(meta=meta, rows=rows)
+
+
+class HandlerRequestGetChangedCodeDocs(HandlerRequestGetAllCodeDocs):
+    """Обработчик запроса на получение кодов документов, измененных после
+    курсора changed_since, вместе с удаленными."""
+
+    def _get_orm_models(self) -> list[CodeDoc]:
+        """Получает ORM модели одной страницы изменений."""
+        return self._get_changed_orm_models()
+
+    def _create_document(
+        self,
+        orm_models: list[CodeDoc]) -> DocumentChangedCodeDocs:
+        """Создает документ."""
+        meta = MetaChangedCodeDocs(
+            href=for_api.make_href(path="/docs/code"),
+            type="document management system",
+            size=len(orm_models),
+            changed_since=self._change_seq_last,
+            next=self._get_href_next_changes(path="/docs/code")
+        )
+        rows = self._create_rows(orm_models)
+        deleted = [
+            Meta(
+                href=for_api.make_href(path=f"/docs/code/{id}"),
+                type="document management system"
+            ) for id in self._get_deleted_ids()]
+        return DocumentChangedCodeDocs(meta=meta, rows=rows, deleted=deleted)
+
+
+class HandlerRequestExportCodeDocs(HandlerRequestGetAllCodeDocs):
+    """Обработчик запроса на выгрузку кодов документов. Отдает все строки,
+    подходящие под фильтр, без страниц."""
+
+    def _get_orm_models(self) -> Iterator[CodeDoc]:
+        """Получает ORM модели по мере обхода."""
+        return self._get_all_orm_models()
+
+    def _create_document(
+        self,
+        orm_models: Iterator[CodeDoc]) -> Iterator[dict[str, Any]]:
+        """Создает строки документа по мере обхода."""
+        return self._iterates_rows(orm_models)
@@ -1,5 +1,6 @@
 from typing import TypedDict
-from .handler import HandlerRequestGetAllResources, HandlerRequestGetResource
+from .handler import (HandlerRequestGetAllResources, HandlerRequestGetResource,
+FieldDocument, RowSerializer)
 from database.models.company import Company
 from controller.api import for_api
 
@@ -23,9 +24,30 @@ class DocumentAllCompany(TypedDict):
     rows: list[DocumentCompany]
 
 
+FIELDS_COMPANY: dict[str, FieldDocument] = {
+    'meta': FieldDocument(
+        columns=('id',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/company/{model.id}",
+            type="company"
+        )
+    ),
+    'id': FieldDocument(columns=('id',), creates=lambda model, api: model.id),
+    'name': FieldDocument(
+        columns=('name',),
+        creates=lambda model, api: model.name
+    ),
+}
+
+SERIALIZER_COMPANY = RowSerializer(FIELDS_COMPANY)
+
+
 class HandlerRequestGetAllCompany(HandlerRequestGetAllResources):
     """Обработчик запроса на получение всех компаний"""
 
+    _tables = ('company',)
+    _cached = True
+
     def __init__(self):
         super().__init__(cls_orm_model=Company)
 
@@ -36,31 +58,18 @@ class HandlerRequestGetAllCompany(HandlerRequestGetAllResources):
             type="company",
             size=len(orm_models)
         )
-        rows = [
-            DocumentCompany(
-                meta=Meta(
-                    href=for_api.make_href(path=f"/company/{model.id}"),
-                    type="company"
-                ),
-                id=model.id,
-                name=model.name
-            ) for model in orm_models]
+        rows = SERIALIZER_COMPANY.creates_rows(orm_models)
         return DocumentAllCompany(meta=meta, rows=rows)
 
 
 class HandlerRequestGetCompany(HandlerRequestGetResource):
     """Обработчик запроса на получение компании"""
 
+    _tables = ('company',)
+
     def __init__(self, company_id):
         super().__init__(company_id, cls_orm_model=Company)
 
     def _create_document(self, orm_model: Company) -> DocumentCompany:
         """Создает документ."""
-        return DocumentCompany(
-            meta=Meta(
-                href=for_api.make_href(path=f"/company/{orm_model.id}"),
-                type="company"
-            ),
-            id=orm_model.id,
-            name=orm_model.name
-        )
+        return SERIALIZER_COMPANY.creates_row(orm_model)
@@ -1,22 +1,22 @@
 from pydantic import BaseModel, validator
 from datetime import date
+from dataclasses import dataclass
+from sqlalchemy import select, table, literal_column, or_, and_
+from sqlalchemy.sql.selectable import Subquery
 from controller.api import post_req_parser
-from typing import TypedDict
+from typing import TypedDict, Iterator, Any
 from .handler import (HandlerRequestAddData, HandlerError,
-HandlerRequestGetAllResourcesUsingFilter, HandlerRequestChangeData)
+HandlerRequestGetAllResourcesUsingFilter, HandlerRequestChangeData,
+FieldDocument, ParamsQuery, RowSerializer, FieldExpand)
 from database.models.code_doc import CodeDoc
 from controller.api.errors import Errors
 from database import db_docs
 from controller.api import for_api
-from controller.api.query_string_parser import FieldQuery
+from controller.api.query_string_parser import FieldQuery, OPERATORS
 from database.models.doc import Doc
-
-
-def _forms_fullname_doc(id_code_doc: int, name_doc: str) -> str:
-    """Формирует полное имя документа."""
-    code_doc = CodeDoc.query.filter_by(id=id_code_doc).first()
-    return (f'{code_doc.bpm.code}-{code_doc.type_doc.abv}{code_doc.number} '
-            f'{code_doc.type_doc.name}: {name_doc}')
+from database.models.user import User
+from .code_doc import SERIALIZER_CODE_DOC
+from .user import SERIALIZER_USER
 
 
 class ModelFieldMeta(BaseModel):
@@ -133,10 +133,7 @@ class HandlerRequestAddDoc(HandlerRequestAddData):
                 href=for_api.make_href(path=f"/docs/code/{model_data.code_doc}"),
                 type="document management system"
             ),
-            fullname=_forms_fullname_doc(
-                id_code_doc=model_data.code_doc,
-                name_doc=model_data.name
-            ),
+            fullname=Doc.query.get(id_doc).fullname,
             date_start=model_data.date_start,
             date_finish=model_data.date_finish,
             responsible=Meta(
@@ -160,17 +157,167 @@ class MetaAllDocs(TypedDict):
     href: str
     type: str
     size: int
+    next: str | None
 
 class DocumentAllDocs(TypedDict):
     meta: MetaAllDocs
     rows: list[DocumentDoc]
 
+class MetaChangedDocs(TypedDict):
+    href: str
+    type: str
+    size: int
+    changed_since: int              #Курсор для следующей синхронизации
+    next: str | None
+
+class DocumentChangedDocs(TypedDict):
+    meta: MetaChangedDocs
+    rows: list[DocumentDoc]
+    deleted: list[Meta]
+
+
+FIELDS_DOC: dict[str, FieldDocument] = {
+    'meta': FieldDocument(
+        columns=('id',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/docs/{model.id}",
+            type="document management system"
+        )
+    ),
+    'id': FieldDocument(columns=('id',), creates=lambda model, api: model.id),
+    'code_doc': FieldDocument(
+        columns=('id_code_doc',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/docs/code/{model.id_code_doc}",
+            type="document management system"
+        )
+    ),
+    'fullname': FieldDocument(
+        columns=('fullname',),
+        creates=lambda model, api: model.fullname
+    ),
+    'date_start': FieldDocument(
+        columns=('date_start',),
+        creates=lambda model, api: model.date_start
+    ),
+    'date_finish': FieldDocument(
+        columns=('date_finish',),
+        creates=lambda model, api: model.date_finish
+    ),
+    'responsible': FieldDocument(
+        columns=('id_responsible',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/users/{model.id_responsible}",
+            type="app users"
+        )
+    ),
+    'version': FieldDocument(
+        columns=('version',),
+        creates=lambda model, api: model.version
+    ),
+    'actual': FieldDocument(
+        columns=('actual',),
+        creates=lambda model, api: bool(model.actual)
+    ),
+    'creator': FieldDocument(
+        columns=('id_creator',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/users/{model.id_creator}",
+            type="app users"
+        )
+    ),
+}
+
+SERIALIZER_DOC = RowSerializer(FIELDS_DOC)
+
+EXPAND_DOC: dict[str, FieldExpand] = {
+    'code_doc': FieldExpand('id_code_doc', CodeDoc, SERIALIZER_CODE_DOC),
+    'responsible': FieldExpand('id_responsible', User, SERIALIZER_USER),
+    'creator': FieldExpand('id_creator', User, SERIALIZER_USER),
+}
+
+
+@dataclass(slots=True, frozen=True)
+class ParamsQueryDocs(ParamsQuery):
+    """Параметры строки запроса списка документов"""
+    search: str | None = None
+    #Курсор страницы поиска вместе с after: релевантность последней строки
+    after_rank: float | None = None
+
+
+def creates_match_fts(search: str) -> str | None:
+    """Создает запрос MATCH для FTS5. Каждое слово берется в кавычки,
+    поэтому синтаксис FTS5 в поиске не работает. Последнее слово ищется
+    как префикс. None - слов нет."""
+    words = search.split()
+    if len(words) == 0:
+        return None
+    phrases = ['"{}"'.format(word.replace('"', '""')) for word in words]
+    return " ".join(phrases) + "*"
+
 
 class HandlerRequestGetAllDocs(HandlerRequestGetAllResourcesUsingFilter):
     """Обработчик запроса на получение всех документов"""
 
-    def __init__(self, query_string):
-        super().__init__(query_string, cls_orm_model=Doc)
+    _tables = ('documents',)
+    _params: ParamsQueryDocs
+    _rank_last: float | None
+
+    def __init__(self, params):
+        super().__init__(params, cls_orm_model=Doc)
+        self._rank_last = None
+
+    def _get_orm_models(self) -> list[Doc]:
+        """Получает ORM модели одной страницы. Результаты поиска идут по
+        убыванию релевантности: ключевая пагинация по (rank, id)."""
+        if self._params.search is None:
+            return super()._get_orm_models()
+        limit = self._get_limit()
+        found = self._get_found()
+        query = self._get_query().options(
+            self._get_loader_selected_fields()
+        ).join(found, Doc.id == found.c.id)
+        after, after_rank = self._params.after, self._params.after_rank
+        if (after is None) != (after_rank is None):
+            self._set_error_in_handler_result(
+                source="after, after_rank: в поиске задаются вместе",
+                error=Errors.BAD_REQUEST
+            )
+            raise HandlerError
+        if after is not None:
+            query = query.filter(or_(
+                found.c.rank > after_rank,
+                and_(found.c.rank == after_rank, Doc.id > after)
+            ))
+        rows = query.add_columns(found.c.rank).order_by(
+            found.c.rank, Doc.id
+        ).limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            self._id_last = rows[-1][0].id
+            self._rank_last = rows[-1].rank
+        return [model for model, _ in rows]
+
+    def _get_found(self) -> Subquery:
+        """Получает подзапрос FTS5: id найденных документов и их
+        релевантность rank, меньше - релевантнее."""
+        match = creates_match_fts(self._params.search)
+        if match is None:
+            self._set_error_in_handler_result(
+                source="search: пустая строка поиска",
+                error=Errors.BAD_REQUEST
+            )
+            raise HandlerError
+        return select(
+            literal_column('rowid').label('id'),
+            literal_column('rank').label('rank')
+        ).select_from(
+            table('documents_fts')
+        ).where(literal_column('documents_fts').match(match)).subquery()
+
+    def _get_cursor_next(self) -> dict[str, Any]:
+        """Получает параметры курсора следующей страницы."""
+        return {'after': self._id_last, 'after_rank': self._rank_last}
 
     def _get_fields_query(self) -> list[FieldQuery]:
         """Получает запрашиваемые поля."""
@@ -199,49 +346,99 @@ class HandlerRequestGetAllDocs(HandlerRequestGetAllResourcesUsingFilter):
                 null=False,
                 type=str
             ),
+            FieldQuery(
+                name_in_db='date_start',
+                name='date_start',
+                operators=OPERATORS,
+                prefix="",
+                null=False,
+                type=date
+            ),
+            FieldQuery(
+                name_in_db='date_finish',
+                name='date_finish',
+                operators=OPERATORS,
+                prefix="",
+                null=False,
+                type=date
+            ),
+            FieldQuery(
+                name_in_db='version',
+                name='version',
+                operators=OPERATORS,
+                prefix="",
+                null=False,
+                type=int
+            ),
         ]
 
+    def _get_serializer_document(self) -> RowSerializer:
+        """Получает сериализатор всех полей строки документа."""
+        return SERIALIZER_DOC
+
+    def _get_fields_expand(self) -> dict[str, FieldExpand]:
+        """Получает раскрываемые поля."""
+        return EXPAND_DOC
+
     def _create_document(self, orm_models: list[Doc]) -> DocumentAllDocs:
         """Создает документ."""
         meta = MetaAllDocs(
             href=for_api.make_href(path="/docs"),
             type="document management system",
-            size=len(orm_models)
+            size=len(orm_models),
+            next=self._get_href_next(path="/docs")
         )
-        rows = [DocumentDoc(
-            meta=Meta(
-                href=for_api.make_href(path=f"/docs/{model.id}"),
-                type="document management system"
-            ),
-            id=model.id,
-            code_doc=Meta(
-                href=for_api.make_href(path=f"/docs/code/{model.id_code_doc}"),
-                type="document management system"
-            ),
-            fullname=_forms_fullname_doc(
-                id_code_doc=model.id_code_doc,
-                name_doc=model.name
-            ),
-            date_start=model.date_start,
-            date_finish=model.date_finish,
-            responsible=Meta(
-                href=for_api.make_href(
-                    path=f"/users/{model.id_responsible}"
-                ),
-                type="app users"
-            ),
-            version=model.version,
-            actual=bool(model.actual),
-            creator=Meta(
-                href=for_api.make_href(
-                    path=f"/users/{model.id_creator}"
-                ),
-                type="app users"
-                )
-            ) for model in orm_models]
+        rows = self._create_rows(orm_models)
         return DocumentAllDocs(meta=meta, rows=rows)
 
 
+class HandlerRequestGetChangedDocs(HandlerRequestGetAllDocs):
+    """Обработчик запроса на получение документов, измененных после курсора
+    changed_since. Страницы идут по возрастанию номера изменения."""
+
+    def _get_orm_models(self) -> list[Doc]:
+        """Получает ORM модели одной страницы изменений."""
+        if self._params.search is not None:
+            self._set_error_in_handler_result(
+                source="search: не используется вместе с changed_since",
+                error=Errors.BAD_REQUEST
+            )
+            raise HandlerError
+        return self._get_changed_orm_models()
+
+    def _create_document(self, orm_models: list[Doc]) -> DocumentChangedDocs:
+        """Создает документ."""
+        meta = MetaChangedDocs(
+            href=for_api.make_href(path="/docs"),
+            type="document management system",
+            size=len(orm_models),
+            changed_since=self._change_seq_last,
+            next=self._get_href_next_changes(path="/docs")
+        )
+        rows = self._create_rows(orm_models)
+        deleted = [
+            Meta(
+                href=for_api.make_href(path=f"/docs/{id}"),
+                type="document management system"
+            ) for id in self._get_deleted_ids()]
+        return DocumentChangedDocs(meta=meta, rows=rows, deleted=deleted)
+
+
+class HandlerRequestExportDocs(HandlerRequestGetAllDocs):
+    """Обработчик запроса на выгрузку документов. Отдает все строки,
+    подходящие под фильтр, без страниц."""
+
+    def _get_orm_models(self) -> Iterator[Doc]:
+        """Получает ORM модели по мере обхода."""
+        return self._get_all_orm_models()
+
+    def _create_document(
+        self,
+        orm_models: Iterator[Doc]) -> Iterator[dict[str, Any]]:
+        """Создает строки документа по мере обхода."""
+        return self._iterates_rows(orm_models)
+
+
 class ModelUpdatedDoc(BaseModel):
     date_start: date
     date_finish: date
@@ -323,10 +520,7 @@ class HandlerRequestUpdatingVersionDoc(HandlerRequestChangeData):
                 ),
                 type="document management system"
             ),
-            fullname=_forms_fullname_doc(
-                id_code_doc=orm_model.id_code_doc,
-                name_doc=orm_model.name
-            ),
+            fullname=orm_model.fullname,
             date_start=orm_model.date_start,
             date_finish=orm_model.date_finish,
             responsible=Meta(
@@ -400,10 +594,7 @@ class HandlerRequestChangeActualDoc(HandlerRequestChangeData):
                 ),
                 type="document management system"
             ),
-            fullname=_forms_fullname_doc(
-                id_code_doc=orm_model.id_code_doc,
-                name_doc=orm_model.name
-            ),
+            fullname=orm_model.fullname,
             date_start=orm_model.date_start,
             date_finish=orm_model.date_finish,
             responsible=Meta(
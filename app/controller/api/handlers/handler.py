@@ -1,13 +1,34 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
-from typing import Mapping, Any, TypedDict, Protocol, Callable
+from typing import (Mapping, Any, TypedDict, Protocol, Callable, NamedTuple,
+Iterator, Iterable)
+from urllib.parse import urlencode
+import hashlib
+from flask import request
 from controller.api.errors import Errors
-from controller.service_layer.authentication_info import UserAuthenticationInfo
+from controller.api import for_api
+from controller.service_layer.authentication_info import (
+UserAuthenticationInfo, get_user_authentication_info)
+from controller.service_layer import reference_cache
 from database.models.database import db
+from database import db_table_versions
 from controller.api.query_string_parser import (QueryStringParser, FieldQuery,
 ErrorQueryStringParsing)
 from database.models.filters import GetterModelsUsingCustomFilter
 from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Query, load_only, strategy_options
+from sqlalchemy.sql.elements import ClauseElement
+from utilities.cache import LRUCache
+
+
+#Размер страницы списка ресурсов
+LIMIT_DEFAULT = 100
+LIMIT_MAX = 1000
+#Размер порции чтения выгрузки
+EXPORT_CHUNK = 1000
+
+#Условия разобранных фильтров: (обработчик, filter, url_root) -> условие
+filters_cache = LRUCache(maxsize=256)
 
 
 @dataclass(slots=True, frozen=True)
@@ -27,6 +48,70 @@ class HandlerResult:
 		return self.document is not None
 
 
+@dataclass(slots=True, frozen=True)
+class ParamsQuery:
+	"""Параметры строки запроса списка ресурсов"""
+	filter: str | None = None
+	limit: int | None = None
+	after: int | None = None
+	fields: str | None = None
+	#Курсор синхронизации: номер изменения, после которого нужны строки
+	changed_since: int | None = None
+	#Связанные объекты, встраиваемые вместо ссылок: 'creator,company'
+	expand: str | None = None
+
+
+class FieldDocument(NamedTuple):
+	"""Поле строки документа"""
+	columns: tuple[str, ...]                #('id_creator',)
+	#lambda model, api: Meta(href=f"{api}/users/{model.id_creator}", ...),
+	#api - корень href API: 'http://web/api/1.0'
+	creates: Callable[[db.Model, str], Any]
+
+
+class RowSerializer:
+	"""Сериализатор строк документа. Собирается один раз из таблицы полей;
+	корень href API вычисляется один раз на все строки, а не для каждой
+	ссылки."""
+
+	__fields: Mapping[str, FieldDocument]
+	__items: tuple[tuple[str, Callable[[db.Model, str], Any]], ...]
+
+	def __init__(self, fields: Mapping[str, FieldDocument]):
+		self.__fields = fields
+		self.__items = tuple(
+			(name, field.creates) for name, field in fields.items())
+
+	@property
+	def fields(self) -> Mapping[str, FieldDocument]:
+		"""Поля строки документа."""
+		return self.__fields
+
+	def creates_row(self, model: db.Model) -> dict[str, Any]:
+		"""Создает строку документа."""
+		return self.creates_rows([model])[0]
+
+	def creates_rows(self, models: Iterable[db.Model]) -> list[dict[str, Any]]:
+		"""Создает строки документа."""
+		return list(self.iterates_rows(models))
+
+	def iterates_rows(
+		self,
+		models: Iterable[db.Model]) -> Iterator[dict[str, Any]]:
+		"""Создает строки документа по мере обхода моделей."""
+		api = for_api.get_href_api()
+		items = self.__items
+		for model in models:
+			yield {name: creates(model, api) for name, creates in items}
+
+
+class FieldExpand(NamedTuple):
+	"""Раскрываемое поле: ссылка на связанный объект заменяется объектом"""
+	column: str                             #'id_responsible'
+	cls_orm_model: type[db.Model]           #User
+	serializer: RowSerializer               #SERIALIZER_USER
+
+
 class HandlerRequest(Protocol):
 	"""Базовый класс - Обработчик запроса"""
 
@@ -34,17 +119,53 @@ class HandlerRequest(Protocol):
 		"""Обрабатывает соответствующий запрос."""
 		...
 
+	def get_etag(self) -> str | None:
+		"""Получает ETag ответа. None - ответ без ETag."""
+		...
+
 
 class HandlerRequestWithAuthentication(ABC):
 	"""Обработчик запроса с аутентификацией пользователя"""
 
+	#Таблицы, из которых строится документ: 'company'. Пусто - без ETag
+	_tables: tuple[str, ...] = ()
+	_versions_tables: tuple[tuple[str, int], ...] | None = None
 	_authentication_user: UserAuthenticationInfo
 	_handler_result: HandlerResult
 
 	def __init__(self):
-		self._authentication_user = UserAuthenticationInfo()
+		self._authentication_user = get_user_authentication_info()
 		self._handler_result = HandlerResult()
 
+	def get_etag(self) -> str | None:
+		"""Получает ETag ответа по счетчикам изменений таблиц документа и
+		URL запроса. Вычисляется без ORM моделей, до обработки запроса.
+		None - у документа нет таблиц или пользователь не аутентифицирован."""
+		if not self._tables or not self._authentication_user:
+			return None
+		try:
+			self._get_versions_tables()
+		except HandlerError:
+			return None
+		digest = hashlib.blake2b(
+			f"{request.url} {self._get_versions_tables()}".encode(),
+			digest_size=16
+		)
+		return digest.hexdigest()
+
+	def _get_versions_tables(self) -> tuple[tuple[str, int], ...]:
+		"""Получает счетчики изменений таблиц документа. Читаются один раз
+		за запрос, из БД - не чаще раза в VERSIONS_TTL."""
+		if self._versions_tables is None:
+			versions = reference_cache.get_versions_tables(
+				self._get_tables())
+			self._versions_tables = tuple(sorted(versions.items()))
+		return self._versions_tables
+
+	def _get_tables(self) -> tuple[str, ...]:
+		"""Получает таблицы, из которых строится документ запроса."""
+		return self._tables
+
 	def _set_error_in_handler_result(self, source: str, error: Errors) -> None:
 		"""Устанавливает ошибку в результат обработчика."""
 		message, status_code = error.value
@@ -113,6 +234,10 @@ class HandlerRequestGetResource(HandlerRequestWithAuthentication, ABC):
 class HandlerRequestGetResources(HandlerRequestWithAuthentication, ABC):
 	"""Обработчик запроса на получение ресурсов"""
 
+	#Документ - справочные данные: хранится в кэше процесса по таблицам,
+	#url запроса и счетчикам изменений таблиц
+	_cached: bool = False
+
 	def __init__(self):
 		super().__init__()
 
@@ -121,13 +246,25 @@ class HandlerRequestGetResources(HandlerRequestWithAuthentication, ABC):
 		if not self._check_authentication_user():
 			return self._handler_result
 		try:
-			orm_models = self._get_orm_models()
-			self._handler_result.document = self._create_document(orm_models)
+			self._handler_result.document = self._get_document()
 		except HandlerError:
 			return self._handler_result
 		self._handler_result.status_code = 200
 		return self._handler_result
 
+	def _get_document(self) -> Mapping[str, Any]:
+		"""Получает документ. Документ справочных данных берется из кэша,
+		ошибки не кэшируются. Счетчики изменений таблиц входят в ключ:
+		запись из другого процесса не оставит в кэше устаревший документ."""
+		if not self._cached:
+			return self._create_document(self._get_orm_models())
+		return reference_cache.get_or_creates(
+			tables=self._get_tables(),
+			url=request.url,
+			versions=self._get_versions_tables(),
+			creates=lambda: self._create_document(self._get_orm_models())
+		)
+
 	@abstractmethod
 	def _get_orm_models(self) -> list[db.Model]:
 		"""Получает ORM модели."""
@@ -154,38 +291,277 @@ class HandlerRequestGetAllResources(HandlerRequestGetResources, ABC):
 
 
 class HandlerRequestGetAllResourcesUsingFilter(HandlerRequestGetResources, ABC):
-	"""Обработчик запроса на получение много ресурсов используя фильтр"""
+	"""Обработчик запроса на получение много ресурсов используя фильтр.
+	Список отдается страницами: ключевая пагинация по первичному ключу."""
 
-	_query_string: str | None
+	_params: ParamsQuery
 	_cls_orm_model: type[db.Model]
+	_id_last: int | None
+	#Курсор страницы изменений и признак следующей страницы
+	_change_seq_last: int | None
+	_has_next_changes: bool
 
-	def __init__(self, query_string, cls_orm_model):
+	def __init__(self, params, cls_orm_model):
 		super().__init__()
-		self._query_string = query_string
+		self._params = params
 		self._cls_orm_model = cls_orm_model
+		self._id_last = None
+		self._change_seq_last = None
+		self._has_next_changes = False
 
 	def _get_orm_models(self) -> list[db.Model]:
-		"""Получает ORM модели."""
-		if self._query_string is None:
-			return self._cls_orm_model.query.all()
+		"""Получает ORM модели одной страницы. Загружаются только столбцы
+		выбранных полей."""
+		limit = self._get_limit()
+		query = self._get_query().options(self._get_loader_selected_fields())
+		primary_key = self._cls_orm_model.id
+		if self._params.after is not None:
+			query = query.filter(primary_key > self._params.after)
+		models = query.order_by(primary_key).limit(limit + 1).all()
+		if len(models) > limit:
+			models = models[:limit]
+			self._id_last = models[-1].id
+		return models
+
+	def _get_all_orm_models(self) -> Iterator[db.Model]:
+		"""Получает все ORM модели без страниц. Модели читаются из курсора
+		порциями по мере обхода и в памяти не накапливаются."""
+		primary_key = self._cls_orm_model.id
+		return self._get_query().options(
+			self._get_loader_selected_fields()
+		).order_by(primary_key).yield_per(EXPORT_CHUNK)
+
+	def _get_changed_orm_models(self) -> list[db.Model]:
+		"""Получает ORM модели одной страницы изменений: номер изменения
+		больше курсора changed_since, по возрастанию. Верхняя граница
+		читается до моделей, поэтому изменение, зафиксированное во время
+		чтения, не будет пропущено - оно попадет в следующую страницу.
+		Фильтр не используется: строка, переставшая подходить под фильтр,
+		не попала бы ни в строки, ни в удаленные."""
+		if self._params.filter is not None:
+			self._set_error_in_handler_result(
+				source="filter: не используется вместе с changed_since",
+				error=Errors.BAD_REQUEST
+			)
+			raise HandlerError
+		change_seq_max = db_table_versions.get_last_change_seq()
+		limit = self._get_limit()
+		change_seq = self._cls_orm_model.change_seq
+		models = self._get_query().options(
+			self._get_loader_selected_fields('change_seq')
+		).filter(
+			change_seq > self._params.changed_since,
+			change_seq <= change_seq_max
+		).order_by(change_seq).limit(limit + 1).all()
+		if len(models) > limit:
+			models = models[:limit]
+			self._change_seq_last = models[-1].change_seq
+			self._has_next_changes = True
+		else:
+			self._change_seq_last = change_seq_max
+		return models
+
+	def _get_deleted_ids(self) -> list[int]:
+		"""Получает id строк, удаленных на странице изменений."""
+		return db_table_versions.get_deleted_ids(
+			table_name=self._cls_orm_model.__tablename__,
+			after=self._params.changed_since,
+			until=self._change_seq_last
+		)
+
+	def _iterates_rows(
+		self,
+		orm_models: Iterator[db.Model]) -> Iterator[dict[str, Any]]:
+		"""Создает строки документа по мере обхода моделей."""
+		return self._get_row_serializer().iterates_rows(orm_models)
+
+	def _get_loader_selected_fields(
+		self,
+		*columns_extra: str) -> strategy_options.Load:
+		"""Получает опцию загрузки только столбцов выбранных полей и
+		дополнительных столбцов."""
+		columns = {'id', *columns_extra}
+		for field in self._get_selected_fields().values():
+			columns.update(field.columns)
+		for field in self._get_selected_expand().values():
+			columns.add(field.column)
+		return load_only(
+			*[getattr(self._cls_orm_model, column) for column in columns])
+
+	def _get_limit(self) -> int:
+		"""Получает размер страницы."""
+		limit = self._params.limit
+		if limit is None:
+			return LIMIT_DEFAULT
+		if not 1 <= limit <= LIMIT_MAX:
+			self._set_error_in_handler_result(
+				source=f"limit: {limit}, допустимо от 1 до {LIMIT_MAX}",
+				error=Errors.BAD_REQUEST
+			)
+			raise HandlerError
+		return limit
+
+	def _get_query(self) -> Query:
+		"""Получает запрос ORM моделей с учетом фильтра."""
+		query = self._cls_orm_model.query
+		if self._params.filter is None:
+			return query
+		return query.filter(self._get_criterion())
+
+	def _get_criterion(self) -> ClauseElement:
+		"""Получает условие фильтра. Повторяющиеся фильтры берутся из кэша
+		без разбора строки. Префиксы значений зависят от url_root, поэтому
+		он входит в ключ."""
+		key = (type(self).__name__, self._params.filter, request.url_root)
+		criterion = filters_cache.get(key)
+		if criterion is not None:
+			return criterion
 		fields = self._get_fields_query()
-		parser = QueryStringParser(string=self._query_string, fields=fields)
+		parser = QueryStringParser(string=self._params.filter, fields=fields)
 		try:
-			models = GetterModelsUsingCustomFilter(
-				self._cls_orm_model, parser).get()
+			criterion = GetterModelsUsingCustomFilter(
+				self._cls_orm_model, parser).get_criterion()
 		except ErrorQueryStringParsing as e:
 			self._set_error_in_handler_result(
 				source=e.source,
 				error=Errors.FILTER_ERROR
 			)
 			raise HandlerError
-		return models
+		filters_cache.set(key, criterion)
+		return criterion
+
+	def _get_tables(self) -> tuple[str, ...]:
+		"""Получает таблицы документа: таблицы ресурса и таблицы
+		раскрываемых полей. Изменение связанного объекта меняет ETag и
+		ключ кэша документа."""
+		tables = {*self._tables}
+		for field in self._get_selected_expand().values():
+			tables.add(field.cls_orm_model.__tablename__)
+		return tuple(sorted(tables))
+
+	def _get_selected_fields(self) -> dict[str, FieldDocument]:
+		"""Получает поля строки, выбранные параметром fields.
+		Без параметра - все поля. Раскрываемые поля тоже можно выбрать."""
+		fields = self._get_serializer_document().fields
+		if self._params.fields is None:
+			return fields
+		names = self._params.fields.replace(" ", "").split(",")
+		if unknown_names := [name for name in names
+			if name not in fields and name not in self._get_fields_expand()]:
+			self._set_error_in_handler_result(
+				source=f"Неизвестные поля: {unknown_names}",
+				error=Errors.FIELDS_ERROR
+			)
+			raise HandlerError
+		return {name: field for name, field in fields.items() if name in names}
+
+	def _get_selected_expand(self) -> dict[str, FieldExpand]:
+		"""Получает поля, раскрываемые параметром expand. С параметром
+		fields раскрываются только выбранные поля."""
+		if self._params.expand is None:
+			return {}
+		fields = self._get_fields_expand()
+		names = self._params.expand.replace(" ", "").split(",")
+		if unknown_names := [name for name in names if name not in fields]:
+			self._set_error_in_handler_result(
+				source=f"Нераскрываемые поля: {unknown_names}",
+				error=Errors.FIELDS_ERROR
+			)
+			raise HandlerError
+		if self._params.fields is not None:
+			selected = self._params.fields.replace(" ", "").split(",")
+			names = [name for name in names if name in selected]
+		return {name: field for name, field in fields.items() if name in names}
+
+	def _create_rows(self, orm_models: list[db.Model]) -> list[dict[str, Any]]:
+		"""Создает строки документа. Строятся только выбранные поля."""
+		rows = self._get_row_serializer().creates_rows(orm_models)
+		for name, field in self._get_selected_expand().items():
+			self._expands_rows(rows, orm_models, name, field)
+		return rows
+
+	def _expands_rows(
+		self,
+		rows: list[dict[str, Any]],
+		orm_models: list[db.Model],
+		name: str,
+		field: FieldExpand) -> None:
+		"""Встраивает связанные объекты в строки. Связанные модели всей
+		страницы получаются одним запросом IN по различным id. Пустая
+		ссылка остается пустой."""
+		ids = {getattr(model, field.column) for model in orm_models}
+		ids.discard(None)
+		if len(ids) == 0:
+			related = []
+		else:
+			columns = {'id'}
+			for field_related in field.serializer.fields.values():
+				columns.update(field_related.columns)
+			cls_orm_model = field.cls_orm_model
+			#Модели страницы могут быть среди связанных с другим набором
+			#столбцов: populate_existing дозагружает их тем же запросом
+			related = cls_orm_model.query.options(load_only(
+				*[getattr(cls_orm_model, column) for column in columns]
+			)).filter(
+				cls_orm_model.id.in_(ids)
+			).populate_existing().all()
+		objects = dict(zip(
+			[model.id for model in related],
+			field.serializer.creates_rows(related)
+		))
+		for row, model in zip(rows, orm_models):
+			if name in row and row[name] is None:
+				continue
+			row[name] = objects.get(getattr(model, field.column))
+
+	def _get_row_serializer(self) -> RowSerializer:
+		"""Получает сериализатор выбранных полей. Без параметра fields -
+		общий сериализатор ресурса."""
+		if self._params.fields is None:
+			return self._get_serializer_document()
+		return RowSerializer(self._get_selected_fields())
+
+	def _get_href_next(self, path: str) -> str | None:
+		"""Получает href следующей страницы. None - страница последняя."""
+		if self._id_last is None:
+			return None
+		args = {**asdict(self._params), **self._get_cursor_next()}
+		query_string = urlencode(
+			{key: value for key, value in args.items() if value is not None})
+		return for_api.make_href(path) + '?' + query_string
+
+	def _get_cursor_next(self) -> dict[str, Any]:
+		"""Получает параметры курсора следующей страницы."""
+		return {'after': self._id_last}
+
+	def _get_href_next_changes(self, path: str) -> str | None:
+		"""Получает href следующей страницы изменений. None - страница
+		последняя, курсор для следующей синхронизации - в meta."""
+		if not self._has_next_changes:
+			return None
+		args = {
+			**asdict(self._params),
+			'after': None,
+			'changed_since': self._change_seq_last
+		}
+		query_string = urlencode(
+			{key: value for key, value in args.items() if value is not None})
+		return for_api.make_href(path) + '?' + query_string
+
+	def _get_fields_expand(self) -> dict[str, FieldExpand]:
+		"""Получает раскрываемые поля. По умолчанию - нет."""
+		return {}
 
 	@abstractmethod
 	def _get_fields_query(self) -> list[FieldQuery]:
 		"""Получает запрашиваемые поля."""
 		raise NotImplementedError()
 
+	@abstractmethod
+	def _get_serializer_document(self) -> RowSerializer:
+		"""Получает сериализатор всех полей строки документа."""
+		raise NotImplementedError()
+
 
 class HandlerPostRequest(HandlerRequestWithAuthentication, ABC):
 	"""Обработчик POST запроса"""
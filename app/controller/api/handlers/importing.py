@@ -0,0 +1,76 @@
+from typing import TypedDict
+from .handler import HandlerRequestWithAuthentication, HandlerResult
+from controller.api.errors import Errors
+from database import db_app_interface
+from controller.service_layer.importing import (IMPORTERS, ErrorImport,
+FormatImport)
+
+
+#Страница, разрешение на которую дает право импорта
+PAGE_IMPORT = '/app/import'
+
+
+class DocumentImport(TypedDict):
+    table: str
+    rows: int
+    seconds: float
+    rows_per_second: int
+
+
+class HandlerRequestImport(HandlerRequestWithAuthentication):
+    """Обработчик запроса на импорт строк в таблицу"""
+
+    _table: str
+    _text: str
+    _format: FormatImport | None
+
+    def __init__(self, table, text, format):
+        super().__init__()
+        self._table = table
+        self._text = text
+        self._format = format
+
+    def handle(self) -> HandlerResult:
+        """Обрабатывает запрос на импорт."""
+        if not self._check_authentication_user():
+            return self._handler_result
+        if not self._check_permit_import():
+            return self._handler_result
+        if self._table not in IMPORTERS:
+            self._set_error_in_handler_result(
+                source=f"/import/{self._table}",
+                error=Errors.NOT_FOUND_PATH
+            )
+            return self._handler_result
+        if self._format is None:
+            self._set_error_in_handler_result(
+                source="Content-Type: ожидается text/csv или "
+                    "application/x-ndjson",
+                error=Errors.BAD_REQUEST
+            )
+            return self._handler_result
+        try:
+            result = IMPORTERS[self._table]().imports(self._text, self._format)
+        except ErrorImport as e:
+            self._set_error_in_handler_result(
+                source=e.source,
+                error=Errors.IMPORT_ERROR
+            )
+            return self._handler_result
+        self._handler_result.document = DocumentImport(**result._asdict())
+        self._handler_result.status_code = 201
+        return self._handler_result
+
+    def _check_permit_import(self) -> bool:
+        """Проверяет разрешение пользователя на импорт. Импорт пишет
+        справочники всех пользователей, поэтому одной аутентификации мало."""
+        if not db_app_interface.get_permit_view_page(
+            user_id=self._authentication_user.user_id,
+            page_uri=PAGE_IMPORT
+        ):
+            self._set_error_in_handler_result(
+                source=PAGE_IMPORT,
+                error=Errors.NO_PERMISSION_RESOURCE
+            )
+            return False
+        return True
@@ -1,5 +1,5 @@
 from typing import TypedDict
-from .handler import HandlerRequestGetAllResources
+from .handler import HandlerRequestGetAllResources, FieldDocument, RowSerializer
 from database.models.type_doc import TypeDoc
 from controller.api import for_api
 
@@ -24,9 +24,34 @@ class DocumentAllTypesDocs(TypedDict):
     rows: list[DocumentTypeDoc]
 
 
+FIELDS_TYPE_DOC: dict[str, FieldDocument] = {
+    'meta': FieldDocument(
+        columns=('id',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/docs/types/{model.id}",
+            type="document management system"
+        )
+    ),
+    'id': FieldDocument(columns=('id',), creates=lambda model, api: model.id),
+    'name': FieldDocument(
+        columns=('name',),
+        creates=lambda model, api: model.name
+    ),
+    'layer': FieldDocument(
+        columns=('layer',),
+        creates=lambda model, api: model.layer
+    ),
+}
+
+SERIALIZER_TYPE_DOC = RowSerializer(FIELDS_TYPE_DOC)
+
+
 class HandlerRequestGetAllTypesDocs(HandlerRequestGetAllResources):
     """Обработчик запроса на получение всех типов документов"""
 
+    _tables = ('types_documents',)
+    _cached = True
+
     def __init__(self):
         super().__init__(cls_orm_model=TypeDoc)
 
@@ -37,14 +62,5 @@ class HandlerRequestGetAllTypesDocs(HandlerRequestGetAllResources):
             type="document management system",
             size=len(orm_models)
         )
-        rows = [
-            DocumentTypeDoc(
-                meta=Meta(
-                    href=for_api.make_href(path=f"/docs/types/{model.id}"),
-                    type="document management system"
-                ),
-                id=model.id,
-                name=model.name,
-                layer=model.layer
-            ) for model in orm_models]
+        rows = SERIALIZER_TYPE_DOC.creates_rows(orm_models)
         return DocumentAllTypesDocs(meta=meta, rows=rows)
@@ -1,10 +1,14 @@
 from pydantic import BaseModel
 from typing import TypedDict
-from .handler import HandlerPostRequest, HandlerResult, HandlerError
+from .handler import (HandlerPostRequest, HandlerResult, HandlerError,
+FieldDocument, RowSerializer)
 from abc import ABC, abstractmethod
 from utilities.validations import ValidationInvitationToken, ValidationPassword
 from controller.api.errors import Errors
 from database import db_auth
+from controller.service_layer.authentication import (
+revokes_verified_cookies_after_commit)
+from database.models.database import db
 from database.models.user import User
 from controller.api import for_api
 from utilities.other import (records_log_user_registration,
@@ -30,6 +34,39 @@ class DocumentUser(TypedDict):
     company: Meta
 
 
+FIELDS_USER: dict[str, FieldDocument] = {
+    'meta': FieldDocument(
+        columns=('id',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/users/{model.id}",
+            type="app users"
+        )
+    ),
+    'id': FieldDocument(columns=('id',), creates=lambda model, api: model.id),
+    'last_name': FieldDocument(
+        columns=('last_name',),
+        creates=lambda model, api: model.last_name
+    ),
+    'first_name': FieldDocument(
+        columns=('first_name',),
+        creates=lambda model, api: model.first_name
+    ),
+    'patronymic': FieldDocument(
+        columns=('patronymic',),
+        creates=lambda model, api: model.patronymic
+    ),
+    'company': FieldDocument(
+        columns=('company_id',),
+        creates=lambda model, api: Meta(
+            href=f"{api}/company/{model.company_id}",
+            type="company"
+        )
+    ),
+}
+
+SERIALIZER_USER = RowSerializer(FIELDS_USER)
+
+
 class HandlerRequestActivationUser(HandlerPostRequest, ABC):
     """Обоработчик запроса на активацию пользователя"""
 
@@ -148,4 +185,6 @@ class HandlerRequestRestoreUser(HandlerRequestActivationUser):
         db_auth.remove_user_authentication(user_id)
         hashed_password = HashingData().calculate_hash(model_data.password)
         db_auth.add_user_authentication(user_id, hashed_password)
+        generation = db_auth.increments_password_generation(user_id)
+        revokes_verified_cookies_after_commit(db.session, user_id, generation)
         records_log_user_restorer(user_id)
@@ -1,8 +1,7 @@
-from typing import Literal, NamedTuple, Iterable
+from typing import Literal, NamedTuple
 from dataclasses import dataclass
+from datetime import date
 import re
-from itertools import groupby
-import operator
 import logging
 
 
@@ -16,14 +15,16 @@ class FieldQuery(NamedTuple):
     operators: Operators            #['=', '!=']
     prefix: str                     #'http://web/bpm/'
     null: bool                      #True
-    type: type                      #int
+    type: type                      #int, str, bool, date
 
 
 class ErrorQueryStringParsing(Exception):
     """Ошибка парсинга строки запроса"""
 
-    def __init__(self, source):
+    def __init__(self, source, position=None):
         self.source = f'Не удалось прочитать: {source}'
+        if position is not None:
+            self.source += f' (позиция {position})'
 
 
 @dataclass
@@ -36,173 +37,175 @@ class LogicCondition:
 LogicConditions = list[LogicCondition]
 
 
+class Token(NamedTuple):
+    """Лексема строки запроса"""
+    kind: Literal['punct', 'operator', 'key', 'value', 'end']
+    text: str                       #'parent'
+    position: int                   #1
+
+
+#Лексемы вне значения. Двухсимвольные операторы проверяются первыми
+_PATTERN_TOKEN = re.compile(
+    r'\s*(?:(?P<punct>[(),;])|(?P<operator>!=|>=|<=|=|>|<)|(?P<key>\w+))'
+)
+#Значение - все до ";" или ")"
+_PATTERN_VALUE = re.compile(r'\s*(?P<value>[^;)]*)')
+_PATTERN_SPACES = re.compile(r'\s*')
+_PATTERN_WORD = re.compile(r'\w')
+#Дата в формате ISO 8601: 2022-12-31
+_PATTERN_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
 class QueryStringParser:
-    """Парсер строки запроса"""
+    """Парсер строки запроса. Грамматика:
+        filter    := group ("," group)*
+        group     := "(" condition (";" condition)* ")"
+        condition := key operator value
+    Группы объединяются через И, условия внутри группы - через ИЛИ."""
 
     _string: str
-    _fields: list[FieldQuery]
+    _fields: dict[str, FieldQuery]
+    _tokens: list[Token]
+    _index: int
 
     def __init__(self, string, fields):
         self._string = string
-        self._fields = fields
+        self._fields = {field.name: field for field in fields}
+        self._tokens = []
+        self._index = 0
 
     def get_list_logic_conditions(self) -> list[LogicConditions]:
         """Получает список логических условий."""
-        self._removes_spaces_in_string()
-        conditions = self._finds_conditions()
-        logging.getLogger('app_logger').debug(f"conditions: {conditions}")
-        separate_conditions = self._separates_conditions(conditions)
-        return list(self._forms_logic_conditions(separate_conditions))
-
-    def _removes_spaces_in_string(self) -> None:
-        """Удаляет пробелы в строке."""
-        self._string.replace(" ", "")
-
-    def _finds_conditions(self) -> list[str]:
-        """Ищет условия внутри скобок."""
-        class Interval(NamedTuple):
-            start: int
-            end: int
-
-        pattern = re.compile(r"(\(.+?\))")
+        self._tokens = self._tokenizes()
+        self._index = 0
+        list_logic_conditions = self._parses_filter()
+        logging.getLogger('app_logger').debug(
+            f"list_logic_conditions: {list_logic_conditions}")
+        return list_logic_conditions
+
+    def _tokenizes(self) -> list[Token]:
+        """Разбивает строку на лексемы за один проход. Пробелы между
+        лексемами пропускаются."""
         text = self._string
-        matchs = re.finditer(pattern, text)
-        intervals = [Interval(match.start(), match.end()) for match in matchs]
-
-        #Ничего не найдено
-        if len(intervals) == 0: raise ErrorQueryStringParsing(source=text)
-
-        #Может быть так: text = ""...(id=2)", interval = от 3 до 9
-        elif len(intervals) == 1:
-            interval = intervals[0]
-            length_interval = interval.end - interval.start
-            if length_interval != len(text):
-                start = interval.start - 1 if interval.start > 0 else 0
-                end = interval.end
-                source = text[0:start] + " " + text[end:len(text)]
-                raise ErrorQueryStringParsing(source)
-            return [text[1:-1]]
-
-        #Может быть так: text = ""...(id=2);(id=3)", intervals = (3,9), (10,16)
-        length_intervals = intervals[-1].end - intervals[0].start
-        if length_intervals != len(text):
-            start = intervals[0].start - 1 if intervals[0].start > 0 else 0
-            end = intervals[-1].end
-            source = text[0:start] + " " + text[end:len(text)]
-            raise ErrorQueryStringParsing(source)
-
-        #Может быть так: text = "(id=2)...(id=3)" или "(id=2);(id=3)"
-        for i in range(1, len(intervals)):
-            prev_interval = intervals[i-1]
-            interval = intervals[i]
-            if (prev_interval.end + 1 != interval.start
-                or text[prev_interval.end] != ","):
-                source = text[prev_interval.end:interval.start]
-                raise ErrorQueryStringParsing(source)
-        return [text[interval.start+1:interval.end-1] for interval in intervals]
-
-    def _separates_conditions(self, conditions: list[str]) -> list[list[str]]:
-        """Отделяет условия по ";"."""
-        return [condition.split(';') for condition in conditions]
-
-    def _forms_logic_conditions(
-        self,
-        separate_conditions: list[list[str]]) -> Iterable[LogicConditions]:
-        """Формирует список логических условий."""
-        for condition in separate_conditions:
-            logic_conditions = []
-            for i, element in enumerate(condition):
-                pars_element = self._parses_element(element)
-                logic_condition = self._creates_logic_condition(pars_element)
-                logic_conditions.append(logic_condition)
-            yield self._groups_logic_сonditions(logic_conditions)
-
-    def _parses_element(self, element: str) -> dict[str, str]:
-        """Парсит разделенный элемент. Райзим исключение если ничего не нашли"""
-        for operator in OPERATORS:
-            pattern = f'(?P<key>\w+)(?P<operator>{operator})(?P<value>.+)'
-            match = re.match(pattern, element)
-            logging.getLogger('app_logger').debug(f"pars_element: {match}")
-            if match is not None:
-                return match.groupdict()
-        raise ErrorQueryStringParsing(element)
+        tokens = []
+        position = 0
+        while True:
+            position = _PATTERN_SPACES.match(text, position).end()
+            if position == len(text):
+                tokens.append(Token('end', "", position))
+                return tokens
+            if tokens and tokens[-1].kind == 'operator':
+                match = _PATTERN_VALUE.match(text, position)
+                tokens.append(
+                    Token('value', match['value'].rstrip(), position))
+                position = match.end()
+                continue
+            match = _PATTERN_TOKEN.match(text, position)
+            if match is None:
+                raise ErrorQueryStringParsing(text[position:], position)
+            tokens.append(
+                Token(match.lastgroup, match[match.lastgroup], position))
+            position = match.end()
+
+    def _takes(self, kind: str, text: str | None = None) -> Token:
+        """Берет следующую лексему. Райзим исключение если лексема другая."""
+        token = self._tokens[self._index]
+        if token.kind != kind or (text is not None and token.text != text):
+            raise ErrorQueryStringParsing(
+                token.text or "конец строки", token.position)
+        self._index += 1
+        return token
+
+    def _is_next(self, text: str) -> bool:
+        """Проверяет, что следующая лексема - знак препинания text."""
+        token = self._tokens[self._index]
+        return token.kind == 'punct' and token.text == text
+
+    def _parses_filter(self) -> list[LogicConditions]:
+        """filter := group ("," group)*"""
+        list_logic_conditions = [self._parses_group()]
+        while self._is_next(","):
+            self._index += 1
+            list_logic_conditions.append(self._parses_group())
+        self._takes('end')
+        return list_logic_conditions
+
+    def _parses_group(self) -> LogicConditions:
+        """group := "(" condition (";" condition)* ")" """
+        self._takes('punct', "(")
+        logic_conditions = [self._parses_condition()]
+        while self._is_next(";"):
+            self._index += 1
+            logic_conditions.append(self._parses_condition())
+        self._takes('punct', ")")
+        return self._groups_logic_сonditions(logic_conditions)
+
+    def _parses_condition(self) -> LogicCondition:
+        """condition := key operator value"""
+        key = self._takes('key')
+        field = self._fields.get(key.text)
+        if field is None:
+            raise ErrorQueryStringParsing(key.text, key.position)
+        operator = self._takes('operator')
+        if operator.text not in field.operators:
+            raise ErrorQueryStringParsing(
+                f"{key.text}{operator.text}", operator.position)
+        value = self._takes('value')
+        logic_condition = self._creates_logic_condition(
+            field, operator.text, value.text)
+        if logic_condition is None:
+            raise ErrorQueryStringParsing(
+                f"{key.text}{operator.text}{value.text}", value.position)
+        return logic_condition
 
     def _creates_logic_condition(
         self,
-        pars_element: dict[str, str]) -> LogicCondition:
-        """Создает логическое условие."""
-        def del_prefix(text, prefix):
-            pattern = f'(?P<prefix>{prefix})(?P<value>\w+)'
-            match = re.match(pattern, text)
-            if match is None: raise ErrorQueryStringParsing(text)
-            return text[len(prefix):]
-
-        key = pars_element["key"]
-        operator = pars_element["operator"]
-        value = pars_element["value"]
-
-        field = None
-        for _field in self._fields:
-            if _field.name == key:
-                field = _field; break
-        if field is None: raise ErrorQueryStringParsing(key)
-
+        field: FieldQuery,
+        operator: str,
+        value: str) -> LogicCondition | None:
+        """Создает логическое условие. None - значение не подходит полю."""
         if field.null and value == "null":
-            return LogicCondition(
-                key=field.name_in_db,
-                operator=operator,
-                value=None
-            )
+            value_in_db = None
         elif field.type == bool and value in ['true', 'false']:
-            return LogicCondition(
-                key=field.name_in_db,
-                operator=operator,
-                value={'true': 1, 'false': 0}[value]
-            )
+            value_in_db = {'true': 1, 'false': 0}[value]
         elif field.type == int and value.isdecimal():
-            return LogicCondition(
-                key=field.name_in_db,
-                operator=operator,
-                value=int(value)
-            )
-        value_without_prefix = del_prefix(value, field.prefix)
-        if field.type == str and value_without_prefix.isdecimal():
-            return LogicCondition(
-                key=field.name_in_db,
-                operator=operator,
-                value=int(value_without_prefix)
-            )
-        elif field.type == str:
-            return LogicCondition(
-                key=field.name_in_db,
-                operator=operator,
-                value=value_without_prefix
-            )
+            value_in_db = int(value)
+        elif field.type == date and _PATTERN_DATE.fullmatch(value):
+            try:
+                value_in_db = date.fromisoformat(value).isoformat()
+            except ValueError:
+                return None
+        elif (field.type == str and value.startswith(field.prefix)
+            and _PATTERN_WORD.match(value, len(field.prefix))):
+            value_without_prefix = value[len(field.prefix):]
+            value_in_db = (int(value_without_prefix)
+                if value_without_prefix.isdecimal() else value_without_prefix)
         else:
-            raise ErrorQueryStringParsing(value)
+            return None
+        return LogicCondition(
+            key=field.name_in_db,
+            operator=operator,
+            value=value_in_db
+        )
 
     def _groups_logic_сonditions(
         self,
-        logic_conditions: LogicConditions) -> list[LogicCondition]:
-        """Группирует логические условия."""
-        sorted_logic_conditions = sorted(
-            logic_conditions,
-            key=lambda logic_condition: logic_condition.key,
-            reverse=True
-        )
+        logic_conditions: LogicConditions) -> LogicConditions:
+        """Группирует условия равенства одного поля в одно условие "in".
+        Остальные условия и сравнение с null остаются как есть."""
+        equalities: dict[str, list] = {}
         grouped_logic_conditions = []
-        for k, g in groupby(sorted_logic_conditions,operator.attrgetter('key')):
-            grouping_list = list(g)
-            if len(grouping_list) > 1:
-                grouped_logic_conditions.append(
-                    LogicCondition(
-                        key=grouping_list[0].key,
-                        operator='in',
-                        value=[obj.value for obj in grouping_list]
-                    )
-                )
+        for logic_condition in logic_conditions:
+            if (logic_condition.operator == '='
+                and logic_condition.value is not None):
+                equalities.setdefault(
+                    logic_condition.key, []).append(logic_condition.value)
             else:
-                grouped_logic_conditions.append(grouping_list[0])
-        logging.getLogger('app_logger').debug(
-            f"grouped_logic_conditions: {grouped_logic_conditions}")
+                grouped_logic_conditions.append(logic_condition)
+        for key, values in equalities.items():
+            grouped_logic_conditions.append(
+                LogicCondition(key=key, operator='=', value=values[0])
+                if len(values) == 1 else
+                LogicCondition(key=key, operator='in', value=values)
+            )
         return grouped_logic_conditions
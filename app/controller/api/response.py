@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
-from .handlers.handler import HandlerRequest
-from flask import typing as flaskTyping
+from typing import Any, Iterable
+from io import StringIO
+import csv
+from .handlers.handler import HandlerRequest, HandlerResult
+from flask import request, typing as flaskTyping
 from controller import common
 
 
@@ -20,24 +23,36 @@ class ResponseJSON(ABC):
 	def _make_json_response(self) -> flaskTyping.ResponseReturnValue:
 		result = self._handler.handle()
 
-		response = {
+		response = (self._get_error_document(result) if not result
+			else result.document)
+		status_code = result.status_code
+		return common.make_json_response(response, status_code)
+
+	def _get_error_document(self, result: HandlerResult) -> dict[str, str]:
+		"""Получает документ ошибки."""
+		return {
 			"source": result.error.source,
 			"type": result.error.type,
 			"message": result.error.message
-		} if not result else result.document
-		status_code = result.status_code
-		return common.make_json_response(response, status_code)
+		}
 
 
 class Response(ResponseJSON):
-	"""Ответ"""
+	"""Ответ. Если у документа есть ETag и он совпал с If-None-Match,
+	отвечает 304 без обработки запроса."""
 
 	def __init__(self, handler):
 		super().__init__(handler)
 
 	def get(self) -> flaskTyping.ResponseReturnValue:
 		"""Получает ответ."""
-		return self._make_json_response()
+		etag = self._handler.get_etag()
+		if etag is not None and request.if_none_match.contains(etag):
+			return common.make_not_modified_response(etag)
+		response_json = self._make_json_response()
+		if etag is not None and response_json.status_code == 200:
+			common.add_etag_to_response(response_json, etag)
+		return response_json
 
 
 class ResponseWithAdditionCookie(ResponseJSON):
@@ -54,3 +69,58 @@ class ResponseWithAdditionCookie(ResponseJSON):
 			cookie_auth = self._handler.get_cookie_auth()
 		)
 		return response_json
+
+
+class ResponseExport(ResponseJSON):
+	"""Ответ - выгрузка строк потоком в NDJSON или CSV. Формат выбирается
+	по заголовку Accept. Строки сериализуются по одной, поэтому память не
+	зависит от размера выгрузки."""
+
+	_filename: str
+
+	def __init__(self, handler, filename):
+		super().__init__(handler)
+		self._filename = filename
+
+	def get(self) -> flaskTyping.ResponseReturnValue:
+		"""Получает ответ."""
+		result = self._handler.handle()
+		if not result:
+			return common.make_json_response(
+				self._get_error_document(result), result.status_code)
+		mimetype = common.get_best_accept_mimetype(
+			['application/x-ndjson', 'text/csv'])
+		if mimetype == 'text/csv':
+			chunks = self._creates_csv(result.document)
+			filename = f"{self._filename}.csv"
+		else:
+			chunks = self._creates_ndjson(result.document)
+			filename = f"{self._filename}.ndjson"
+		return common.make_stream_response(chunks, mimetype, filename)
+
+	def _creates_ndjson(
+		self,
+		rows: Iterable[dict[str, Any]]) -> Iterable[bytes]:
+		"""Создает NDJSON: одна строка - один JSON объект."""
+		for row in rows:
+			yield common.dumps_json(row) + b"\n"
+
+	def _creates_csv(self, rows: Iterable[dict[str, Any]]) -> Iterable[str]:
+		"""Создает CSV. Вложенная ссылка на ресурс записывается своим href,
+		заголовок - по ключам первой строки."""
+		def to_cell(value):
+			if isinstance(value, dict):
+				return value.get('href')
+			if isinstance(value, bool):
+				return 'true' if value else 'false'
+			return value
+
+		buffer = StringIO()
+		writer = csv.writer(buffer)
+		for i, row in enumerate(rows):
+			if i == 0:
+				writer.writerow(row.keys())
+			writer.writerow([to_cell(value) for value in row.values()])
+			yield buffer.getvalue()
+			buffer.seek(0)
+			buffer.truncate(0)
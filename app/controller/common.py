@@ -1,6 +1,46 @@
-from typing import Any
-from flask import (request, typing as flaskTyping, jsonify, make_response,
-render_template)
+from typing import Any, Iterable
+from datetime import date
+import json
+from werkzeug.http import http_date
+from flask import (request, typing as flaskTyping, make_response,
+render_template, Response, stream_with_context, current_app)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+#Вспомогательные функции JSON:
+def _converts_to_json(value: Any) -> Any:
+    """Преобразует значение, которое JSON не поддерживает."""
+    if isinstance(value, date):
+        return http_date(value)
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+def dumps_json(document: Any) -> bytes:
+    """Сериализует документ в JSON. Используется orjson, если он
+    установлен, иначе стандартный json. Формат ответов тот же, что у
+    jsonify: ключи отсортированы, даты - HTTP-date."""
+    if orjson is not None:
+        return orjson.dumps(
+            document,
+            default=_converts_to_json,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    return json.dumps(
+        document,
+        ensure_ascii=False,
+        separators=(',', ':'),
+        sort_keys=True,
+        default=_converts_to_json
+    ).encode()
+
+
+def loads_json(data: bytes | str) -> Any:
+    """Читает JSON. Используется orjson, если он установлен."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 #Вспомогательные функции API Flask:
@@ -13,7 +53,56 @@ def make_json_response(
     document: dict,
     status_code: int) -> flaskTyping.ResponseReturnValue:
     """Делает ответ в формате JSON."""
-    return make_response(jsonify(document), status_code)
+    response = make_response(dumps_json(document), status_code)
+    response.mimetype = 'application/json'
+    return response
+
+def make_not_modified_response(etag: str) -> flaskTyping.ResponseReturnValue:
+    """Делает ответ 304: документ не изменился."""
+    response = Response(status=304)
+    add_etag_to_response(response, etag)
+    return response
+
+def add_etag_to_response(
+    response: flaskTyping.ResponseReturnValue,
+    etag: str) -> None:
+    """Добавляет ETag к ответу. Клиент должен проверять документ при
+    каждом запросе, но может не скачивать его повторно."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+
+def make_stream_response(
+    chunks: Iterable[str | bytes],
+    mimetype: str,
+    filename: str) -> flaskTyping.ResponseReturnValue:
+    """Делает потоковый ответ-файл. Части отдаются по мере создания."""
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename="{filename}"')
+    return response
+
+def dispatches_subrequest(
+    method: str,
+    path: str,
+    body: Any = None) -> flaskTyping.ResponseReturnValue:
+    """Выполняет подзапрос к представлению приложения без HTTP. Подзапрос
+    работает в контексте приложения запроса: общие g и сессия БД. Корень
+    URL и куки берутся из запроса. Хуки before_request и after_request не
+    вызываются, транзакцию фиксирует вызывающий. Ошибки маршрутизации -
+    HTTPException."""
+    with current_app.test_request_context(
+        path,
+        method=method,
+        json=body,
+        base_url=request.url_root,
+        headers={'Cookie': request.headers.get('Cookie', "")}
+    ):
+        return current_app.make_response(current_app.dispatch_request())
+
+def get_best_accept_mimetype(mimetypes: list[str]) -> str:
+    """Получает лучший из предложенных типов по заголовку Accept.
+    Если ни один не подходит - первый."""
+    return request.accept_mimetypes.best_match(mimetypes, default=mimetypes[0])
 
 def template_response(
     template: str,
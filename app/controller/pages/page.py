@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from flask import typing as flaskTyping, request
 from controller import common
-from controller.service_layer.authentication_info import UserAuthenticationInfo
+from controller.service_layer.authentication_info import (
+UserAuthenticationInfo, get_user_authentication_info)
 from typing import Any
 from database import db_app_interface
 from database.models.user import User
@@ -91,7 +92,7 @@ class AppPage(ABC):
 
     def __init__(self, constructor):
         self._constructor = constructor
-        self._authentication_user = UserAuthenticationInfo()
+        self._authentication_user = get_user_authentication_info()
 
     def _forms_response_page(self, **kwargs) -> flaskTyping.ResponseReturnValue:
         """Формирует ответ страницу."""
@@ -1,53 +1,129 @@
 from abc import ABC, abstractmethod
-from .cookies import (CookieError, DataFromCookieSession,
-GetterDataFromCookieSession, DataFromCookieAuth,
-GetterDataFromCookieAuth, CreatorCookieSession, CreatorCookieAuth)
+from hashlib import blake2b
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .cookies import (CookieError, DataFromCookie,
+GetterDataFromCookieSession, GetterDataFromCookieAuth, CreatorCookieSession,
+CreatorCookieAuth)
+from .password_generations import password_generations
 from utilities.other import HashingData, records_log_user_authentication
 from dataclasses import dataclass
 from controller.api.errors import Errors
 from utilities.validations import ValidationEmail, ValidationPassword
 from database import db_auth
+from utilities.cache import LRUCache
 
 
-class GetterUserIDFromCookies(ABC):
-	"""Базовый класс для получения ID пользователя из кук"""
+#Размер и время жизни записей кэша проверенных кук. Счетчик смены пароля
+#сверяется и при попадании в кэш, поэтому другой процесс принимает
+#отозванную куку не дольше PASSWORD_GENERATIONS_TTL, а не сумму двух TTL
+VERIFIED_COOKIES_CACHE_SIZE = 4096
+VERIFIED_COOKIES_CACHE_TTL = 300
 
-	@abstractmethod
-	def get(self, cookie: str | None) -> int | None:
-		"""Получает id пользователя из куки."""
-		raise NotImplementedError()
+#Проверенные куки: (имя куки, дайджест куки) -> данные из куки.
+#Хранится дайджест, а не сама кука
+verified_cookies_cache = LRUCache(
+	maxsize=VERIFIED_COOKIES_CACHE_SIZE, ttl=VERIFIED_COOKIES_CACHE_TTL)
 
+#Ключ session.info: новые счетчики смены пароля пользователей, измененные
+#в транзакции сессии
+_KEY_REVOKED_USERS = 'verified_cookies_revoked_users'
 
-class GetterUserIDFromCookieSession(GetterUserIDFromCookies):
-	"""Класс для получения ID пользователя из куки сессии"""
+
+def revokes_verified_cookies(user_id: int) -> int:
+	"""Удаляет из кэша проверенные куки пользователя. Возвращает число
+	удаленных."""
+	return verified_cookies_cache.clear_if_value(
+		lambda value: value.user_id == user_id)
+
+def revokes_verified_cookies_after_commit(
+	session: Session, user_id: int, generation: int) -> None:
+	"""После фиксации транзакции сессии, когда смена пароля видна другим
+	соединениям, устанавливает новый счетчик смены пароля пользователя и
+	удаляет из кэша его проверенные куки. При откате ничего не меняется."""
+	session.info.setdefault(_KEY_REVOKED_USERS, {})[user_id] = generation
+
+
+@event.listens_for(Session, 'after_commit')
+def revokes_users_cookies(session: Session) -> None:
+	"""Устанавливает новые счетчики смены пароля и удаляет из кэша
+	проверенные куки пользователей, сменивших пароль в транзакции."""
+	for user_id, generation in session.info.pop(_KEY_REVOKED_USERS, {}).items():
+		password_generations.sets(user_id, generation)
+		revokes_verified_cookies(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def forgets_revoked_users(session: Session) -> None:
+	"""Забывает пользователей, сменивших пароль в отмененной транзакции."""
+	session.info.pop(_KEY_REVOKED_USERS, None)
+
+
+class GetterUserIDFromCookies(ABC):
+	"""Базовый класс для получения ID пользователя из кук. Кука - токен с
+	подписью, сроком и счетчиком смены пароля пользователя: проверяется без
+	обращения к БД. Проверенные куки сохраняются в кэше"""
+
+	_name: str
 
 	def get(self, cookie: str | None) -> int | None:
-		"""Получает id пользователя из куки сессии."""
+		"""Получает id пользователя из куки."""
 		if cookie is None:
 			return None
+		key = (self._name, blake2b(cookie.encode(), digest_size=16).digest())
+		data_from_cookie = verified_cookies_cache.get(key)
+		if data_from_cookie is None:
+			data_from_cookie = self.__verifies(cookie)
+			if data_from_cookie is None:
+				return None
+			verified_cookies_cache.set(key, data_from_cookie)
+		#Запись кэша может пережить срок токена и смену пароля
+		elif (data_from_cookie.expires_at <= time.time()
+			or not self.__checks_generation(data_from_cookie)):
+			return None
+		return data_from_cookie.user_id
+
+	def __verifies(self, cookie: str) -> DataFromCookie | None:
+		"""Проверяет куку: подпись, срок и счетчик смены пароля."""
 		try:
-			data_from_cookie_session = GetterDataFromCookieSession().get(cookie)
+			data_from_cookie = self._get_data_from_cookie(cookie)
 		except CookieError:
 			return None
-		if (HashingData().calculate_hash(data_from_cookie_session.user_id) !=
-			data_from_cookie_session.hashed_user_id):
+		if not self.__checks_generation(data_from_cookie):
 			return None
-		return data_from_cookie_session.user_id
+		return data_from_cookie
+
+	@staticmethod
+	def __checks_generation(data_from_cookie: DataFromCookie) -> bool:
+		"""Сверяет счетчик смены пароля из куки со счетчиком в памяти."""
+		return (data_from_cookie.generation ==
+			password_generations.get(data_from_cookie.user_id))
+
+	@abstractmethod
+	def _get_data_from_cookie(self, cookie: str) -> DataFromCookie:
+		"""Получает данные из куки."""
+		raise NotImplementedError()
+
+
+class GetterUserIDFromCookieSession(GetterUserIDFromCookies):
+	"""Класс для получения ID пользователя из куки сессии"""
+
+	_name = "Session"
+
+	def _get_data_from_cookie(self, cookie: str) -> DataFromCookie:
+		"""Получает данные из куки сессии."""
+		return GetterDataFromCookieSession().get(cookie)
 
 
 class GetterUserIDFromCookieAuth(GetterUserIDFromCookies):
 	"""Класс для получения ID пользователя из куки авторизации"""
 
-	def get(self, cookie: str | None) -> int | None:
-		"""Получает id пользователя из куки авторизации."""
-		if cookie is None:
-			return None
-		try:
-			data_from_cookie_auth = GetterDataFromCookieAuth().get(cookie)
-		except CookieError:
-			return None
-		user_id = db_auth.get_user_id(data_from_cookie_auth)
-		return user_id
+	_name = "Auth"
+
+	def _get_data_from_cookie(self, cookie: str) -> DataFromCookie:
+		"""Получает данные из куки авторизации."""
+		return GetterDataFromCookieAuth().get(cookie)
 
 
 class Authentication(ABC):
@@ -90,8 +166,9 @@ class AuthenticationByEmailAndPassword(Authentication):
 		user_id = self.__get_user_id_from_db(hashed_password)
 		if user_id is None:
 			return None
-		self.__set_cookie_session(user_id)
-		self.__set_cookie_auth(hashed_password)
+		generation = password_generations.loads(user_id)
+		self.__set_cookie_session(user_id, generation)
+		self.__set_cookie_auth(user_id, generation)
 		records_log_user_authentication(user_id, type_auth='Email&Password')
 		return user_id
 
@@ -127,18 +204,18 @@ class AuthenticationByEmailAndPassword(Authentication):
 			)
 		return user_id
 
-	def __set_cookie_session(self, user_id: int) -> None:
+	def __set_cookie_session(self, user_id: int, generation: int) -> None:
 		"""Устанавливает куки сессии."""
-		self.__cookie_session = CreatorCookieSession().creates(user_id)
+		self.__cookie_session = CreatorCookieSession().creates(
+			user_id, generation)
 
 	def get_cookie_session(self) -> str | None:
 		"""Получает куки сессии."""
 		return self.__cookie_session
 
-	def __set_cookie_auth(self, hashed_password: str) -> None:
+	def __set_cookie_auth(self, user_id: int, generation: int) -> None:
 		"""Устанавливает куки авторизации."""
-		self.__cookie_auth = CreatorCookieAuth().creates(
-			self.__email, hashed_password)
+		self.__cookie_auth = CreatorCookieAuth().creates(user_id, generation)
 
 	def get_cookie_auth(self) -> str | None:
 		"""Получает куки авторизации."""
@@ -190,8 +267,10 @@ class AuthenticationByCookieAuth(Authentication):
 		return user_id
 
 	def __set_cookie_session(self, user_id: int) -> None:
-		"""Устанавливает куки сессии."""
-		self.__cookie_session = CreatorCookieSession().creates(user_id)
+		"""Устанавливает куки сессии. Кука авторизации только что проверена:
+		счетчик смены пароля берется из памяти."""
+		self.__cookie_session = CreatorCookieSession().creates(
+			user_id, password_generations.get(user_id))
 
 	def get_cookie_session(self) -> str | None:
 		"""Получает куки сессии."""
@@ -222,8 +301,10 @@ class AuthenticationByCookies(Authentication):
 		return user_id_from_cookie_auth
 
 	def __set_cookie_session(self, user_id: int) -> None:
-		"""Устанавливает куки сессии."""
-		self.__cookie_session = CreatorCookieSession().creates(user_id)
+		"""Устанавливает куки сессии. Кука авторизации только что проверена:
+		счетчик смены пароля берется из памяти."""
+		self.__cookie_session = CreatorCookieSession().creates(
+			user_id, password_generations.get(user_id))
 
 	def get_cookie_session(self) -> str | None:
 		"""Получает куки сессии."""
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from flask import g, request
 from .authentication import AuthenticationByCookies
 from controller import common
 
@@ -24,3 +25,23 @@ class UserAuthenticationInfo:
     def __bool__(self) -> bool:
         """Проверка на наличие пользователя."""
         return self.user_id is not None
+
+
+def get_user_authentication_info() -> UserAuthenticationInfo:
+    """Получает информацию об аутентификации пользователя запроса. Куки
+    проверяются один раз на контекст приложения: подзапросы пакетного
+    запроса выполняются в нем же и берут результат из g. Результат
+    привязан к значениям кук."""
+    cookies = (common.get_cookie("Session"), common.get_cookie("Auth"))
+    cached = g.get('user_authentication_info')
+    if cached is None or cached[0] != cookies:
+        cached = (cookies, UserAuthenticationInfo())
+        g.user_authentication_info = cached
+    return cached[1]
+
+def authenticates_request() -> None:
+    """Аутентифицирует пользователя до обработки запроса. Обработчики,
+    страницы и ответы берут результат из g. Статика не аутентифицируется."""
+    if request.endpoint == 'static':
+        return
+    get_user_authentication_info()
@@ -1,66 +1,102 @@
 from typing import NamedTuple
-from utilities.other import HashingData, encrypts_data, decrypts_data
+import time
+from itsdangerous import URLSafeSerializer, BadData
+from app import app
 
 
 class CookieError(Exception):
 	pass
 
 
+#Время жизни токенов кук, секунды. Токен авторизации живет столько же,
+#сколько кука авторизации
+LIFETIME_TOKEN_SESSION = 60*60*24
+LIFETIME_TOKEN_AUTH = 60*60*24*30
+
+
+class DataFromCookie(NamedTuple):
+	user_id: int                    #1
+	issued_at: int                  #1700000000
+	expires_at: int                 #1700086400
+	generation: int                 #0, счетчик смены пароля пользователя
+
+
+class SerializerToken:
+	"""Сериализатор подписанного токена куки. Токен - данные в JSON и
+	подпись HMAC, проверяется без обращения к БД. Соль отделяет токены
+	разных кук: токен сессии не подходит как токен авторизации"""
+
+	__serializer: URLSafeSerializer
+	__lifetime: int
+
+	def __init__(self, salt, lifetime):
+		self.__serializer = URLSafeSerializer(
+			app.config['SECRET_KEY'], salt=salt)
+		self.__lifetime = lifetime
+
+	def dumps(self, user_id: int, generation: int) -> str:
+		"""Создает токен."""
+		issued_at = int(time.time())
+		return self.__serializer.dumps({
+			"uid": user_id,
+			"iat": issued_at,
+			"exp": issued_at + self.__lifetime,
+			"gen": generation
+		})
+
+	def loads(self, token: str) -> DataFromCookie:
+		"""Проверяет подпись и срок токена. Получает данные из токена."""
+		try:
+			data = self.__serializer.loads(token)
+			data_from_cookie = DataFromCookie(
+				user_id=int(data["uid"]),
+				issued_at=int(data["iat"]),
+				expires_at=int(data["exp"]),
+				generation=int(data["gen"])
+			)
+		except (BadData, TypeError, KeyError, ValueError):
+			raise CookieError
+		if data_from_cookie.expires_at <= time.time(): raise CookieError
+		return data_from_cookie
+
+
+_serializer_session = SerializerToken(
+	salt="cookie-session", lifetime=LIFETIME_TOKEN_SESSION)
+_serializer_auth = SerializerToken(
+	salt="cookie-auth", lifetime=LIFETIME_TOKEN_AUTH)
+
+
 class CreatorCookieSession():
 	"""Создатель куки сессии"""
 
 	@staticmethod
-	def creates(user_id: int) -> str:
+	def creates(user_id: int, generation: int) -> str:
 		"""Создает куку сессии."""
-		hashed_user_id = HashingData().calculate_hash(user_id)
-		data_format_for_encryption = f'{user_id}.{hashed_user_id}'
-		data_encryption = encrypts_data(data_format_for_encryption)
-		return data_encryption
+		return _serializer_session.dumps(user_id, generation)
 
 
 class CreatorCookieAuth():
 	"""Создатель куки авторизации"""
 
 	@staticmethod
-	def creates(email: str, hashed_password: str) -> str:
+	def creates(user_id: int, generation: int) -> str:
 		"""Создает куку авторизации."""
-		data_format_for_encryption = f'{email}&{hashed_password}'
-		data_encryption = encrypts_data(data_format_for_encryption)
-		return data_encryption
-
-
-class DataFromCookieSession(NamedTuple):
-	user_id: int
-	hashed_user_id: str
+		return _serializer_auth.dumps(user_id, generation)
 
 
 class GetterDataFromCookieSession():
 	"""Получатель данных из куки сессии"""
 
 	@staticmethod
-	def get(cookie: str) -> DataFromCookieSession:
+	def get(cookie: str) -> DataFromCookie:
 		"""Получает данные из куки сессии."""
-		data_decryption = decrypts_data(cookie)
-		split_data_decryption = data_decryption.split('.')
-		if len(split_data_decryption) != 2: raise CookieError
-		user_id = int(split_data_decryption[0])
-		hashed_user_id = split_data_decryption[1]
-		return DataFromCookieSession(user_id, hashed_user_id)
-
-
-class DataFromCookieAuth(NamedTuple):
-	email: str
-	hashed_password: str
+		return _serializer_session.loads(cookie)
 
 
 class GetterDataFromCookieAuth():
 	"""Получатель данных из куки авторизации"""
 
 	@staticmethod
-	def get(cookie: str) -> DataFromCookieAuth:
+	def get(cookie: str) -> DataFromCookie:
 		"""Получает данные из куки авторизации."""
-		data_decryption = decrypts_data(cookie)
-		split_data_decryption = tuple(data_decryption.split('&'))
-		if len(split_data_decryption) != 2: raise CookieError
-		email, hashed_password = split_data_decryption
-		return DataFromCookieAuth(email, hashed_password)
+		return _serializer_auth.loads(cookie)
@@ -0,0 +1,245 @@
+from abc import ABC, abstractmethod
+from typing import Any, Literal, NamedTuple
+from io import StringIO
+import csv
+import json
+import sqlite3
+import time
+from pydantic import BaseModel, ValidationError, constr, validator
+from database import db_import
+from database.models.database import db
+from . import reference_cache
+
+
+FormatImport = Literal['csv', 'ndjson']
+
+
+class ErrorImport(Exception):
+    """Ошибка импорта"""
+
+    def __init__(self, source):
+        self.source = source
+
+
+class ResultImport(NamedTuple):
+    """Результат импорта"""
+    table: str                      #'bpm'
+    rows: int                       #250
+    seconds: float                  #0.04
+    rows_per_second: int            #6250
+
+
+def reads_rows(text: str, format: FormatImport) -> list[dict[str, Any]]:
+    """Читает строки CSV (первая строка - заголовок) или NDJSON (одна
+    строка - один JSON объект)."""
+    if format == 'csv':
+        return [
+            {key: value if value != "" else None for key, value in row.items()}
+            for row in csv.DictReader(StringIO(text))
+        ]
+    rows = []
+    for i, line in enumerate(text.splitlines(), start=1):
+        if line.strip() == "":
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            raise ErrorImport(f"Строка {i}: некорректный JSON")
+        if not isinstance(row, dict):
+            raise ErrorImport(f"Строка {i}: ожидается JSON объект")
+        rows.append(row)
+    return rows
+
+
+class ModelImportCompany(BaseModel):
+    name: constr(strip_whitespace=True, min_length=1)
+
+class ModelImportTypeDoc(BaseModel):
+    name: constr(strip_whitespace=True, min_length=1)
+    abv: constr(strip_whitespace=True, min_length=1)
+    layer: Literal['in', 'out']
+
+class ModelImportBpm(BaseModel):
+    code: constr(strip_whitespace=True, min_length=1)
+    name: constr(strip_whitespace=True, min_length=1)
+    company: int
+    owner: int | None = None
+    parent: str | None = None       #Код родителя
+
+    @validator('parent')
+    def check_parent(cls, parent):
+        if parent is None or parent.strip() == "":
+            return None
+        return parent.strip()
+
+
+class Importer(ABC):
+    """Импорт строк в таблицу. Строки проверяются в памяти целиком и
+    вставляются одной транзакцией: ошибка в любой строке отменяет импорт."""
+
+    _table: str
+    _model: type[BaseModel]
+
+    def imports(self, text: str, format: FormatImport) -> ResultImport:
+        """Импортирует строки."""
+        start = time.perf_counter()
+        models = self._validates_rows(reads_rows(text, format))
+        if len(models) == 0:
+            raise ErrorImport("Нет строк для импорта")
+        self._checks_models(models)
+        try:
+            self._inserts(models)
+        except sqlite3.IntegrityError as e:
+            raise ErrorImport(f"Ошибка записи: {e}")
+        reference_cache.invalidates_after_commit(db.session, self._table)
+        seconds = time.perf_counter() - start
+        return ResultImport(
+            table=self._table,
+            rows=len(models),
+            seconds=round(seconds, 3),
+            rows_per_second=int(len(models) / seconds) if seconds else 0
+        )
+
+    def _validates_rows(self, rows: list[dict[str, Any]]) -> list[BaseModel]:
+        """Проверяет строки моделью. Номер строки - с единицы, без
+        заголовка."""
+        models = []
+        for i, row in enumerate(rows, start=1):
+            try:
+                models.append(self._model(**row))
+            except ValidationError as e:
+                fields = [str(error['loc'][0]) for error in e.errors()]
+                raise ErrorImport(f"Строка {i}: некорректные поля {fields}")
+        return models
+
+    def _checks_unique(self, values: list[str], existing: set[str],
+        name: str) -> None:
+        """Проверяет уникальность значений в файле и в БД."""
+        seen = set()
+        for i, value in enumerate(values, start=1):
+            if value in seen or value in existing:
+                raise ErrorImport(f"Строка {i}: {name} {value} уже есть")
+            seen.add(value)
+
+    def _checks_models(self, models: list[BaseModel]) -> None:
+        """Проверяет ссылки и уникальность значений."""
+        return
+
+    @abstractmethod
+    def _inserts(self, models: list[BaseModel]) -> None:
+        """Вставляет строки в БД."""
+        raise NotImplementedError()
+
+
+class ImporterCompany(Importer):
+    """Импорт компаний"""
+
+    _table = 'company'
+    _model = ModelImportCompany
+
+    def _inserts(self, models: list[ModelImportCompany]) -> None:
+        """Вставляет строки в БД."""
+        db_import.imports_company([
+            db_import.DataForImportCompany(name=model.name)
+            for model in models])
+
+
+class ImporterTypesDocs(Importer):
+    """Импорт типов документов"""
+
+    _table = 'types_documents'
+    _model = ModelImportTypeDoc
+
+    def _checks_models(self, models: list[ModelImportTypeDoc]) -> None:
+        """Проверяет уникальность названий и аббревиатур."""
+        names, abvs = db_import.get_types_docs()
+        self._checks_unique([model.name for model in models], names, "name")
+        self._checks_unique([model.abv for model in models], abvs, "abv")
+
+    def _inserts(self, models: list[ModelImportTypeDoc]) -> None:
+        """Вставляет строки в БД."""
+        db_import.imports_types_docs([
+            db_import.DataForImportTypeDoc(
+                name=model.name,
+                abv=model.abv,
+                layer=model.layer
+            ) for model in models])
+
+
+class ImporterBpm(Importer):
+    """Импорт бизнес процессов. Родитель задается кодом: процессом из
+    этого же файла или уже существующим."""
+
+    _table = 'bpm'
+    _model = ModelImportBpm
+    _levels: dict[str, int]
+
+    def _checks_models(self, models: list[ModelImportBpm]) -> None:
+        """Проверяет коды, компании, владельцев и родителей. Уровни
+        вычисляются по дереву в памяти, циклы не допускаются."""
+        levels_in_db = db_import.get_levels_bpm()
+        self._checks_unique(
+            [model.code for model in models], set(levels_in_db), "code")
+        ids_company = db_import.get_ids_company()
+        ids_users = db_import.get_ids_users()
+        positions = {model.code: i for i, model in enumerate(models, start=1)}
+        for i, model in enumerate(models, start=1):
+            if model.company not in ids_company:
+                raise ErrorImport(
+                    f"Строка {i}: компания {model.company} не найдена")
+            if model.owner is not None and model.owner not in ids_users:
+                raise ErrorImport(
+                    f"Строка {i}: пользователь {model.owner} не найден")
+            if (model.parent is not None and model.parent not in positions
+                and levels_in_db.get(model.parent) is None):
+                raise ErrorImport(
+                    f"Строка {i}: родитель {model.parent} не найден "
+                    "или его код не уникален")
+        self._levels = {}
+        parents = {model.code: model.parent for model in models}
+        for model in models:
+            self._gets_level(model.code, parents, levels_in_db, positions)
+
+    def _gets_level(self, code: str, parents: dict[str, str | None],
+        levels_in_db: dict[str, int | None],
+        positions: dict[str, int]) -> int:
+        """Получает уровень процесса из файла. Путь к корню проходится
+        один раз: уровни запоминаются."""
+        path, visited = [], set()
+        while code in parents and code not in self._levels:
+            if code in visited:
+                raise ErrorImport(
+                    f"Строка {positions[code]}: цикл в дереве процессов")
+            path.append(code)
+            visited.add(code)
+            code = parents[code]
+        if code is None:
+            level = 0
+        elif code in self._levels:
+            level = self._levels[code]
+        else:
+            level = levels_in_db[code]
+        for code in reversed(path):
+            level += 1
+            self._levels[code] = level
+        return level
+
+    def _inserts(self, models: list[ModelImportBpm]) -> None:
+        """Вставляет строки в БД от корней к листьям."""
+        ordered = sorted(models, key=lambda model: self._levels[model.code])
+        db_import.imports_bpm([
+            db_import.DataForImportBpm(
+                code=model.code,
+                name=model.name,
+                lvl=self._levels[model.code],
+                id_company=model.company,
+                id_owner=model.owner,
+                code_parent=model.parent
+            ) for model in ordered])
+
+
+IMPORTERS: dict[str, type[Importer]] = {
+    'company': ImporterCompany,
+    'types_documents': ImporterTypesDocs,
+    'bpm': ImporterBpm,
+}
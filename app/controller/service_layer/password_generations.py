@@ -0,0 +1,68 @@
+from typing import NamedTuple
+import threading
+import time
+from database import db_auth
+
+
+#Время, после которого счетчик пользователя перечитывается из БД. За это
+#время процесс узнает о смене пароля в другом процессе: куки, выданные до
+#смены пароля, принимаются другими процессами не дольше этого времени
+PASSWORD_GENERATIONS_TTL = 300
+
+
+class _Generation(NamedTuple):
+	generation: int | None          #0, None - пользователя нет
+	loaded_at: float                #момент чтения из БД, time.monotonic()
+
+
+class PasswordGenerations:
+	"""Счетчики смены пароля пользователей в памяти процесса. Проверка
+	токена куки сверяет с ними счетчик из токена без обращения к БД.
+	Счетчик каждого пользователя читается из БД отдельно одной строкой:
+	при первом обращении и по истечении ttl. Отсутствие пользователя тоже
+	запоминается на ttl. Потокобезопасен."""
+
+	__ttl: float
+	#id пользователя -> счетчик
+	__generations: dict[int, _Generation]
+
+	def __init__(self, ttl):
+		self.__ttl = ttl
+		self.__generations = {}
+		self.__lock = threading.Lock()
+
+	def get(self, user_id: int) -> int | None:
+		"""Получает счетчик пользователя. None - пользователя нет."""
+		with self.__lock:
+			entry = self.__generations.get(user_id)
+		if (entry is not None
+			and time.monotonic() - entry.loaded_at < self.__ttl):
+			return entry.generation
+		return self.loads(user_id)
+
+	def loads(self, user_id: int) -> int | None:
+		"""Читает счетчик пользователя из БД. Используется и при входе по
+		паролю: выданный токен не должен зависеть от устаревшего счетчика.
+		БД читается вне блокировки: другие пользователи не ждут."""
+		generation = db_auth.get_password_generation(user_id)
+		with self.__lock:
+			entry = self.__generations.get(user_id)
+			#Счетчик только растет: параллельное чтение не вернет старый
+			if (entry is not None and entry.generation is not None
+				and generation is not None and generation < entry.generation):
+				generation = entry.generation
+			self.__generations[user_id] = _Generation(
+				generation, time.monotonic())
+		return generation
+
+	def sets(self, user_id: int, generation: int) -> None:
+		"""Устанавливает счетчик пользователя. Счетчик только растет."""
+		with self.__lock:
+			entry = self.__generations.get(user_id)
+			if (entry is None or entry.generation is None
+				or generation > entry.generation):
+				self.__generations[user_id] = _Generation(
+					generation, time.monotonic())
+
+
+password_generations = PasswordGenerations(ttl=PASSWORD_GENERATIONS_TTL)
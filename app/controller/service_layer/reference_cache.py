@@ -0,0 +1,101 @@
+from typing import Any, Callable
+import logging
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import db_table_versions
+from utilities.cache import LRUCache
+
+
+#Размер и время жизни записей кэша справочных данных
+REFERENCE_CACHE_SIZE = 512
+REFERENCE_CACHE_TTL = 300
+#Время жизни счетчиков изменений таблиц. Запись в этом процессе сбрасывает
+#их при фиксации, запись из другого процесса видна не позже этого времени
+VERSIONS_TTL = 1
+
+#Документы справочных данных:
+#((таблица, ...), url запроса, счетчики изменений таблиц) -> документ
+reference_cache = LRUCache(
+    maxsize=REFERENCE_CACHE_SIZE, ttl=REFERENCE_CACHE_TTL)
+
+#Счетчики изменений таблиц: (таблица, ...) -> {таблица: счетчик}
+versions_cache = LRUCache(maxsize=REFERENCE_CACHE_SIZE, ttl=VERSIONS_TTL)
+
+#Ключ session.info: таблицы, измененные в транзакции сессии
+_KEY_CHANGED_TABLES = 'reference_cache_changed_tables'
+#Ключ session.info: соединение транзакции и число изменений в нем при ее
+#начале
+_KEY_TOTAL_CHANGES = 'reference_cache_total_changes'
+#Ключ session.info: транзакция изменила строки
+_KEY_CHANGED = 'reference_cache_changed'
+
+
+def get_or_creates(
+    tables: tuple[str, ...],
+    url: str,
+    versions: tuple[tuple[str, int], ...],
+    creates: Callable[[], Any]) -> Any:
+    """Получает документ из кэша. Если документа нет - создает его."""
+    return reference_cache.get_or_creates((tables, url, versions), creates)
+
+def get_versions_tables(tables: tuple[str, ...]) -> dict[str, int]:
+    """Получает счетчики изменений таблиц. Читаются из БД не чаще раза в
+    VERSIONS_TTL: попадание в кэш документов не обращается к БД."""
+    return versions_cache.get_or_creates(
+        tables, lambda: db_table_versions.get_versions_tables(tables))
+
+def invalidates(*tables: str) -> int:
+    """Удаляет документы таблиц из кэша. Возвращает число удаленных."""
+    return reference_cache.clear_if(
+        lambda key: any(table in key[0] for table in tables))
+
+def invalidates_after_commit(session: Session, *tables: str) -> None:
+    """Удаляет документы таблиц из кэша после фиксации транзакции сессии:
+    старые документы освобождают место сразу, не дожидаясь вытеснения.
+    При откате кэш не меняется."""
+    session.info.setdefault(_KEY_CHANGED_TABLES, set()).update(tables)
+
+
+@event.listens_for(Session, 'after_begin')
+def remembers_total_changes(
+    session: Session,
+    transaction,
+    connection) -> None:
+    """Запоминает число изменений в соединении транзакции. Счетчик
+    sqlite3 учитывает любую запись: ORM, сырой SQL и триггеры."""
+    connection_dbapi = connection.connection
+    session.info[_KEY_TOTAL_CHANGES] = (
+        connection_dbapi, connection_dbapi.total_changes)
+
+
+@event.listens_for(Session, 'before_commit')
+def checks_total_changes(session: Session) -> None:
+    """Отмечает транзакцию, изменившую строки."""
+    total_changes = session.info.pop(_KEY_TOTAL_CHANGES, None)
+    if total_changes is not None:
+        connection_dbapi, count = total_changes
+        if connection_dbapi.total_changes != count:
+            session.info[_KEY_CHANGED] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidates_changed_tables(session: Session) -> None:
+    """Сбрасывает счетчики изменений таблиц после записи: следующий
+    запрос прочитает новые и не возьмет из кэша устаревший документ.
+    Удаляет из кэша документы таблиц, измененных в транзакции."""
+    if session.info.pop(_KEY_CHANGED, False):
+        versions_cache.clear()
+    tables = session.info.pop(_KEY_CHANGED_TABLES, None)
+    if tables:
+        removed = invalidates(*tables)
+        logging.getLogger('app_logger').info(
+            f"REFERENCE CACHE {sorted(tables)}: удалено {removed}, "
+            f"{reference_cache.get_info()}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def forgets_changed_tables(session: Session) -> None:
+    """Забывает таблицы, измененные в отмененной транзакции."""
+    session.info.pop(_KEY_CHANGED_TABLES, None)
+    session.info.pop(_KEY_TOTAL_CHANGES, None)
+    session.info.pop(_KEY_CHANGED, None)
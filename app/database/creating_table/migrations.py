@@ -0,0 +1,711 @@
+from typing import NamedTuple
+import sqlite3
+import logging
+
+
+class Migration(NamedTuple):
+	"""Миграция схемы БД"""
+	version: int                    #1
+	name: str                       #'indexes_auth'
+	script: str                     #'CREATE INDEX ...;'
+
+
+#Версия схемы хранится в PRAGMA user_version. Новые миграции добавляются
+#только в конец списка со следующим номером.
+MIGRATIONS = [
+	Migration(
+		version=1,
+		name='indexes_auth',
+		script="""
+			CREATE INDEX IF NOT EXISTS ix_invitation_tokens_invitation_token
+			ON invitation_tokens (invitation_token);
+
+			CREATE INDEX IF NOT EXISTS ix_users_email
+			ON users (email);
+
+			CREATE INDEX IF NOT EXISTS ix_user_authorization_user_id
+			ON user_authorization (user_id);
+
+			CREATE INDEX IF NOT EXISTS ix_permit_view_page_user_id_page_id
+			ON permit_view_page (user_id, page_id);
+		"""
+	),
+	Migration(
+		version=2,
+		name='indexes_docs',
+		script="""
+			CREATE INDEX IF NOT EXISTS ix_code_documents_bpm_type_company
+			ON code_documents (id_bpm, id_type_doc, id_company);
+
+			CREATE INDEX IF NOT EXISTS ix_code_documents_id_creator
+			ON code_documents (id_creator);
+
+			CREATE INDEX IF NOT EXISTS ix_documents_id_code_doc
+			ON documents (id_code_doc);
+
+			CREATE INDEX IF NOT EXISTS ix_documents_id_creator
+			ON documents (id_creator);
+
+			CREATE INDEX IF NOT EXISTS ix_documents_id_responsible
+			ON documents (id_responsible);
+
+			CREATE INDEX IF NOT EXISTS ix_documents_actual
+			ON documents (actual);
+		"""
+	),
+	Migration(
+		version=3,
+		name='code_documents_sequence',
+		script="""
+			CREATE TABLE code_documents_sequence (
+				id_bpm INTEGER NOT NULL,
+				id_type_doc INTEGER NOT NULL,
+				id_company INTEGER NOT NULL,
+				last_number INTEGER NOT NULL,
+				PRIMARY KEY (id_bpm, id_type_doc, id_company)
+			) WITHOUT ROWID;
+
+			--Повторно выданные номера получают новые номера после последнего
+			CREATE TEMP TABLE code_documents_renumbering AS
+			SELECT
+				d.id as id,
+				(
+					SELECT max(c.number)
+					FROM code_documents as c
+					WHERE
+						c.id_bpm = d.id_bpm and
+						c.id_type_doc = d.id_type_doc and
+						c.id_company = d.id_company
+				) + ROW_NUMBER() OVER (
+					PARTITION BY d.id_bpm, d.id_type_doc, d.id_company
+					ORDER BY d.id
+				) as number
+			FROM (
+				SELECT
+					id, id_bpm, id_type_doc, id_company,
+					ROW_NUMBER() OVER (
+						PARTITION BY id_bpm, id_type_doc, id_company, number
+						ORDER BY used DESC, id
+					) as duplicate
+				FROM code_documents
+			) as d
+			WHERE d.duplicate > 1;
+
+			UPDATE code_documents
+			SET number = (
+				SELECT r.number
+				FROM temp.code_documents_renumbering as r
+				WHERE r.id = code_documents.id
+			)
+			WHERE id IN (SELECT id FROM temp.code_documents_renumbering);
+
+			DROP TABLE temp.code_documents_renumbering;
+
+			INSERT INTO code_documents_sequence
+			(id_bpm, id_type_doc, id_company, last_number)
+			SELECT id_bpm, id_type_doc, id_company, max(number)
+			FROM code_documents
+			GROUP BY id_bpm, id_type_doc, id_company;
+
+			DROP INDEX IF EXISTS ix_code_documents_bpm_type_company;
+
+			CREATE UNIQUE INDEX ux_code_documents_code
+			ON code_documents (id_bpm, id_type_doc, id_company, number);
+		"""
+	),
+	Migration(
+		version=4,
+		name='documents_fullname',
+		script="""
+			--Код документа и полное имя хранятся денормализованно и
+			--поддерживаются триггерами, чтобы чтение шло без соединений.
+			ALTER TABLE code_documents ADD COLUMN code TEXT NULL;
+			ALTER TABLE documents ADD COLUMN fullname TEXT NULL;
+
+			UPDATE code_documents
+			SET code = (
+				SELECT b.code || '-' || t.abv || code_documents.number
+				FROM bpm as b, types_documents as t
+				WHERE
+					b.id = code_documents.id_bpm and
+					t.id = code_documents.id_type_doc
+			);
+
+			UPDATE documents
+			SET fullname = (
+				SELECT c.code || ' ' || t.name || ': ' || documents.name
+				FROM code_documents as c
+				JOIN types_documents as t ON t.id = c.id_type_doc
+				WHERE c.id = documents.id_code_doc
+			);
+
+			CREATE TRIGGER tr_code_documents_code_insert
+			AFTER INSERT ON code_documents
+			BEGIN
+				UPDATE code_documents
+				SET code = (
+					SELECT b.code || '-' || t.abv || NEW.number
+					FROM bpm as b, types_documents as t
+					WHERE b.id = NEW.id_bpm and t.id = NEW.id_type_doc
+				)
+				WHERE id = NEW.id;
+			END;
+
+			CREATE TRIGGER tr_code_documents_code_update
+			AFTER UPDATE OF id_bpm, id_type_doc, number ON code_documents
+			BEGIN
+				UPDATE code_documents
+				SET code = (
+					SELECT b.code || '-' || t.abv || NEW.number
+					FROM bpm as b, types_documents as t
+					WHERE b.id = NEW.id_bpm and t.id = NEW.id_type_doc
+				)
+				WHERE id = NEW.id;
+			END;
+
+			CREATE TRIGGER tr_code_documents_fullname_update
+			AFTER UPDATE OF code ON code_documents
+			BEGIN
+				UPDATE documents
+				SET fullname = (
+					SELECT NEW.code || ' ' || t.name || ': ' || documents.name
+					FROM types_documents as t
+					WHERE t.id = NEW.id_type_doc
+				)
+				WHERE id_code_doc = NEW.id;
+			END;
+
+			CREATE TRIGGER tr_bpm_code_update
+			AFTER UPDATE OF code ON bpm
+			BEGIN
+				UPDATE code_documents
+				SET code = (
+					SELECT NEW.code || '-' || t.abv || code_documents.number
+					FROM types_documents as t
+					WHERE t.id = code_documents.id_type_doc
+				)
+				WHERE id_bpm = NEW.id;
+			END;
+
+			CREATE TRIGGER tr_types_documents_code_update
+			AFTER UPDATE OF abv, name ON types_documents
+			BEGIN
+				UPDATE code_documents
+				SET code = (
+					SELECT b.code || '-' || NEW.abv || code_documents.number
+					FROM bpm as b
+					WHERE b.id = code_documents.id_bpm
+				)
+				WHERE id_type_doc = NEW.id;
+			END;
+
+			CREATE TRIGGER tr_documents_fullname_insert
+			AFTER INSERT ON documents
+			BEGIN
+				UPDATE documents
+				SET fullname = (
+					SELECT c.code || ' ' || t.name || ': ' || NEW.name
+					FROM code_documents as c
+					JOIN types_documents as t ON t.id = c.id_type_doc
+					WHERE c.id = NEW.id_code_doc
+				)
+				WHERE id = NEW.id;
+			END;
+
+			CREATE TRIGGER tr_documents_fullname_update
+			AFTER UPDATE OF name, id_code_doc ON documents
+			BEGIN
+				UPDATE documents
+				SET fullname = (
+					SELECT c.code || ' ' || t.name || ': ' || NEW.name
+					FROM code_documents as c
+					JOIN types_documents as t ON t.id = c.id_type_doc
+					WHERE c.id = NEW.id_code_doc
+				)
+				WHERE id = NEW.id;
+			END;
+		"""
+	),
+	Migration(
+		version=5,
+		name='documents_dates',
+		script="""
+			--Даты хранятся как TEXT в формате ISO 8601 (YYYY-MM-DD): такая
+			--строка сортируется как дата, и по ней работает индекс.
+			UPDATE documents
+			SET date_start = substr(date_start, 7, 4) || '-' ||
+				substr(date_start, 4, 2) || '-' || substr(date_start, 1, 2)
+			WHERE date_start GLOB '[0-9][0-9].[0-9][0-9].[0-9][0-9][0-9][0-9]';
+
+			UPDATE documents
+			SET date_finish = substr(date_finish, 7, 4) || '-' ||
+				substr(date_finish, 4, 2) || '-' || substr(date_finish, 1, 2)
+			WHERE date_finish GLOB '[0-9][0-9].[0-9][0-9].[0-9][0-9][0-9][0-9]';
+
+			UPDATE documents
+			SET
+				date_start = coalesce(date(date_start), date_start),
+				date_finish = coalesce(date(date_finish), date_finish);
+
+			CREATE TRIGGER tr_documents_dates_insert
+			BEFORE INSERT ON documents
+			WHEN
+				date(NEW.date_start) IS NOT NEW.date_start or
+				date(NEW.date_finish) IS NOT NEW.date_finish
+			BEGIN
+				SELECT RAISE(ABORT, 'date must be YYYY-MM-DD');
+			END;
+
+			CREATE TRIGGER tr_documents_dates_update
+			BEFORE UPDATE OF date_start, date_finish ON documents
+			WHEN
+				date(NEW.date_start) IS NOT NEW.date_start or
+				date(NEW.date_finish) IS NOT NEW.date_finish
+			BEGIN
+				SELECT RAISE(ABORT, 'date must be YYYY-MM-DD');
+			END;
+
+			CREATE INDEX IF NOT EXISTS ix_documents_date_start
+			ON documents (date_start);
+
+			CREATE INDEX IF NOT EXISTS ix_documents_date_finish
+			ON documents (date_finish);
+		"""
+	),
+	Migration(
+		version=6,
+		name='documents_fts',
+		script="""
+			--Полнотекстовый индекс документов: имя, код и название типа.
+			--rowid совпадает с documents.id.
+			CREATE VIRTUAL TABLE documents_fts USING fts5(
+				name, code, type_name,
+				tokenize = 'unicode61 remove_diacritics 2'
+			);
+
+			--Ранжирование bm25: совпадение в коде весомее, чем в типе
+			INSERT INTO documents_fts (documents_fts, rank)
+			VALUES ('rank', 'bm25(1.0, 2.0, 0.5)');
+
+			INSERT INTO documents_fts (rowid, name, code, type_name)
+			SELECT d.id, d.name, c.code, t.name
+			FROM documents as d
+			JOIN code_documents as c ON c.id = d.id_code_doc
+			JOIN types_documents as t ON t.id = c.id_type_doc;
+
+			CREATE TRIGGER tr_documents_fts_insert
+			AFTER INSERT ON documents
+			BEGIN
+				INSERT INTO documents_fts (rowid, name, code, type_name)
+				SELECT NEW.id, NEW.name, c.code, t.name
+				FROM code_documents as c
+				JOIN types_documents as t ON t.id = c.id_type_doc
+				WHERE c.id = NEW.id_code_doc;
+			END;
+
+			--Изменения кода и типа доходят сюда через обновление fullname
+			CREATE TRIGGER tr_documents_fts_update
+			AFTER UPDATE OF name, fullname, id_code_doc ON documents
+			BEGIN
+				DELETE FROM documents_fts WHERE rowid = NEW.id;
+				INSERT INTO documents_fts (rowid, name, code, type_name)
+				SELECT NEW.id, NEW.name, c.code, t.name
+				FROM code_documents as c
+				JOIN types_documents as t ON t.id = c.id_type_doc
+				WHERE c.id = NEW.id_code_doc;
+			END;
+
+			CREATE TRIGGER tr_documents_fts_delete
+			AFTER DELETE ON documents
+			BEGIN
+				DELETE FROM documents_fts WHERE rowid = OLD.id;
+			END;
+		"""
+	),
+	Migration(
+		version=7,
+		name='bpm_closure',
+		script="""
+			--Таблица замыкания дерева бизнес процессов: все пары
+			--предок - потомок с расстоянием между ними. Каждый процесс
+			--является сам себе предком на расстоянии 0.
+			CREATE TABLE bpm_closure (
+				id_ancestor INTEGER NOT NULL,
+				id_descendant INTEGER NOT NULL,
+				depth INTEGER NOT NULL,
+				PRIMARY KEY (id_ancestor, id_descendant)
+			) WITHOUT ROWID;
+
+			CREATE INDEX ix_bpm_closure_descendant
+			ON bpm_closure (id_descendant, id_ancestor);
+
+			INSERT INTO bpm_closure (id_ancestor, id_descendant, depth)
+			WITH RECURSIVE closure (id_ancestor, id_descendant, depth) AS (
+				SELECT id, id, 0 FROM bpm
+				UNION ALL
+				SELECT c.id_ancestor, b.id, c.depth + 1
+				FROM closure as c
+				JOIN bpm as b ON b.id_parent = c.id_descendant
+			)
+			SELECT id_ancestor, id_descendant, depth FROM closure;
+
+			CREATE TRIGGER tr_bpm_closure_insert
+			AFTER INSERT ON bpm
+			BEGIN
+				INSERT INTO bpm_closure (id_ancestor, id_descendant, depth)
+				SELECT id_ancestor, NEW.id, depth + 1
+				FROM bpm_closure
+				WHERE id_descendant = NEW.id_parent
+				UNION ALL
+				SELECT NEW.id, NEW.id, 0;
+			END;
+
+			--Процесс нельзя перенести внутрь собственного поддерева
+			CREATE TRIGGER tr_bpm_closure_check_parent
+			BEFORE UPDATE OF id_parent ON bpm
+			WHEN NEW.id_parent IN (
+				SELECT id_descendant FROM bpm_closure WHERE id_ancestor = NEW.id
+			)
+			BEGIN
+				SELECT RAISE(ABORT, 'bpm parent inside own subtree');
+			END;
+
+			--Перенос поддерева: связи с прежними предками удаляются,
+			--с новыми - создаются. Связи внутри поддерева не меняются.
+			CREATE TRIGGER tr_bpm_closure_update
+			AFTER UPDATE OF id_parent ON bpm
+			WHEN OLD.id_parent IS NOT NEW.id_parent
+			BEGIN
+				DELETE FROM bpm_closure
+				WHERE
+					id_descendant IN (
+						SELECT id_descendant FROM bpm_closure
+						WHERE id_ancestor = NEW.id
+					) and
+					id_ancestor NOT IN (
+						SELECT id_descendant FROM bpm_closure
+						WHERE id_ancestor = NEW.id
+					);
+				INSERT INTO bpm_closure (id_ancestor, id_descendant, depth)
+				SELECT a.id_ancestor, d.id_descendant, a.depth + d.depth + 1
+				FROM bpm_closure as a, bpm_closure as d
+				WHERE a.id_descendant = NEW.id_parent and d.id_ancestor = NEW.id;
+			END;
+
+			CREATE TRIGGER tr_bpm_closure_delete
+			AFTER DELETE ON bpm
+			BEGIN
+				DELETE FROM bpm_closure
+				WHERE id_descendant = OLD.id or id_ancestor = OLD.id;
+			END;
+		"""
+	),
+	Migration(
+		version=8,
+		name='index_bpm_code',
+		script="""
+			--Импорт находит родителя бизнес процесса по коду
+			CREATE INDEX IF NOT EXISTS ix_bpm_code
+			ON bpm (code);
+		"""
+	),
+	Migration(
+		version=9,
+		name='table_versions',
+		script="""
+			--Счетчики изменений таблиц. Увеличиваются триггерами при любой
+			--записи в таблицу, из них строится ETag ответов API.
+			CREATE TABLE table_versions (
+				name TEXT PRIMARY KEY,
+				version INTEGER NOT NULL DEFAULT 0
+			) WITHOUT ROWID;
+
+			INSERT INTO table_versions (name)
+			VALUES
+				('company'), ('types_documents'), ('bpm'), ('code_documents'),
+				('documents');
+
+			CREATE TRIGGER tr_company_version_insert
+			AFTER INSERT ON company
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'company';
+			END;
+
+			CREATE TRIGGER tr_company_version_update
+			AFTER UPDATE ON company
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'company';
+			END;
+
+			CREATE TRIGGER tr_company_version_delete
+			AFTER DELETE ON company
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'company';
+			END;
+
+			CREATE TRIGGER tr_types_documents_version_insert
+			AFTER INSERT ON types_documents
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'types_documents';
+			END;
+
+			CREATE TRIGGER tr_types_documents_version_update
+			AFTER UPDATE ON types_documents
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'types_documents';
+			END;
+
+			CREATE TRIGGER tr_types_documents_version_delete
+			AFTER DELETE ON types_documents
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'types_documents';
+			END;
+
+			CREATE TRIGGER tr_bpm_version_insert
+			AFTER INSERT ON bpm
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'bpm';
+			END;
+
+			CREATE TRIGGER tr_bpm_version_update
+			AFTER UPDATE ON bpm
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'bpm';
+			END;
+
+			CREATE TRIGGER tr_bpm_version_delete
+			AFTER DELETE ON bpm
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'bpm';
+			END;
+
+			CREATE TRIGGER tr_code_documents_version_insert
+			AFTER INSERT ON code_documents
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'code_documents';
+			END;
+
+			CREATE TRIGGER tr_code_documents_version_update
+			AFTER UPDATE ON code_documents
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'code_documents';
+			END;
+
+			CREATE TRIGGER tr_code_documents_version_delete
+			AFTER DELETE ON code_documents
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'code_documents';
+			END;
+
+			CREATE TRIGGER tr_documents_version_insert
+			AFTER INSERT ON documents
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'documents';
+			END;
+
+			CREATE TRIGGER tr_documents_version_update
+			AFTER UPDATE ON documents
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'documents';
+			END;
+
+			CREATE TRIGGER tr_documents_version_delete
+			AFTER DELETE ON documents
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'documents';
+			END;
+		"""
+	),
+	Migration(
+		version=10,
+		name='change_sequence',
+		script="""
+			--Сквозной номер изменения кодов документов и документов. Номер
+			--выдается при каждой записи и только растет: клиент запоминает
+			--последний полученный номер и запрашивает изменения после него.
+			CREATE TABLE change_sequence (
+				id INTEGER PRIMARY KEY CHECK (id = 1),
+				last_seq INTEGER NOT NULL
+			);
+
+			ALTER TABLE code_documents ADD COLUMN change_seq INTEGER NULL;
+			ALTER TABLE code_documents ADD COLUMN updated_at TEXT NULL;
+			ALTER TABLE documents ADD COLUMN change_seq INTEGER NULL;
+			ALTER TABLE documents ADD COLUMN updated_at TEXT NULL;
+
+			--Существующие строки нумеруются по порядку id: сначала коды
+			--документов, затем документы
+			UPDATE code_documents
+			SET
+				change_seq = id,
+				updated_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now');
+
+			UPDATE documents
+			SET
+				change_seq = id + (SELECT coalesce(max(id), 0) FROM code_documents),
+				updated_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now');
+
+			INSERT INTO change_sequence (id, last_seq)
+			VALUES (1, max(
+				(SELECT coalesce(max(change_seq), 0) FROM code_documents),
+				(SELECT coalesce(max(change_seq), 0) FROM documents)
+			));
+
+			CREATE INDEX IF NOT EXISTS ix_code_documents_change_seq
+			ON code_documents (change_seq);
+
+			CREATE INDEX IF NOT EXISTS ix_documents_change_seq
+			ON documents (change_seq);
+
+			--Надгробия удаленных строк: номер изменения удаления и id строки
+			CREATE TABLE tombstones (
+				change_seq INTEGER PRIMARY KEY,
+				table_name TEXT NOT NULL,
+				id INTEGER NOT NULL,
+				deleted_at TEXT NOT NULL
+			);
+
+			CREATE INDEX IF NOT EXISTS ix_tombstones_table_name_change_seq
+			ON tombstones (table_name, change_seq);
+		"""
+	),
+	Migration(
+		version=11,
+		name='password_generation',
+		script="""
+			--Счетчик смены пароля входит в подписанные токены кук. Смена
+			--пароля увеличивает счетчик, и выданные ранее токены перестают
+			--проходить проверку.
+			ALTER TABLE users
+			ADD COLUMN password_generation INTEGER NOT NULL DEFAULT 0;
+		"""
+	),
+	Migration(
+		version=12,
+		name='page_import',
+		script="""
+			--Импорт разрешен пользователям с разрешением на страницу
+			--/app/import. Разрешения выдаются в permit_view_page.
+			INSERT INTO pages (page_uri)
+			SELECT '/app/import'
+			WHERE NOT EXISTS (
+				SELECT 1 FROM pages WHERE page_uri = '/app/import'
+			);
+		"""
+	),
+	Migration(
+		version=13,
+		name='users_version',
+		script="""
+			--Пользователи раскрываются в документах параметром expand: их
+			--изменения тоже должны менять ETag и ключ кэша документов.
+			INSERT INTO table_versions (name) VALUES ('users');
+
+			CREATE TRIGGER tr_users_version_insert
+			AFTER INSERT ON users
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'users';
+			END;
+
+			CREATE TRIGGER tr_users_version_update
+			AFTER UPDATE ON users
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'users';
+			END;
+
+			CREATE TRIGGER tr_users_version_delete
+			AFTER DELETE ON users
+			BEGIN
+				UPDATE table_versions SET version = version + 1
+				WHERE name = 'users';
+			END;
+		"""
+	),
+	Migration(
+		version=14,
+		name='change_seq_cascades',
+		script="""
+			--Код документа и полное название документа переписываются
+			--триггерами при изменении кода процесса, аббревиатуры или
+			--названия типа. Такая строка тоже получает номер изменения,
+			--иначе клиент с курсором changed_since ее не увидит. Строка,
+			--которой номер выдал сам пишущий запрос, второй не получает;
+			--заполнение при вставке (прежнее значение NULL) - тоже.
+			CREATE TRIGGER tr_code_documents_change_seq_cascade
+			AFTER UPDATE OF code ON code_documents
+			WHEN
+				OLD.code IS NOT NULL and
+				NEW.code IS NOT OLD.code and
+				NEW.change_seq IS OLD.change_seq
+			BEGIN
+				UPDATE change_sequence SET last_seq = last_seq + 1
+				WHERE id = 1;
+				UPDATE code_documents
+				SET
+					change_seq = (
+						SELECT last_seq FROM change_sequence WHERE id = 1),
+					updated_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
+				WHERE id = NEW.id;
+			END;
+
+			CREATE TRIGGER tr_documents_change_seq_cascade
+			AFTER UPDATE OF fullname ON documents
+			WHEN
+				OLD.fullname IS NOT NULL and
+				NEW.fullname IS NOT OLD.fullname and
+				NEW.change_seq IS OLD.change_seq
+			BEGIN
+				UPDATE change_sequence SET last_seq = last_seq + 1
+				WHERE id = 1;
+				UPDATE documents
+				SET
+					change_seq = (
+						SELECT last_seq FROM change_sequence WHERE id = 1),
+					updated_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
+				WHERE id = NEW.id;
+			END;
+		"""
+	),
+]
+
+
+def get_schema_version(connect: sqlite3.Connection) -> int:
+	"""Получает версию схемы БД."""
+	return connect.execute("PRAGMA user_version").fetchone()[0]
+
+def migrates(connect: sqlite3.Connection) -> None:
+	"""Применяет недостающие миграции. Каждая миграция выполняется в
+	отдельной транзакции вместе с записью новой версии схемы."""
+	version = get_schema_version(connect)
+	for migration in MIGRATIONS:
+		if migration.version <= version:
+			continue
+		try:
+			connect.executescript(
+				"BEGIN IMMEDIATE;"
+				f"{migration.script}"
+				f"PRAGMA user_version = {migration.version};"
+				"COMMIT;"
+			)
+		except sqlite3.Error:
+			connect.rollback()
+			raise
+		logging.getLogger('app_logger').info(
+			f"MIGRATION {migration.version} {migration.name}")
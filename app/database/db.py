@@ -3,17 +3,50 @@ import sqlite3
 
 DATABASE_NAME = "info_portal.sqlite"
 
+#Настройка соединения. Выполняется один раз при открытии соединения:
+PRAGMAS = (
+	"PRAGMA foreign_keys = ON",
+	"PRAGMA journal_mode = WAL",
+	"PRAGMA busy_timeout = 5000",
+	"PRAGMA cache_size = -16000",
+	"PRAGMA mmap_size = 268435456",
+)
+
+
+def sets_up_connection(connect: sqlite3.Connection) -> None:
+	"""Настраивает соединение."""
+	cursor = connect.cursor()
+	for pragma in PRAGMAS:
+		cursor.execute(pragma)
+	cursor.close()
+
+
+def _get_session():
+	"""Получает сессию запроса. Отложенный импорт: app импортирует этот
+	модуль до создания db."""
+	from .models.database import db
+	return db.session
+
 
 class SQLite:
-	"""База данных - SQLite"""
+	"""База данных - SQLite. Работает на соединении транзакции запроса из
+	пула движка SQLAlchemy. Фиксация - один раз в конце запроса."""
+
+	__immediate: bool
 
-	def __init__(self):
-		self.__file = f'./app/database/{DATABASE_NAME}'
-		self.__connect = None
+	def __init__(self, immediate = False):
+		self.__immediate = immediate
+		self.__cursor = None
 
 	def __enter__(self):
-		self.__connect = sqlite3.connect(self.__file)
-		return self.__connect.cursor()
+		connection = _get_session().connection().connection
+		self.__cursor = connection.cursor()
+		#Блокировка на запись берется сразу, а не при первом изменении
+		if self.__immediate and not connection.in_transaction:
+			self.__cursor.execute("BEGIN IMMEDIATE")
+		return self.__cursor
 
 	def __exit__(self, type, value, traceback):
-		if self.__connect: self.__connect.commit(); self.__connect.close()
+		self.__cursor.close()
+		#ORM модели могли устареть после изменений через сырой SQL
+		_get_session().expire_all()
@@ -13,11 +13,11 @@ def _get_user_id_by_invitation_token(invitation_token: str) -> int | None:
 	with SQLite() as cursor:
 		query = """
 			SELECT
-				u.user_id as user_id
+				u.id as user_id
 			FROM
 				users as u
 			JOIN
-				invitation_tokens as it ON it.user_id = u.user_id
+				invitation_tokens as it ON it.user_id = u.id
 			WHERE it.invitation_token = ?
 		"""
 		cursor.execute(query, (invitation_token,))
@@ -103,3 +103,29 @@ def check_user_password(user_id: int, hashed_password: str) -> bool:
 		)
 		response_from_db = bool(cursor.fetchone()[0])
 		return response_from_db
+
+def get_password_generation(user_id: int) -> int | None:
+	"""Получает счетчик смены пароля пользователя."""
+	with SQLite() as cursor:
+		query = """
+			SELECT password_generation FROM users WHERE id = ?
+		"""
+		cursor.execute(query, (user_id,))
+		response_from_db = cursor.fetchone()
+		return response_from_db[0] if response_from_db is not None else None
+
+def increments_password_generation(user_id: int) -> int:
+	"""Увеличивает счетчик смены пароля пользователя. Возвращает новый
+	счетчик."""
+	with SQLite(immediate=True) as cursor:
+		query = """
+			UPDATE users
+			SET password_generation = password_generation + 1
+			WHERE id = ?
+		"""
+		cursor.execute(query, (user_id,))
+		query = """
+			SELECT password_generation FROM users WHERE id = ?
+		"""
+		cursor.execute(query, (user_id,))
+		return cursor.fetchone()[0]
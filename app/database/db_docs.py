@@ -1,6 +1,20 @@
 from .db import SQLite, sqlite3
 from typing import TypedDict, Literal
 from datetime import date
+from collections import Counter
+
+
+def _takes_change_seq(cursor: sqlite3.Cursor, count: int = 1) -> int:
+	"""Берет count номеров изменения подряд. Возвращает первый из них.
+	Номер изменения выдается при каждой записи в коды документов и
+	документы: по нему клиенты получают изменения после своего курсора."""
+	cursor.execute("""
+		UPDATE change_sequence
+		SET last_seq = last_seq + ?
+		WHERE id = 1
+	""", (count,))
+	cursor.execute("SELECT last_seq FROM change_sequence WHERE id = 1")
+	return cursor.fetchone()[0] - count + 1
 
 
 class DataForAddCodeDoc(TypedDict):
@@ -10,38 +24,118 @@ class DataForAddCodeDoc(TypedDict):
 	id_creator: int
 
 def add_code_doc(data: DataForAddCodeDoc) -> int:
-	"""Добавляет код документа."""
-	with SQLite() as cursor:
-		cursor.execute("PRAGMA foreign_keys = ON")
-		query = """
-			INSERT INTO code_documents
-			(id_bpm, id_type_doc, id_company, number, id_creator)
+	"""Добавляет код документа. Номер выдается счетчиком
+	code_documents_sequence, поэтому не повторяется и после удаления кодов."""
+	with SQLite(immediate=True) as cursor:
+		cursor.execute("""
+			INSERT INTO code_documents_sequence
+			(id_bpm, id_type_doc, id_company, last_number)
+			VALUES (:id_bpm, :id_type_doc, :id_company, 1)
+			ON CONFLICT (id_bpm, id_type_doc, id_company)
+			DO UPDATE SET last_number = last_number + 1
+		""", data)
+		cursor.execute("""
+			SELECT last_number
+			FROM code_documents_sequence
+			WHERE
+				id_bpm = :id_bpm and
+				id_type_doc = :id_type_doc and
+				id_company = :id_company
+		""", data)
+		number = cursor.fetchone()[0]
+		cursor.execute("""
+			INSERT INTO code_documents (
+				id_bpm, id_type_doc, id_company, number, id_creator,
+				change_seq, updated_at
+			)
 			VALUES (
 				:id_bpm,
 				:id_type_doc,
 				:id_company,
-				(
-					SELECT count(number)+1
-					FROM code_documents
-					WHERE
-						id_bpm = :id_bpm and
-						id_type_doc = :id_type_doc and
-						id_company = :id_company
-				),
-				:id_creator
+				:number,
+				:id_creator,
+				:change_seq,
+				strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
 			)
-		"""
-		cursor.execute(query, data)
+		""", {**data, 'number': number, 'change_seq': _takes_change_seq(cursor)})
 		cursor.execute("SELECT last_insert_rowid()")
 		return cursor.fetchone()[0]
 
 
+def add_code_docs(list_data: list[DataForAddCodeDoc]) -> list[int]:
+	"""Добавляет коды документов одной транзакцией. Возвращает id записей
+	в порядке входных данных."""
+	def get_key(data: DataForAddCodeDoc) -> tuple[int, int, int]:
+		return data['id_bpm'], data['id_type_doc'], data['id_company']
+
+	counter = Counter(get_key(data) for data in list_data)
+	with SQLite(immediate=True) as cursor:
+		cursor.executemany("""
+			INSERT INTO code_documents_sequence
+			(id_bpm, id_type_doc, id_company, last_number)
+			VALUES (?, ?, ?, ?)
+			ON CONFLICT (id_bpm, id_type_doc, id_company)
+			DO UPDATE SET last_number = last_number + excluded.last_number
+		""", [(*key, count) for key, count in counter.items()])
+		#Следующий свободный номер для каждого сочетания
+		next_numbers = {}
+		for key, count in counter.items():
+			cursor.execute("""
+				SELECT last_number
+				FROM code_documents_sequence
+				WHERE id_bpm = ? and id_type_doc = ? and id_company = ?
+			""", key)
+			next_numbers[key] = cursor.fetchone()[0] - count + 1
+		rows = []
+		change_seq = _takes_change_seq(cursor, count=len(list_data))
+		for i, data in enumerate(list_data):
+			key = get_key(data)
+			rows.append({
+				**data,
+				'number': next_numbers[key],
+				'change_seq': change_seq + i
+			})
+			next_numbers[key] += 1
+		cursor.executemany("""
+			INSERT INTO code_documents (
+				id_bpm, id_type_doc, id_company, number, id_creator,
+				change_seq, updated_at
+			)
+			VALUES (
+				:id_bpm,
+				:id_type_doc,
+				:id_company,
+				:number,
+				:id_creator,
+				:change_seq,
+				strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
+			)
+		""", rows)
+		ids = {}
+		for key, count in counter.items():
+			cursor.execute("""
+				SELECT number, id
+				FROM code_documents
+				WHERE
+					id_bpm = ? and id_type_doc = ? and id_company = ? and
+					number >= ?
+			""", (*key, next_numbers[key] - count))
+			ids.update({(*key, number): id for number, id in cursor})
+		return [ids[(*get_key(row), row['number'])] for row in rows]
+
+
 def del_code_doc(id_code_doc: int) -> None:
+	"""Удаляет код документа. Удаление записывается надгробием с номером
+	изменения."""
 	with SQLite() as cursor:
 		query = """
 			DELETE FROM code_documents WHERE id = ?
 		"""
 		cursor.execute(query, (id_code_doc,))
+		cursor.execute("""
+			INSERT INTO tombstones (change_seq, table_name, id, deleted_at)
+			VALUES (?, 'code_documents', ?, strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+		""", (_takes_change_seq(cursor), id_code_doc))
 
 
 class DataForAddDoc(TypedDict):
@@ -55,11 +149,11 @@ class DataForAddDoc(TypedDict):
 def add_doc(data: DataForAddDoc) -> int:
 	"""Добавляет документ."""
 	with SQLite() as cursor:
-		cursor.execute("PRAGMA foreign_keys = ON")
+		change_seq = _takes_change_seq(cursor, count=2)
 		cursor.execute("""
 			INSERT INTO documents (
 				id_code_doc, name, date_start, date_finish,
-				id_responsible, id_creator
+				id_responsible, id_creator, change_seq, updated_at
 			)
 			VALUES (
 				:id_code_doc,
@@ -67,14 +161,24 @@ def add_doc(data: DataForAddDoc) -> int:
 				:date_start,
 				:date_finish,
 				:id_responsible,
-				:id_creator
+				:id_creator,
+				:change_seq,
+				strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
 			)
-		""", data)
+		""", {
+			**data,
+			'date_start': data['date_start'].isoformat(),
+			'date_finish': data['date_finish'].isoformat(),
+			'change_seq': change_seq
+		})
 		cursor.execute("""
 			UPDATE code_documents
-			SET used = 1
+			SET
+				used = 1,
+				change_seq = :change_seq,
+				updated_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
 			WHERE id = :id_code_doc
-		""", data)
+		""", {**data, 'change_seq': change_seq + 1})
 		cursor.execute("SELECT last_insert_rowid()")
 		return cursor.fetchone()[0]
 
@@ -88,16 +192,22 @@ class DataForUpdateDoc(TypedDict):
 def updates_version_doc(data: DataForUpdateDoc) -> None:
 	"""Обновляет версию документа."""
 	with SQLite() as cursor:
-		cursor.execute("PRAGMA foreign_keys = ON")
 		cursor.execute("""
 			UPDATE documents
 			SET
 				version = version + 1,
 				date_start = :date_start,
 				date_finish = :date_finish,
-				id_responsible = :id_responsible
+				id_responsible = :id_responsible,
+				change_seq = :change_seq,
+				updated_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
 			WHERE id = :id_doc
-		""", data)
+		""", {
+			**data,
+			'date_start': data['date_start'].isoformat(),
+			'date_finish': data['date_finish'].isoformat(),
+			'change_seq': _takes_change_seq(cursor)
+		})
 		return
 
 
@@ -108,11 +218,12 @@ class DataForChangeDoc(TypedDict):
 def change_actual_doc(data: DataForChangeDoc) -> None:
 	"""Изменяет актуальность документа."""
 	with SQLite() as cursor:
-		cursor.execute("PRAGMA foreign_keys = ON")
 		cursor.execute("""
 			UPDATE documents
 			SET
-				actual = :actual
+				actual = :actual,
+				change_seq = :change_seq,
+				updated_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
 			WHERE id = :id_doc
-		""", data)
+		""", {**data, 'change_seq': _takes_change_seq(cursor)})
 		return
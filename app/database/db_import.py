@@ -0,0 +1,85 @@
+from .db import SQLite
+from typing import TypedDict, Literal
+
+
+def get_ids_company() -> set[int]:
+	"""Получает id компаний."""
+	with SQLite() as cursor:
+		cursor.execute("SELECT id FROM company")
+		return {row[0] for row in cursor}
+
+def get_ids_users() -> set[int]:
+	"""Получает id пользователей."""
+	with SQLite() as cursor:
+		cursor.execute("SELECT id FROM users")
+		return {row[0] for row in cursor}
+
+def get_levels_bpm() -> dict[str, int | None]:
+	"""Получает уровни бизнес процессов по их кодам. None - код не
+	уникален."""
+	with SQLite() as cursor:
+		cursor.execute("""
+			SELECT code, CASE WHEN count(*) = 1 THEN max(lvl) END
+			FROM bpm
+			GROUP BY code
+		""")
+		return {code: lvl for code, lvl in cursor}
+
+def get_types_docs() -> tuple[set[str], set[str]]:
+	"""Получает названия и аббревиатуры типов документов."""
+	with SQLite() as cursor:
+		cursor.execute("SELECT name, abv FROM types_documents")
+		rows = cursor.fetchall()
+		return {name for name, _ in rows}, {abv for _, abv in rows}
+
+
+class DataForImportCompany(TypedDict):
+	name: str
+
+def imports_company(list_data: list[DataForImportCompany]) -> None:
+	"""Импортирует компании одной транзакцией."""
+	with SQLite(immediate=True) as cursor:
+		cursor.executemany("""
+			INSERT INTO company (name)
+			VALUES (:name)
+		""", list_data)
+
+
+class DataForImportTypeDoc(TypedDict):
+	name: str
+	abv: str
+	layer: Literal['in', 'out']
+
+def imports_types_docs(list_data: list[DataForImportTypeDoc]) -> None:
+	"""Импортирует типы документов одной транзакцией."""
+	with SQLite(immediate=True) as cursor:
+		cursor.executemany("""
+			INSERT INTO types_documents (name, abv, layer)
+			VALUES (:name, :abv, :layer)
+		""", list_data)
+
+
+class DataForImportBpm(TypedDict):
+	code: str
+	name: str
+	lvl: int
+	id_company: int
+	id_owner: int | None
+	code_parent: str | None
+
+def imports_bpm(list_data: list[DataForImportBpm]) -> None:
+	"""Импортирует бизнес процессы одной транзакцией. Родитель задается
+	кодом, поэтому данные должны идти от родителей к потомкам: id
+	родителя находится среди уже вставленных строк."""
+	with SQLite(immediate=True) as cursor:
+		cursor.executemany("""
+			INSERT INTO bpm (code, name, lvl, id_company, id_owner, id_parent)
+			VALUES (
+				:code,
+				:name,
+				:lvl,
+				:id_company,
+				:id_owner,
+				(SELECT id FROM bpm WHERE code = :code_parent)
+			)
+		""", list_data)
@@ -0,0 +1,30 @@
+from .db import SQLite
+
+
+def get_versions_tables(tables: tuple[str, ...]) -> dict[str, int]:
+	"""Получает счетчики изменений таблиц."""
+	with SQLite() as cursor:
+		cursor.execute(f"""
+			SELECT name, version
+			FROM table_versions
+			WHERE name IN ({", ".join("?" * len(tables))})
+		""", tables)
+		return {name: version for name, version in cursor}
+
+def get_last_change_seq() -> int:
+	"""Получает последний выданный номер изменения."""
+	with SQLite() as cursor:
+		cursor.execute("SELECT last_seq FROM change_sequence WHERE id = 1")
+		return cursor.fetchone()[0]
+
+def get_deleted_ids(table_name: str, after: int, until: int) -> list[int]:
+	"""Получает id строк таблицы, удаленных с номером изменения из
+	промежутка (after, until], по порядку удаления."""
+	with SQLite() as cursor:
+		cursor.execute("""
+			SELECT id
+			FROM tombstones
+			WHERE table_name = ? and change_seq > ? and change_seq <= ?
+			ORDER BY change_seq
+		""", (table_name, after, until))
+		return [row[0] for row in cursor]
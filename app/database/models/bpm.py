@@ -16,3 +16,12 @@ class Bpm(db.Model):
         return f"""Бизнес процесс [Название: {self.code} {self.name},
         Уровень: {self.lvl}, ID компании: {self.id_company},
         ID владельца: {self.id_owner}]"""
+
+
+class BpmClosure(db.Model):
+    """Таблица замыкания дерева бизнес процессов. Заполняется триггерами."""
+    __tablename__ = 'bpm_closure'
+
+    id_ancestor = db.Column(db.Integer, primary_key=True)
+    id_descendant = db.Column(db.Integer, primary_key=True)
+    depth = db.Column(db.Integer, nullable=False)
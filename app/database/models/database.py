@@ -1,5 +1,35 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask import typing as flaskTyping
+from sqlalchemy import event
+from contextlib import closing
 from app import app
+from database.db import sets_up_connection
+from database.creating_table.migrations import migrates
 
 
 db = SQLAlchemy(app)
+
+
+@event.listens_for(db.engine, "connect")
+def sets_up_pool_connection(dbapi_connection, connection_record) -> None:
+    """Настраивает новое соединение пула."""
+    sets_up_connection(dbapi_connection)
+
+
+#Миграции схемы применяются при запуске до отражения таблиц моделями
+with closing(db.engine.raw_connection()) as connection:
+    migrates(connection.connection)
+
+
+#Единица работы запроса: ORM и сырой SQL работают в транзакции сессии,
+#которая фиксируется один раз в конце запроса.
+@app.after_request
+def commits_session(
+    response: flaskTyping.ResponseReturnValue
+    ) -> flaskTyping.ResponseReturnValue:
+    """Фиксирует транзакцию запроса. При ошибке - откатывает."""
+    if response.status_code < 400:
+        db.session.commit()
+    else:
+        db.session.rollback()
+    return response
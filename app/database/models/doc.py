@@ -0,0 +1,10 @@
+from .database import db
+
+
+class Doc(db.Model):
+    __tablename__ = 'documents'
+    __table_args__ = {
+        'autoload': True,
+        'autoload_with': db.engine
+    }
+    code_doc = db.relationship("CodeDoc")
@@ -15,13 +15,18 @@ class GetterModelsUsingCustomFilter:
 
     def get(self) -> list[db.Model]:
         """Получает модель/список моделей."""
+        return self._cls_model.query.filter(self.get_criterion()).all()
+
+    def get_criterion(self) -> sql.elements.ClauseElement:
+        """Получает условие фильтра. Условие не связано с сессией и
+        может использоваться повторно."""
         list_logic_conditions = self._parser.get_list_logic_conditions()
         elements = [
             or_(*[self._create_element_for_filter_model(logic_condition)
                 for logic_condition in logic_conditions])
                     for logic_conditions in list_logic_conditions
         ]
-        return self._cls_model.query.filter(and_(*elements)).all()
+        return and_(*elements)
 
     def _create_element_for_filter_model(
         self,
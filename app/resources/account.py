@@ -1,19 +1,14 @@
-from flask_restful import Resource, reqparse
+from flask_restful import Resource
 from flask import typing as flaskTyping
 from controller.api.handlers.account_change_password import (
 HandlerRequestСhangePassword)
 from controller.api.response import ResponseWithAdditionCookie
+from controller import common
 
 
-#args for post user:
-parser_account_password = reqparse.RequestParser()
-parser_account_password.add_argument("password", type=str, required=True)
-parser_account_password.add_argument("new_password", type=str, required=True)
-
 class AccountPassword(Resource):
 
 	def put(self, user_id: int) -> flaskTyping.ResponseReturnValue:
-		password = parser_account_password.parse_args()["password"]
-		new_password = parser_account_password.parse_args()["new_password"]
-		handler = HandlerRequestСhangePassword(user_id, password, new_password)
+		data_from_request = common.get_data_from_request_in_json()
+		handler = HandlerRequestСhangePassword(user_id, data_from_request)
 		return ResponseWithAdditionCookie(handler).get()
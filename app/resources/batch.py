@@ -0,0 +1,13 @@
+from flask_restful import Resource
+from flask import typing as flaskTyping
+from controller import common
+from controller.api.handlers.batch import HandlerRequestBatch
+from controller.api.response import Response
+
+
+class Batch(Resource):
+
+    def post(self) -> flaskTyping.ResponseReturnValue:
+        data_from_request = common.get_data_from_request_in_json()
+        handler = HandlerRequestBatch(data_from_request)
+        return Response(handler).get()
@@ -1,15 +1,33 @@
 from flask_restful import Resource, reqparse
 from flask import typing as flaskTyping
-from controller.api.handlers.bpm import HandlerRequestGetAllBpm
+from controller.api.handlers.bpm import (HandlerRequestGetAllBpm,
+HandlerRequestGetTreeBpm, ParamsQueryBpm)
 from controller.api.response import Response
 
 
 parser_bpm = reqparse.RequestParser()
 parser_bpm.add_argument("filter", type=str, location='args')
+parser_bpm.add_argument("limit", type=int, location='args')
+parser_bpm.add_argument("after", type=int, location='args')
+parser_bpm.add_argument("fields", type=str, location='args')
+parser_bpm.add_argument("expand", type=str, location='args')
+parser_bpm.add_argument("descendant_of", type=int, location='args')
+parser_bpm.add_argument("ancestors_of", type=int, location='args')
 
 class AllBpm(Resource):
 
     def get(self) -> flaskTyping.ResponseReturnValue:
-        query_string = parser_bpm.parse_args()["filter"]
-        handler = HandlerRequestGetAllBpm(query_string)
+        params = ParamsQueryBpm(**parser_bpm.parse_args())
+        handler = HandlerRequestGetAllBpm(params)
+        return Response(handler).get()
+
+
+parser_tree_bpm = reqparse.RequestParser()
+parser_tree_bpm.add_argument("root", type=int, location='args')
+
+class TreeBpm(Resource):
+
+    def get(self) -> flaskTyping.ResponseReturnValue:
+        args = parser_tree_bpm.parse_args()
+        handler = HandlerRequestGetTreeBpm(id_root=args['root'])
         return Response(handler).get()
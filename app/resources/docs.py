@@ -2,12 +2,16 @@ from flask_restful import Resource, reqparse
 from flask import typing as flaskTyping
 from controller import common
 from controller.api.handlers.type_doc import HandlerRequestGetAllTypesDocs
-from controller.api.response import Response
+from controller.api.response import Response, ResponseExport
+from controller.api.handlers.handler import ParamsQuery
 from controller.api.handlers.code_doc import (HandlerRequestAddCodeDoc,
-HandlerRequestDelCodeDoc, HandlerRequestGetAllCodeDocs)
+HandlerRequestAddCodeDocs, HandlerRequestDelCodeDoc,
+HandlerRequestGetAllCodeDocs, HandlerRequestExportCodeDocs,
+HandlerRequestGetChangedCodeDocs)
 from controller.api.handlers.doc import (HandlerRequestAddDoc,
 HandlerRequestGetAllDocs, HandlerRequestUpdatingVersionDoc,
-HandlerRequestChangeActualDoc)
+HandlerRequestChangeActualDoc, HandlerRequestExportDocs, ParamsQueryDocs,
+HandlerRequestGetChangedDocs)
 
 
 class AllTypesDocs(Resource):
@@ -19,20 +23,45 @@ class AllTypesDocs(Resource):
 
 parser_code_doc = reqparse.RequestParser()
 parser_code_doc.add_argument("filter", type=str, location='args')
+parser_code_doc.add_argument("limit", type=int, location='args')
+parser_code_doc.add_argument("after", type=int, location='args')
+parser_code_doc.add_argument("fields", type=str, location='args')
+parser_code_doc.add_argument("changed_since", type=int, location='args')
+parser_code_doc.add_argument("expand", type=str, location='args')
 
 class AllCodesDocs(Resource):
 
     def post(self) -> flaskTyping.ResponseReturnValue:
         data_from_request = common.get_data_from_request_in_json()
-        handler = HandlerRequestAddCodeDoc(data_from_request)
+        #Пакетный режим: {"rows": [<код документа>, ...]}
+        if "rows" in data_from_request:
+            handler = HandlerRequestAddCodeDocs(data_from_request)
+        else:
+            handler = HandlerRequestAddCodeDoc(data_from_request)
         return Response(handler).get()
 
     def get(self) -> flaskTyping.ResponseReturnValue:
-        query_string = parser_code_doc.parse_args()["filter"]
-        handler = HandlerRequestGetAllCodeDocs(query_string)
+        params = ParamsQuery(**parser_code_doc.parse_args())
+        #Синхронизация: изменения после курсора changed_since
+        if params.changed_since is not None:
+            handler = HandlerRequestGetChangedCodeDocs(params)
+        else:
+            handler = HandlerRequestGetAllCodeDocs(params)
         return Response(handler).get()
 
 
+parser_export = reqparse.RequestParser()
+parser_export.add_argument("filter", type=str, location='args')
+parser_export.add_argument("fields", type=str, location='args')
+
+class ExportCodesDocs(Resource):
+
+    def get(self) -> flaskTyping.ResponseReturnValue:
+        params = ParamsQuery(**parser_export.parse_args())
+        handler = HandlerRequestExportCodeDocs(params)
+        return ResponseExport(handler, filename="codes_docs").get()
+
+
 class CodeDoc(Resource):
 
     def delete(self, id_code_doc: int) -> flaskTyping.ResponseReturnValue:
@@ -40,6 +69,10 @@ class CodeDoc(Resource):
         return Response(handler).get()
 
 
+parser_docs = parser_code_doc.copy()
+parser_docs.add_argument("search", type=str, location='args')
+parser_docs.add_argument("after_rank", type=float, location='args')
+
 class AllDocs(Resource):
 
     def post(self) -> flaskTyping.ResponseReturnValue:
@@ -48,11 +81,23 @@ class AllDocs(Resource):
         return Response(handler).get()
 
     def get(self) -> flaskTyping.ResponseReturnValue:
-        query_string = parser_code_doc.parse_args()["filter"]
-        handler = HandlerRequestGetAllDocs(query_string)
+        params = ParamsQueryDocs(**parser_docs.parse_args())
+        #Синхронизация: изменения после курсора changed_since
+        if params.changed_since is not None:
+            handler = HandlerRequestGetChangedDocs(params)
+        else:
+            handler = HandlerRequestGetAllDocs(params)
         return Response(handler).get()
 
 
+class ExportDocs(Resource):
+
+    def get(self) -> flaskTyping.ResponseReturnValue:
+        params = ParamsQueryDocs(**parser_export.parse_args())
+        handler = HandlerRequestExportDocs(params)
+        return ResponseExport(handler, filename="docs").get()
+
+
 class Doc(Resource):
 
     def patch(self, id_doc: int) -> flaskTyping.ResponseReturnValue:
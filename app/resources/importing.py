@@ -0,0 +1,17 @@
+from flask_restful import Resource
+from flask import typing as flaskTyping, request
+from controller.api.handlers.importing import HandlerRequestImport
+from controller.api.response import Response
+
+
+FORMATS_IMPORT = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson'}
+
+class Import(Resource):
+
+    def post(self, table: str) -> flaskTyping.ResponseReturnValue:
+        handler = HandlerRequestImport(
+            table=table,
+            text=request.get_data(as_text=True),
+            format=FORMATS_IMPORT.get(request.mimetype)
+        )
+        return Response(handler).get()
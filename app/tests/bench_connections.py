@@ -0,0 +1,125 @@
+"""Бенчмарк: сколько соединений SQLite открывает один запрос.
+
+Запуск из каталога app:
+    python -m tests.bench_connections [--baseline] [число запросов]
+
+--baseline - сырой SQL открывает новое соединение на каждый with, как
+database.db.SQLite до user-001.
+"""
+import argparse
+import os
+import sqlite3
+import time
+from sqlite3 import dbapi2
+from tests.environment import sets_up_environment
+
+
+sets_up_environment()
+
+#Счетчик открытых соединений: SQLAlchemy открывает их через dbapi2.connect
+opened = 0
+_connect = dbapi2.connect
+
+
+def counting_connect(*args, **kwargs):
+    global opened
+    opened += 1
+    return _connect(*args, **kwargs)
+
+
+sqlite3.connect = dbapi2.connect = counting_connect
+
+from app import app
+from controller.service_layer.cookies import CreatorCookieSession
+from database import (db, db_docs, db_auth, db_app_interface,
+    db_table_versions, db_import)
+
+
+class SQLiteBaseline:
+    """SQLite до user-001: новое соединение на каждый with, фиксация и
+    закрытие на выходе."""
+
+    def __init__(self, immediate = False):
+        self.__immediate = immediate
+        self.__connect = None
+
+    def __enter__(self):
+        path = os.environ['DATABASE_URI'].removeprefix('sqlite:///')
+        self.__connect = sqlite3.connect(path)
+        cursor = self.__connect.cursor()
+        if self.__immediate:
+            cursor.execute("BEGIN IMMEDIATE")
+        return cursor
+
+    def __exit__(self, type, value, traceback):
+        self.__connect.commit()
+        self.__connect.close()
+
+
+def uses_baseline() -> None:
+    """Подменяет SQLite модулей сырого SQL на SQLiteBaseline."""
+    for module in (db, db_docs, db_auth, db_app_interface,
+        db_table_versions, db_import):
+        module.SQLite = SQLiteBaseline
+
+
+def href(path: str) -> str:
+    return f"http://localhost/api/1.0{path}"
+
+
+def creates_code_doc() -> dict:
+    """Тело запроса на добавление кода документа."""
+    return {
+        'bpm': {'meta': {
+            'href': href('/bpm/1'), 'type': "process management"}},
+        'type_doc': {'meta': {
+            'href': href('/docs/types/1'),
+            'type': "document management system"}},
+        'company': {'meta': {'href': href('/company/1'), 'type': "company"}},
+    }
+
+
+def measures(name: str, requests, count: int) -> None:
+    """Выполняет запросы и печатает число соединений и время на запрос.
+    Первый запрос - прогрев: открывает соединение пула."""
+    global opened
+    assert requests(0).status_code < 400
+    opened_before = opened
+    start = time.perf_counter()
+    for i in range(count):
+        requests(i)
+    seconds = time.perf_counter() - start
+    print(f"{name}: {(opened - opened_before) / count:.2f} соединений "
+          f"на запрос, {seconds / count * 1000:.2f} мс на запрос")
+
+
+def main(count: int) -> None:
+    client = app.test_client()
+    client.set_cookie(
+        'localhost', 'Session', CreatorCookieSession().creates(1, 0))
+    measures(
+        "POST /docs/code",
+        lambda i: client.post('/api/1.0/docs/code', json=creates_code_doc()),
+        count
+    )
+    measures(
+        "GET /docs/code",
+        lambda i: client.get('/api/1.0/docs/code'),
+        count
+    )
+    measures(
+        "GET /company",
+        lambda i: client.get('/api/1.0/company'),
+        count
+    )
+    print(f"Всего открыто соединений: {opened}")
+
+
+if __name__ == '__main__':
+    args = argparse.ArgumentParser()
+    args.add_argument('count', type=int, nargs='?', default=200)
+    args.add_argument('--baseline', action='store_true')
+    args = args.parse_args()
+    if args.baseline:
+        uses_baseline()
+    main(args.count)
@@ -0,0 +1,88 @@
+"""Микробенчмарк парсера фильтра: время разбора на одно условие.
+
+Запуск из каталога app:
+    python -m tests.bench_query_string_parser [--baseline <ревизия git>]
+
+С --baseline парсер той же ревизии берется из git и измеряется на тех же
+фильтрах, например: --baseline b9c1c45 - парсер до user-011.
+"""
+import argparse
+import logging
+import subprocess
+import timeit
+import types
+from controller.api import query_string_parser
+from controller.api.query_string_parser import FieldQuery
+
+
+PATH_PARSER = 'app/controller/api/query_string_parser.py'
+USERS = 'http://localhost/api/1.0/users/'
+
+FIELDS = [
+    FieldQuery(
+        name_in_db='id_responsible', name='responsible',
+        operators=['!=', '='], prefix=USERS, null=False, type=str),
+    FieldQuery(
+        name_in_db='id_creator', name='creator',
+        operators=['!=', '='], prefix=USERS, null=False, type=str),
+    FieldQuery(
+        name_in_db='actual', name='actual',
+        operators=['!=', '='], prefix='', null=False, type=bool),
+    FieldQuery(
+        name_in_db='version', name='version',
+        operators=['!=', '=', '>=', '>', '<=', '<'], prefix='', null=False,
+        type=int),
+]
+
+#Фильтры: (число условий, строка)
+FILTERS = [
+    (1, "(actual=true)"),
+    (5, f"(creator={USERS}1;creator={USERS}2),(actual=true;version>=2),"
+        f"(responsible!={USERS}3)"),
+    (20, ",".join(
+        f"(creator={USERS}{i};version>{i};"
+        f"actual=true;responsible!={USERS}{i})" for i in range(5))),
+]
+
+
+def loads_parser_from_revision(revision: str) -> types.ModuleType:
+    """Загружает модуль парсера из ревизии git."""
+    source = subprocess.run(
+        ['git', 'show', f'{revision}:{PATH_PARSER}'],
+        capture_output=True, text=True, check=True
+    ).stdout
+    module = types.ModuleType(f'query_string_parser_{revision}')
+    exec(compile(source, PATH_PARSER, 'exec'), module.__dict__)
+    return module
+
+
+def measures(module: types.ModuleType, number: int) -> list[float]:
+    """Получает время разбора на одно условие, мкс, для каждого фильтра."""
+    results = []
+    for count, string in FILTERS:
+        parses = lambda: module.QueryStringParser(
+            string=string, fields=FIELDS).get_list_logic_conditions()
+        parses()
+        seconds = min(timeit.repeat(parses, number=number, repeat=3))
+        results.append(seconds / number / count * 1e6)
+    return results
+
+
+def main() -> None:
+    args = argparse.ArgumentParser()
+    args.add_argument('--baseline', help="ревизия git для сравнения")
+    args.add_argument('--number', type=int, default=5000)
+    args = args.parse_args()
+    #Старый парсер пишет отладочный лог на каждый разбор
+    logging.disable(logging.CRITICAL)
+    implementations = [('текущий', query_string_parser)]
+    if args.baseline:
+        implementations.append(
+            (args.baseline, loads_parser_from_revision(args.baseline)))
+    for name, module in implementations:
+        for (count, _), result in zip(FILTERS, measures(module, args.number)):
+            print(f"{name}, условий {count}: {result:.1f} мкс на условие")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Бенчмарк поиска документов: LIKE по названию, коду и типу против FTS5.
+
+Запуск из каталога app:
+    python -m tests.bench_search [--rows 1000000]
+
+Для каждого слова печатается время запроса первой страницы (100 строк):
+LIKE '%слово%' без индекса, MATCH по documents_fts и запрос к API
+/docs/?search=. Редкое слово есть в --rows / 1000 документах, частое - во
+всех: LIKE находит первую страницу частого слова сразу, а FTS5 ранжирует
+все совпадения.
+"""
+import argparse
+import time
+import timeit
+from sqlalchemy import text
+from tests.environment import sets_up_environment
+
+
+sets_up_environment()
+
+from app import app
+from database.models.database import db
+from controller.api.handlers.doc import creates_match_fts
+from controller.service_layer.cookies import CreatorCookieSession
+
+
+CHUNK = 50000
+LIMIT = 100
+#(название, слово поиска)
+WORDS = [("редкое", "тема123"), ("частое", "Документ"), ("нет", "отсутствует")]
+
+SQL_LIKE = text(f"""
+    SELECT d.id
+    FROM documents as d
+    JOIN code_documents as c ON c.id = d.id_code_doc
+    JOIN types_documents as t ON t.id = c.id_type_doc
+    WHERE d.name LIKE :like OR c.code LIKE :like OR t.name LIKE :like
+    ORDER BY d.id
+    LIMIT {LIMIT}
+""")
+SQL_FTS = text(f"""
+    SELECT d.id
+    FROM documents as d
+    JOIN (
+        SELECT rowid as id, rank FROM documents_fts
+        WHERE documents_fts MATCH :match
+    ) as found ON found.id = d.id
+    ORDER BY found.rank, d.id
+    LIMIT {LIMIT}
+""")
+
+
+def inserts_rows(rows: int) -> None:
+    """Добавляет документы порциями. Триггеры заполняют documents_fts."""
+    with app.app_context():
+        for start in range(0, rows, CHUNK):
+            db.session.execute(text("""
+                INSERT INTO documents (
+                    id_code_doc, name, date_start, date_finish,
+                    id_responsible, id_creator
+                )
+                VALUES (3, :name, '2022-01-01', '2023-01-01', 2, 1)
+            """), [{'name': f"Документ {i} тема{i % 1000}"}
+                for i in range(start, min(start + CHUNK, rows))])
+            db.session.commit()
+
+
+def measures(name: str, executes) -> None:
+    """Печатает лучшее из пяти время запроса."""
+    seconds = min(timeit.repeat(executes, number=1, repeat=5))
+    print(f"    {name}: {seconds * 1000:.1f} мс")
+
+
+def main() -> None:
+    args = argparse.ArgumentParser()
+    args.add_argument('--rows', type=int, default=1000000)
+    args = args.parse_args()
+    start = time.perf_counter()
+    inserts_rows(args.rows)
+    print(f"Документов: {args.rows}, добавлены за "
+          f"{time.perf_counter() - start:.0f} с")
+    client = app.test_client()
+    client.set_cookie(
+        'localhost', 'Session', CreatorCookieSession().creates(1, 0))
+    with app.app_context():
+        for name, word in WORDS:
+            print(f"{name} ({word}):")
+            like = {'like': f"%{word}%"}
+            match = {'match': creates_match_fts(word)}
+            measures("LIKE", lambda: db.session.execute(SQL_LIKE, like).all())
+            measures("FTS5", lambda: db.session.execute(SQL_FTS, match).all())
+            url = f"/api/1.0/docs/?search={word}&limit={LIMIT}"
+            assert client.get(url).status_code == 200
+            measures("API", lambda: client.get(url).get_data())
+
+
+if __name__ == '__main__':
+    main()
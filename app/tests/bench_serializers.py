@@ -0,0 +1,142 @@
+"""Бенчмарк сериализации больших ответов: список компаний без страниц и
+выгрузка документов NDJSON.
+
+Запуск из каталога app:
+    python -m tests.bench_serializers [--rows 50000]
+
+Список компаний измеряется в трех вариантах: baseline - строки TypedDict
+со ссылкой make_href на строку и jsonify, как до user-017; json и orjson -
+RowSerializer и dumps_json со стандартным json и с orjson. Кэш справочных
+данных очищается перед каждым запросом: измеряется создание документа, а
+не чтение из кэша. Выгрузки до user-017 не было, она измеряется с json и
+orjson.
+"""
+import argparse
+import time
+import timeit
+from contextlib import contextmanager
+from flask import jsonify, make_response
+from sqlalchemy import text
+from tests.environment import sets_up_environment
+
+
+sets_up_environment()
+
+from app import app
+from controller import common
+from controller.api import for_api
+from controller.api.handlers.company import (HandlerRequestGetAllCompany,
+    Meta, MetaAllCompany, DocumentCompany, DocumentAllCompany)
+from controller.service_layer import reference_cache
+from database.models.database import db
+from controller.service_layer.cookies import CreatorCookieSession
+
+
+def inserts_rows(rows: int) -> None:
+    """Добавляет компании и документы."""
+    with app.app_context():
+        db.session.execute(
+            text("INSERT INTO company (name) VALUES (:name)"),
+            [{'name': f"Компания {i}"} for i in range(rows)]
+        )
+        db.session.execute(text("""
+            INSERT INTO documents (
+                id_code_doc, name, date_start, date_finish,
+                id_responsible, id_creator
+            )
+            VALUES (3, :name, '2022-01-01', '2023-01-01', 2, 1)
+        """), [{'name': f"Документ {i}"} for i in range(rows)])
+        db.session.commit()
+
+
+def creates_document_baseline(self, orm_models) -> DocumentAllCompany:
+    """Создает документ списка компаний, как до user-017."""
+    meta = MetaAllCompany(
+        href=for_api.make_href(path="/company"),
+        type="company",
+        size=len(orm_models)
+    )
+    rows = [
+        DocumentCompany(
+            meta=Meta(
+                href=for_api.make_href(path=f"/company/{model.id}"),
+                type="company"
+            ),
+            id=model.id,
+            name=model.name
+        ) for model in orm_models]
+    return DocumentAllCompany(meta=meta, rows=rows)
+
+
+def makes_json_response_baseline(document, status_code):
+    """Делает ответ в формате JSON, как до user-017."""
+    return make_response(jsonify(document), status_code)
+
+
+@contextmanager
+def uses_variant(variant: str):
+    """Подменяет создание документа и сериализацию на время вызова."""
+    orjson = common.orjson
+    make_json_response = common.make_json_response
+    create_document = HandlerRequestGetAllCompany._create_document
+    if variant != 'orjson':
+        common.orjson = None
+    if variant == 'baseline':
+        common.make_json_response = makes_json_response_baseline
+        HandlerRequestGetAllCompany._create_document = \
+            creates_document_baseline
+    try:
+        yield
+    finally:
+        common.orjson = orjson
+        common.make_json_response = make_json_response
+        HandlerRequestGetAllCompany._create_document = create_document
+
+
+def measures(name: str, requests) -> None:
+    """Печатает лучшее из трех время запроса и размер ответа. Перед
+    каждым запросом кэш справочных данных очищается."""
+    def requests_uncached():
+        reference_cache.reference_cache.clear()
+        response = requests()
+        response.get_data()
+        return response
+
+    response = requests_uncached()
+    assert response.status_code == 200
+    size = len(response.get_data())
+    seconds = min(timeit.repeat(requests_uncached, number=1, repeat=3))
+    print(f"{name}: {seconds:.2f} с, {size / 2**20:.1f} МБ")
+
+
+def main() -> None:
+    args = argparse.ArgumentParser()
+    args.add_argument('--rows', type=int, default=50000)
+    args = args.parse_args()
+    start = time.perf_counter()
+    inserts_rows(args.rows)
+    print(f"Строк: {args.rows}, добавлены за "
+          f"{time.perf_counter() - start:.0f} с")
+    client = app.test_client()
+    client.set_cookie(
+        'localhost', 'Session', CreatorCookieSession().creates(1, 0))
+    variants = ['baseline', 'json']
+    if common.orjson is not None:
+        variants.append('orjson')
+    for variant in variants:
+        with uses_variant(variant):
+            measures(f"GET /company, {variant}",
+                lambda: client.get('/api/1.0/company'))
+    for variant in variants[1:]:
+        with uses_variant(variant):
+            measures(
+                f"GET /docs/export, {variant}",
+                lambda: client.get(
+                    '/api/1.0/docs/export',
+                    headers={'Accept': 'application/x-ndjson'}
+                )
+            )
+
+
+if __name__ == '__main__':
+    main()
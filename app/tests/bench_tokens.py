@@ -0,0 +1,96 @@
+"""Бенчмарк проверки кук: токен с подписью и счетчиком смены пароля.
+
+Запуск из каталога app:
+    python -m tests.bench_tokens [--users 10000] [число проверок]
+
+Измеряется проверка куки сессии: подпись и срок токена без кэша, проверка
+с промахом и с попаданием в кэш проверенных кук, и для сравнения чтение
+счетчика пользователя из БД - обращение к БД, которого проверка избегает.
+Запрос GET /company измеряется целиком. Счетчики смены пароля читаются из
+БД не чаще раза в PASSWORD_GENERATIONS_TTL на пользователя: перед
+измерением они прочитаны. Попадания измеряются на стольких куках, сколько
+помещается в кэш проверенных кук.
+"""
+import argparse
+import time
+from sqlalchemy import text
+from tests.environment import sets_up_environment
+
+
+sets_up_environment()
+
+from app import app
+from controller.service_layer import authentication, password_generations
+from controller.service_layer.cookies import (CreatorCookieSession,
+    GetterDataFromCookieSession)
+from database import db_auth
+from database.models.database import db
+
+
+def inserts_users(users: int) -> list[int]:
+    """Добавляет пользователей. Возвращает их id."""
+    with app.app_context():
+        id_max = db.session.execute(text("SELECT max(id) FROM users")).scalar()
+        db.session.execute(text("""
+            INSERT INTO users
+                (id, last_name, first_name, patronymic, email, company_id)
+            VALUES (:id, 'Бенчмарк', 'Бенчмарк', 'Бенчмарк', :email, 1)
+        """), [
+            {'id': user_id, 'email': f"bench{user_id}@bein.ru"}
+            for user_id in range(id_max + 1, id_max + 1 + users)
+        ])
+        db.session.commit()
+        return db.session.execute(text("SELECT id FROM users")).scalars().all()
+
+
+def measures(name: str, verifies, cookies: list[str], count: int) -> None:
+    """Выполняет проверки по кругу кук и печатает время на проверку."""
+    start = time.perf_counter()
+    for i in range(count):
+        assert verifies(cookies[i % len(cookies)]) is not None
+    seconds = time.perf_counter() - start
+    print(f"{name}: {seconds / count * 1e6:.1f} мкс на проверку")
+
+
+def main(users: int, count: int) -> None:
+    user_ids = inserts_users(users)
+    cookies = [CreatorCookieSession().creates(user_id, 0)
+        for user_id in user_ids]
+    getter = authentication.GetterUserIDFromCookieSession()
+    with app.test_request_context():
+        measures(
+            "подпись и срок токена",
+            GetterDataFromCookieSession().get, cookies, count)
+        for user_id in user_ids:
+            password_generations.password_generations.loads(user_id)
+        measures(
+            "счетчик из БД",
+            lambda cookie: db_auth.get_password_generation(user_ids[0]),
+            cookies, count)
+
+        def verifies_uncached(cookie):
+            authentication.verified_cookies_cache.clear()
+            return getter.get(cookie)
+
+        measures("кука, промах кэша", verifies_uncached, cookies, count)
+        cookies_cached = cookies[:authentication.VERIFIED_COOKIES_CACHE_SIZE]
+        for cookie in cookies_cached:
+            getter.get(cookie)
+        measures(
+            "кука, попадание в кэш", getter.get, cookies_cached, count)
+    client = app.test_client()
+    client.set_cookie('localhost', 'Session', cookies[0])
+    assert client.get('/api/1.0/company').status_code == 200
+    start = time.perf_counter()
+    for i in range(count):
+        client.get('/api/1.0/company')
+    seconds = time.perf_counter() - start
+    print(f"GET /company: {seconds / count * 1000:.2f} мс на запрос")
+
+
+if __name__ == '__main__':
+    args = argparse.ArgumentParser()
+    args.add_argument('count', type=int, nargs='?', default=10000)
+    args.add_argument('--users', type=int, default=10000)
+    args = args.parse_args()
+    main(args.users, args.count)
@@ -0,0 +1,28 @@
+from tests.environment import sets_up_environment
+
+#БД задается до импорта приложения
+sets_up_environment()
+
+import pytest
+from app import app as flask_app
+from database.models.database import db as flask_db
+from controller.service_layer.cookies import CreatorCookieSession
+
+
+@pytest.fixture
+def app():
+    return flask_app
+
+
+@pytest.fixture
+def db():
+    return flask_db
+
+
+@pytest.fixture
+def client(app):
+    """Клиент, аутентифицированный пользователем 1."""
+    client = app.test_client()
+    client.set_cookie(
+        'localhost', 'Session', CreatorCookieSession().creates(1, 0))
+    return client
@@ -0,0 +1,26 @@
+"""Окружение тестов и бенчмарков: временная БД из schema.sql"""
+import logging
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+
+
+SCHEMA = Path(__file__).with_name('schema.sql')
+
+
+def sets_up_environment() -> Path:
+    """Создает временную БД из schema.sql и задает ее приложению вместе
+    с ключом подписи кук. Вызывается до импорта app: адрес БД и ключ
+    читаются при импорте, там же применяются миграции. Возвращает путь к
+    файлу БД."""
+    directory = Path(tempfile.mkdtemp(prefix='bein-crm-'))
+    path = directory / 'info_portal.sqlite'
+    with closing(sqlite3.connect(path)) as connect:
+        connect.executescript(SCHEMA.read_text(encoding='utf-8'))
+    os.environ['DATABASE_URI'] = f'sqlite:///{path}'
+    os.environ.setdefault('SECRET_KEY', 'tests-secret-key')
+    #Логи приложения пишутся в файлы рабочего каталога
+    logging.disable(logging.CRITICAL)
+    return path
@@ -0,0 +1,121 @@
+--Схема БД до миграций и начальные данные для тестов. Миграции
+--применяются при импорте приложения.
+CREATE TABLE company (
+	id INTEGER PRIMARY KEY NOT NULL,
+	name TEXT NOT NULL
+);
+CREATE TABLE users (
+	id INTEGER PRIMARY KEY NOT NULL,
+	last_name TEXT NOT NULL,
+	first_name TEXT NOT NULL,
+	patronymic TEXT NOT NULL,
+	email TEXT NOT NULL,
+	company_id INTEGER NOT NULL,
+	FOREIGN KEY (company_id) REFERENCES company(id)
+);
+CREATE TABLE invitation_tokens (
+	user_id INTEGER PRIMARY KEY NOT NULL,
+	invitation_token TEXT NOT NULL,
+	FOREIGN KEY (user_id) REFERENCES users(id)
+);
+CREATE TABLE pages (
+	page_id INTEGER PRIMARY KEY NOT NULL,
+	page_uri TEXT NOT NULL
+);
+CREATE TABLE permit_view_page (
+	user_id INTEGER NOT NULL,
+	page_id INTEGER NOT NULL,
+	FOREIGN KEY (user_id) REFERENCES users(id),
+	FOREIGN KEY (page_id) REFERENCES pages(page_id)
+);
+CREATE TABLE side_menu_items (
+	side_menu_item_id INTEGER PRIMARY KEY NOT NULL,
+	side_menu_item_name TEXT NOT NULL,
+	side_menu_item_parent_id INTEGER NOT NULL,
+	page_id INTEGER NULL
+);
+CREATE TABLE user_authorization (
+	user_id INTEGER NOT NULL,
+	hashed_password TEXT NOT NULL,
+	FOREIGN KEY (user_id) REFERENCES users(id)
+);
+CREATE TABLE bpm (
+	id INTEGER PRIMARY KEY NOT NULL,
+	code TEXT NOT NULL,
+	name TEXT NOT NULL,
+	id_company INTEGER NOT NULL,
+	id_owner INTEGER NULL,
+	lvl INTEGER NOT NULL,
+	id_parent INTEGER NULL,
+	FOREIGN KEY (id_company) REFERENCES company(id),
+	FOREIGN KEY (id_owner) REFERENCES users(id),
+	FOREIGN KEY (id_parent) REFERENCES bpm(id)
+);
+CREATE TABLE types_documents (
+	id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+	name TEXT NOT NULL UNIQUE,
+	abv TEXT NOT NULL UNIQUE,
+	layer TEXT CHECK(layer IN ('in', 'out')) NOT NULL
+);
+CREATE TABLE code_documents (
+	id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+	id_bpm INTEGER NOT NULL,
+	id_type_doc INTEGER NOT NULL,
+	id_company INTEGER NOT NULL,
+	number INTEGER NOT NULL,
+	id_creator INTEGER NOT NULL,
+	used INTEGER NOT NULL DEFAULT(0),
+	FOREIGN KEY (id_bpm) REFERENCES bpm(id),
+	FOREIGN KEY (id_type_doc) REFERENCES types_documents(id),
+	FOREIGN KEY (id_company) REFERENCES company(id),
+	FOREIGN KEY (id_creator) REFERENCES users(id)
+);
+CREATE TABLE documents (
+	id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+	id_code_doc INTEGER NOT NULL,
+	name TEXT NOT NULL,
+	date_start TEXT NOT NULL,
+	date_finish TEXT NOT NULL,
+	id_responsible INTEGER NOT NULL,
+	version INTEGER NOT NULL DEFAULT(1),
+	actual INTEGER NOT NULL DEFAULT(1),
+	id_creator INTEGER NOT NULL,
+	FOREIGN KEY (id_code_doc) REFERENCES code_documents(id),
+	FOREIGN KEY (id_responsible) REFERENCES users(id),
+	FOREIGN KEY (id_creator) REFERENCES users(id)
+);
+
+INSERT INTO company VALUES (1, 'Бейн'), (2, 'Другая');
+INSERT INTO users VALUES
+	(1, 'Иванов', 'Иван', 'Иванович', 'ivan@bein.ru', 1),
+	(2, 'Петров', 'Петр', 'Петрович', 'petr@bein.ru', 1),
+	(3, 'Сидоров', 'Сидор', 'Сидорович', 'sidor@bein.ru', 1);
+--Пароль пользователей 1 и 3: Password1
+INSERT INTO user_authorization VALUES
+	(1, '8C9CB2344C806D7440B90E601A2C28F9CDF84BC988585B3E83294161AED167D7'),
+	(3, '8C9CB2344C806D7440B90E601A2C28F9CDF84BC988585B3E83294161AED167D7');
+INSERT INTO invitation_tokens VALUES (2, 'token-2');
+INSERT INTO pages VALUES (1, '/app'), (2, '/app/account');
+INSERT INTO permit_view_page VALUES (1, 1), (1, 2);
+INSERT INTO side_menu_items VALUES
+	(1, 'Документация', 0, NULL),
+	(2, 'Главная', 1, 1);
+INSERT INTO bpm VALUES
+	(1, 'П1', 'Процесс 1', 1, 1, 1, NULL),
+	(2, 'П1.1', 'Подпроцесс', 1, 1, 2, 1),
+	(3, 'П1.1.1', 'Подподпроцесс', 1, NULL, 3, 2),
+	(4, 'П2', 'Процесс 2', 1, NULL, 1, NULL);
+INSERT INTO types_documents (id, name, abv, layer) VALUES
+	(1, 'Инструкция', 'И', 'in'),
+	(2, 'Положение', 'П', 'out');
+INSERT INTO code_documents
+	(id_bpm, id_type_doc, id_company, number, id_creator, used)
+VALUES
+	(1, 1, 1, 1, 1, 1),
+	(1, 1, 1, 2, 1, 0),
+	(2, 2, 1, 1, 1, 1);
+INSERT INTO documents
+	(id_code_doc, name, date_start, date_finish, id_responsible, id_creator)
+VALUES
+	(1, 'Об учете', '2022-01-01', '2023-01-01', 1, 1),
+	(3, 'О качестве', '2022-03-01', '2022-12-01', 2, 1);
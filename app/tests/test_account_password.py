@@ -0,0 +1,73 @@
+"""Смена пароля через API: старая кука авторизации перестает проходить
+проверку, новая - проходит."""
+import pytest
+from sqlalchemy import text
+from werkzeug.http import parse_cookie
+from controller.service_layer.cookies import CreatorCookieAuth
+from utilities.other import HashingData
+
+
+USER_ID = 4
+PASSWORD = "Password1"
+NEW_PASSWORD = "NewPassword2"
+
+
+@pytest.fixture
+def cookie_auth(app, db):
+    """Добавляет пользователя, чей пароль меняет тест: смена пароля
+    отзывает куки пользователя, и другие тесты его не используют.
+    Получает куку авторизации с текущим счетчиком смены пароля."""
+    with app.app_context():
+        db.session.execute(text("""
+            INSERT OR IGNORE INTO users
+                (id, last_name, first_name, patronymic, email, company_id)
+            VALUES (:id, 'Смирнов', 'Семен', 'Семенович', 'semen@bein.ru', 1)
+        """), {'id': USER_ID})
+        db.session.execute(
+            text("DELETE FROM user_authorization WHERE user_id = :id"),
+            {'id': USER_ID}
+        )
+        db.session.execute(text("""
+            INSERT INTO user_authorization (user_id, hashed_password)
+            VALUES (:id, :hashed_password)
+        """), {
+            'id': USER_ID,
+            'hashed_password': HashingData().calculate_hash(PASSWORD)
+        })
+        generation = db.session.execute(
+            text("SELECT password_generation FROM users WHERE id = :id"),
+            {'id': USER_ID}
+        ).scalar()
+        db.session.commit()
+    return CreatorCookieAuth().creates(USER_ID, generation)
+
+
+def gets_company(app, cookie_auth: str) -> int:
+    """Выполняет запрос только с кукой авторизации."""
+    client = app.test_client()
+    client.set_cookie('localhost', 'Auth', cookie_auth)
+    return client.get('/api/1.0/company').status_code
+
+
+def test_change_password_revokes_old_cookie(app, cookie_auth):
+    cookie_auth_old = cookie_auth
+    assert gets_company(app, cookie_auth_old) == 200
+    client = app.test_client()
+    client.set_cookie('localhost', 'Auth', cookie_auth_old)
+    response = client.put(
+        f'/api/1.0/users/{USER_ID}/account/password',
+        json={'password': PASSWORD, 'new_password': NEW_PASSWORD}
+    )
+    assert response.status_code == 201, response.get_json()
+    cookie_auth_new = parse_cookie(response.headers['Set-Cookie'])['Auth']
+    assert cookie_auth_new != cookie_auth_old
+    assert gets_company(app, cookie_auth_old) == 401
+    assert gets_company(app, cookie_auth_new) == 200
+
+
+def test_change_password_without_fields(app, cookie_auth):
+    client = app.test_client()
+    client.set_cookie('localhost', 'Auth', cookie_auth)
+    response = client.put(
+        f'/api/1.0/users/{USER_ID}/account/password', json={})
+    assert response.status_code == 400
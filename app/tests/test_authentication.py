@@ -0,0 +1,41 @@
+"""Куки проверяются один раз на запрос, даже если пользователя запроса
+получают несколько обработчиков."""
+import pytest
+from controller.service_layer import authentication_info
+
+
+@pytest.fixture
+def verifications(monkeypatch) -> list[tuple[str, str]]:
+    """Запоминает куки, проверяемые аутентификацией."""
+    cookies = []
+    authentication = authentication_info.AuthenticationByCookies
+
+    def verifying(cookie_session, cookie_auth):
+        cookies.append((cookie_session, cookie_auth))
+        return authentication(cookie_session, cookie_auth)
+
+    monkeypatch.setattr(
+        authentication_info, 'AuthenticationByCookies', verifying)
+    return cookies
+
+
+@pytest.mark.parametrize('url', [
+    "/api/1.0/docs/?expand=creator",
+    "/api/1.0/company",
+])
+def test_request_verifies_once(client, verifications, url):
+    response = client.get(url, follow_redirects=True)
+    assert response.status_code == 200, response.get_json()
+    assert len(verifications) == 1
+
+
+def test_batch_verifies_once(client, verifications):
+    response = client.post("/api/1.0/batch", json={'requests': [
+        {'method': 'GET', 'path': "/api/1.0/company"},
+        {'method': 'GET', 'path': "/api/1.0/bpm"},
+        {'method': 'GET', 'path': "/api/1.0/docs/code"},
+    ]})
+    assert response.status_code == 200, response.get_json()
+    assert [sub['status'] for sub in response.get_json()['responses']] == [
+        200, 200, 200]
+    assert len(verifications) == 1
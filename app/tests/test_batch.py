@@ -0,0 +1,92 @@
+"""Пакетный запрос: ответ на каждый подзапрос, ошибка или исключение
+подзапроса откатывает только его, размер пакета ограничен."""
+import pytest
+from sqlalchemy import text
+from controller.api.handlers import code_doc
+from controller.api.handlers.batch import BATCH_MAX
+
+
+HREF = "http://localhost/api/1.0"
+
+CODE_DOC = {
+    'bpm': {'meta': {
+        'href': f"{HREF}/bpm/4", 'type': "process management"}},
+    'type_doc': {'meta': {
+        'href': f"{HREF}/docs/types/2", 'type': "document management system"}},
+    'company': {'meta': {'href': f"{HREF}/company/1", 'type': "company"}},
+}
+
+
+def posts_batch(client, requests: list[dict]) -> list[dict]:
+    response = client.post('/api/1.0/batch', json={'requests': requests})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['responses']
+
+
+def counts_code_docs(app, db) -> int:
+    with app.app_context():
+        return db.session.execute(
+            text("SELECT count(*) FROM code_documents")).scalar()
+
+
+def test_mixed_success_and_failure(app, db, client):
+    count = counts_code_docs(app, db)
+    responses = posts_batch(client, [
+        {'method': 'GET', 'path': "/api/1.0/company"},
+        {'method': 'GET', 'path': "/api/1.0/unknown"},
+        {'method': 'POST', 'path': "/api/1.0/docs/code", 'body': {}},
+        {'method': 'POST', 'path': "/api/1.0/docs/code", 'body': CODE_DOC},
+        {'method': 'POST', 'path': "/api/1.0/batch", 'body': {}},
+    ])
+    assert [response['status'] for response in responses] == [
+        200, 400, 400, 201, 400]
+    assert responses[0]['body']['rows']
+    assert responses[1]['body']['type'] == 'NOT_FOUND_PATH'
+    assert responses[3]['body']['code']
+    assert counts_code_docs(app, db) == count + 1
+
+
+@pytest.mark.parametrize('size, status_code', [
+    (BATCH_MAX, 200), (BATCH_MAX + 1, 400), (0, 400)])
+def test_batch_max(client, size, status_code):
+    requests = [{'method': 'GET', 'path': "/api/1.0/company"}] * size
+    response = client.post('/api/1.0/batch', json={'requests': requests})
+    assert response.status_code == status_code
+    if status_code == 200:
+        assert len(response.get_json()['responses']) == size
+
+
+def test_failed_write_rolls_back(app, db, client):
+    count = counts_code_docs(app, db)
+    bad_row = {**CODE_DOC, 'bpm': {'meta': {
+        'href': f"{HREF}/bpm/999", 'type': "process management"}}}
+    responses = posts_batch(client, [
+        {'method': 'POST', 'path': "/api/1.0/docs/code",
+            'body': {'rows': [CODE_DOC, bad_row]}},
+        {'method': 'POST', 'path': "/api/1.0/docs/code", 'body': CODE_DOC},
+    ])
+    assert [response['status'] for response in responses] == [400, 201]
+    assert counts_code_docs(app, db) == count + 1
+
+
+def test_exception_rolls_back_item(app, db, client, monkeypatch):
+    count = counts_code_docs(app, db)
+    add_code_doc = code_doc.db_docs.add_code_doc
+
+    def adds_and_fails(data):
+        add_code_doc(data)
+        raise RuntimeError("сбой после записи")
+
+    monkeypatch.setattr(code_doc.db_docs, 'add_code_doc', adds_and_fails)
+    responses = posts_batch(client, [
+        {'method': 'POST', 'path': "/api/1.0/docs/code", 'body': CODE_DOC},
+        {'method': 'GET', 'path': "/api/1.0/company"},
+    ])
+    assert [response['status'] for response in responses] == [500, 200]
+    assert responses[0]['body']['type'] == 'INTERNAL_ERROR'
+    assert counts_code_docs(app, db) == count
+    monkeypatch.undo()
+    responses = posts_batch(client, [
+        {'method': 'POST', 'path': "/api/1.0/docs/code", 'body': CODE_DOC}])
+    assert responses[0]['status'] == 201
+    assert counts_code_docs(app, db) == count + 1
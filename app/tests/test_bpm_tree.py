@@ -0,0 +1,136 @@
+"""Таблица замыкания дерева бизнес процессов: триггеры поддерживают ее при
+переносе и удалении, перенос внутрь своего поддерева отклоняется. Дерево
+/bpm/tree строится по ней."""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+
+#Процессы теста: (id, код, родитель, уровень)
+BPM = [
+    (100, 'Т1', None, 1),
+    (101, 'Т1.1', 100, 2),
+    (102, 'Т1.1.1', 101, 3),
+    (103, 'Т1.2', 100, 2),
+    (104, 'Т2', None, 1),
+]
+
+
+def deletes(app, db) -> None:
+    """Удаляет процессы теста начиная с листьев."""
+    with app.app_context():
+        while db.session.execute(text("""
+            DELETE FROM bpm
+            WHERE id >= 100 and id NOT IN (
+                SELECT id_parent FROM bpm WHERE id_parent IS NOT NULL)
+        """)).rowcount:
+            pass
+        db.session.commit()
+
+
+@pytest.fixture
+def bpm(app, db):
+    """Добавляет процессы теста, после теста удаляет их."""
+    def executes(statement: str, params=None) -> None:
+        with app.app_context():
+            db.session.execute(text(statement), params)
+            db.session.commit()
+    deletes(app, db)
+    for id, code, id_parent, lvl in BPM:
+        executes("""
+            INSERT INTO bpm (id, code, name, id_company, lvl, id_parent)
+            VALUES (:id, :code, :code, 1, :lvl, :id_parent)
+        """, {'id': id, 'code': code, 'id_parent': id_parent, 'lvl': lvl})
+    yield executes
+    deletes(app, db)
+
+
+def gets_closure(app, db) -> set[tuple[int, int, int]]:
+    """Получает строки замыкания процессов теста."""
+    with app.app_context():
+        return set(db.session.execute(text("""
+            SELECT id_ancestor, id_descendant, depth FROM bpm_closure
+            WHERE id_descendant >= 100
+        """)).all())
+
+
+def test_closure_after_insert(app, db, bpm):
+    assert gets_closure(app, db) == {
+        (100, 100, 0), (101, 101, 0), (102, 102, 0), (103, 103, 0),
+        (104, 104, 0),
+        (100, 101, 1), (100, 102, 2), (101, 102, 1), (100, 103, 1),
+    }
+
+
+def test_closure_after_move(app, db, bpm):
+    bpm("UPDATE bpm SET id_parent = 104 WHERE id = 101")
+    assert gets_closure(app, db) == {
+        (100, 100, 0), (101, 101, 0), (102, 102, 0), (103, 103, 0),
+        (104, 104, 0),
+        (104, 101, 1), (104, 102, 2), (101, 102, 1), (100, 103, 1),
+    }
+    bpm("UPDATE bpm SET id_parent = 103 WHERE id = 104")
+    assert gets_closure(app, db) == {
+        (100, 100, 0), (101, 101, 0), (102, 102, 0), (103, 103, 0),
+        (104, 104, 0),
+        (100, 103, 1), (100, 104, 2), (100, 101, 3), (100, 102, 4),
+        (103, 104, 1), (103, 101, 2), (103, 102, 3),
+        (104, 101, 1), (104, 102, 2), (101, 102, 1),
+    }
+
+
+def test_closure_after_delete(app, db, bpm):
+    bpm("DELETE FROM bpm WHERE id = 102")
+    bpm("DELETE FROM bpm WHERE id = 103")
+    assert gets_closure(app, db) == {
+        (100, 100, 0), (101, 101, 0), (104, 104, 0), (100, 101, 1),
+    }
+
+
+@pytest.mark.parametrize('id, id_parent', [(100, 100), (100, 102), (101, 102)])
+def test_move_inside_own_subtree(app, db, bpm, id, id_parent):
+    closure = gets_closure(app, db)
+    with pytest.raises(IntegrityError, match='bpm parent inside own subtree'):
+        bpm("UPDATE bpm SET id_parent = :id_parent WHERE id = :id",
+            {'id': id, 'id_parent': id_parent})
+    with app.app_context():
+        db.session.rollback()
+    assert gets_closure(app, db) == closure
+
+
+def gets_tree(client, url: str) -> dict:
+    response = client.get(url, follow_redirects=True)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def nests(rows: list[dict]) -> list:
+    """Получает дерево из id: [(id, [дети]), ...]."""
+    return [(row['id'], nests(row['children'])) for row in rows]
+
+
+def test_tree(client, bpm):
+    document = gets_tree(client, "/api/1.0/bpm/tree?root=100")
+    assert document['meta']['size'] == 4
+    assert nests(document['rows']) == [
+        (100, [(101, [(102, [])]), (103, [])])]
+    document = gets_tree(client, "/api/1.0/bpm/tree")
+    trees = dict(nests(document['rows']))
+    assert trees[100] == [(101, [(102, [])]), (103, [])]
+    assert trees[104] == []
+    assert trees[1] == [(2, [(3, [])])]
+
+
+def test_tree_after_move(client, bpm):
+    gets_tree(client, "/api/1.0/bpm/tree?root=100")
+    bpm("UPDATE bpm SET id_parent = 104, lvl = 2 WHERE id = 101")
+    document = gets_tree(client, "/api/1.0/bpm/tree?root=100")
+    assert nests(document['rows']) == [(100, [(103, [])])]
+    document = gets_tree(client, "/api/1.0/bpm/tree?root=104")
+    assert nests(document['rows']) == [(104, [(101, [(102, [])])])]
+
+
+def test_tree_unknown_root(client):
+    response = client.get("/api/1.0/bpm/tree?root=999", follow_redirects=True)
+    assert response.status_code == 400
+    assert response.get_json()['type'] == 'NOT_FOUND_PATH'
@@ -0,0 +1,184 @@
+"""Синхронизация по курсору changed_since: страницы по возрастанию номера
+изменения, удаленные строки из надгробий, верхняя граница страницы
+читается до строк. Строки, переписанные каскадными триггерами, получают
+номер изменения."""
+import pytest
+from sqlalchemy import text
+from database import db_table_versions
+
+
+HREF = "http://localhost/api/1.0"
+
+
+def meta(href: str, type: str) -> dict:
+    return {'meta': {'href': f"{HREF}{href}", 'type': type}}
+
+
+def adds_document(client) -> tuple[int, int]:
+    """Добавляет код документа процесса 4 и документ с этим кодом.
+    Получает их id."""
+    response = client.post('/api/1.0/docs/code', json={
+        'bpm': meta("/bpm/4", "process management"),
+        'type_doc': meta("/docs/types/1", "document management system"),
+        'company': meta("/company/1", "company"),
+    })
+    assert response.status_code == 201, response.get_json()
+    id_code_doc = response.get_json()['id']
+    response = client.post('/api/1.0/docs/', json={
+        'code_doc': meta(
+            f"/docs/code/{id_code_doc}", "document management system"),
+        'name': "Синхронизация",
+        'date_start': '2022-01-01',
+        'date_finish': '2023-01-01',
+        'responsible': meta("/users/1", "app users"),
+    })
+    assert response.status_code == 201, response.get_json()
+    return id_code_doc, response.get_json()['id']
+
+
+@pytest.fixture
+def document(client) -> tuple[int, int]:
+    return adds_document(client)
+
+
+def changes(client, path: str, cursor: int, limit: int = 1000) -> dict:
+    response = client.get(
+        f"{path}?changed_since={cursor}&limit={limit}", follow_redirects=True)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def follows(client, path: str, cursor: int = 0, limit: int = 1000):
+    """Проходит страницы изменений после курсора. Получает id измененных
+    строк, ссылки удаленных и курсор следующей синхронизации."""
+    ids, deleted = [], []
+    while True:
+        document = changes(client, path, cursor, limit)
+        assert document['meta']['changed_since'] >= cursor
+        ids += [row['id'] for row in document['rows']]
+        deleted += [row['href'] for row in document['deleted']]
+        cursor = document['meta']['changed_since']
+        if document['meta']['next'] is None:
+            return ids, deleted, cursor
+
+
+@pytest.mark.parametrize('path, table', [
+    ("/api/1.0/docs/", 'documents'),
+    ("/api/1.0/docs/code", 'code_documents'),
+])
+def test_pages_follow_change_seq(app, db, client, document, path, table):
+    ids, _, cursor = follows(client, path, limit=2)
+    with app.app_context():
+        expected = db.session.execute(text(f"""
+            SELECT id FROM {table}
+            WHERE change_seq IS NOT NULL
+            ORDER BY change_seq
+        """)).scalars().all()
+        last_seq = db.session.execute(
+            text("SELECT last_seq FROM change_sequence")).scalar()
+    assert ids == expected
+    assert cursor == last_seq
+    document = changes(client, path, cursor)
+    assert document['rows'] == [] and document['deleted'] == []
+    assert document['meta']['changed_since'] == cursor
+
+
+def test_new_rows_after_cursor(client):
+    _, _, cursor = follows(client, "/api/1.0/docs/")
+    _, _, cursor_code = follows(client, "/api/1.0/docs/code")
+    id_code_doc, id_doc = adds_document(client)
+    assert follows(client, "/api/1.0/docs/", cursor)[0] == [id_doc]
+    assert follows(client, "/api/1.0/docs/code", cursor_code)[0] == [
+        id_code_doc]
+
+
+def test_tombstones(client):
+    response = client.post('/api/1.0/docs/code', json={
+        'bpm': meta("/bpm/4", "process management"),
+        'type_doc': meta("/docs/types/2", "document management system"),
+        'company': meta("/company/1", "company"),
+    })
+    id_code_doc = response.get_json()['id']
+    _, _, cursor = follows(client, "/api/1.0/docs/code")
+    response = client.delete(f'/api/1.0/docs/code/{id_code_doc}')
+    assert response.status_code < 300
+    ids, deleted, cursor_next = follows(client, "/api/1.0/docs/code", cursor)
+    assert ids == []
+    assert deleted == [f"{HREF}/docs/code/{id_code_doc}"]
+    assert cursor_next > cursor
+    assert follows(client, "/api/1.0/docs/code", cursor_next)[:2] == ([], [])
+
+
+def test_upper_bound_read_before_rows(client, monkeypatch):
+    _, _, cursor = follows(client, "/api/1.0/docs/")
+    id_code_doc, id_doc = adds_document(client)
+    #Граница прочитана до записи, зафиксированной во время чтения строк:
+    #строка за границей не отдается, курсор ее не пропускает
+    monkeypatch.setattr(
+        db_table_versions, 'get_last_change_seq', lambda: cursor)
+    document_changes = changes(client, "/api/1.0/docs/", cursor)
+    assert document_changes['rows'] == []
+    assert document_changes['meta']['changed_since'] == cursor
+    monkeypatch.undo()
+    assert follows(client, "/api/1.0/docs/", cursor)[0] == [id_doc]
+
+
+#(изменение, отмена изменения, меняется ли код документа)
+CASCADES = [
+    ("UPDATE bpm SET code = code || 'с' WHERE id = 4",
+        "UPDATE bpm SET code = rtrim(code, 'с') WHERE id = 4", True),
+    ("UPDATE types_documents SET abv = abv || 'с' WHERE id = 1",
+        "UPDATE types_documents SET abv = rtrim(abv, 'с') WHERE id = 1",
+        True),
+    ("UPDATE types_documents SET name = name || 'с' WHERE id = 1",
+        "UPDATE types_documents SET name = rtrim(name, 'с') WHERE id = 1",
+        False),
+]
+
+
+@pytest.mark.parametrize('statement, statement_undo, code_changes', CASCADES)
+def test_cascades_take_change_seq(
+    app, db, client, document, statement, statement_undo, code_changes):
+    id_code_doc, id_doc = document
+    with app.app_context():
+        fullname = db.session.execute(text(
+            "SELECT fullname FROM documents WHERE id = :id"
+        ), {'id': id_doc}).scalar()
+    _, _, cursor = follows(client, "/api/1.0/docs/")
+    _, _, cursor_code = follows(client, "/api/1.0/docs/code")
+    with app.app_context():
+        db.session.execute(text(statement))
+        db.session.commit()
+    try:
+        ids, _, _ = follows(client, "/api/1.0/docs/", cursor)
+        ids_code, _, _ = follows(client, "/api/1.0/docs/code", cursor_code)
+        with app.app_context():
+            fullname_changed = db.session.execute(text(
+                "SELECT fullname FROM documents WHERE id = :id"
+            ), {'id': id_doc}).scalar()
+    finally:
+        with app.app_context():
+            db.session.execute(text(statement_undo))
+            db.session.commit()
+    assert fullname_changed != fullname
+    assert id_doc in ids
+    assert (id_code_doc in ids_code) == code_changes
+
+
+@pytest.mark.parametrize('query', [
+    "search=Синхронизация",
+    f"filter=(creator={HREF}/users/1)",
+])
+def test_params_rejected_with_changed_since(client, query):
+    response = client.get(
+        f"/api/1.0/docs/?changed_since=0&{query}", follow_redirects=True)
+    assert response.status_code == 400
+    assert response.get_json()['type'] == 'BAD_REQUEST'
+    assert response.get_json()['source'].endswith(
+        "не используется вместе с changed_since")
+
+
+def test_filter_rejected_with_changed_since_code(client):
+    response = client.get(
+        f"/api/1.0/docs/code?changed_since=0&filter=(creator={HREF}/users/1)")
+    assert response.status_code == 400
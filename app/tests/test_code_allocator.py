@@ -0,0 +1,64 @@
+"""Нагрузочный тест выдачи номеров кодов документов: потоки одновременно
+добавляют коды одного сочетания (процесс, тип, компания) в файловую БД
+в режиме WAL."""
+import threading
+from sqlalchemy import text
+from database import db_docs
+
+
+THREADS = 8
+ITERATIONS = 25
+#Размер пакета add_code_docs
+BATCH = 3
+#Сочетание, которое не используют другие тесты
+KEY = {'id_bpm': 3, 'id_type_doc': 2, 'id_company': 2}
+
+
+def test_numbers_are_unique_under_concurrency(app, db):
+    with app.app_context():
+        journal_mode = db.session.execute(
+            text("PRAGMA journal_mode")).scalar()
+    assert journal_mode == 'wal'
+
+    barrier = threading.Barrier(THREADS)
+    errors = []
+    ids = []
+
+    def allocates() -> None:
+        data = db_docs.DataForAddCodeDoc(**KEY, id_creator=1)
+        with app.app_context():
+            barrier.wait()
+            for i in range(ITERATIONS):
+                try:
+                    if i % 2:
+                        ids.extend(db_docs.add_code_docs([data] * BATCH))
+                    else:
+                        ids.append(db_docs.add_code_doc(data))
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(repr(e))
+
+    threads = [threading.Thread(target=allocates) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    per_thread = (ITERATIONS + 1) // 2 + ITERATIONS // 2 * BATCH
+    expected = THREADS * per_thread
+    assert len(ids) == len(set(ids)) == expected
+    with app.app_context():
+        numbers = db.session.execute(text("""
+            SELECT number FROM code_documents
+            WHERE id_bpm = :id_bpm and id_type_doc = :id_type_doc
+                and id_company = :id_company
+        """), KEY).scalars().all()
+        last_number = db.session.execute(text("""
+            SELECT last_number FROM code_documents_sequence
+            WHERE id_bpm = :id_bpm and id_type_doc = :id_type_doc
+                and id_company = :id_company
+        """), KEY).scalar()
+    assert sorted(numbers) == list(range(1, expected + 1))
+    assert last_number == expected
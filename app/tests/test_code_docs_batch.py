@@ -0,0 +1,81 @@
+"""Пакетное резервирование кодов документов: номера по сочетанию
+(процесс, тип, компания), порядок ответа - порядок запроса, ошибка
+откатывает весь пакет вместе со счетчиками."""
+from sqlalchemy import text
+
+
+HREF = "http://localhost/api/1.0"
+
+#Сочетания (процесс, тип документа, компания) этого теста
+KEYS = [(4, 1, 1), (4, 2, 1)]
+
+
+def creates_row(id_bpm: int, id_type_doc: int, id_company: int) -> dict:
+    """Строка пакета: код документа по ссылкам."""
+    return {
+        'bpm': {'meta': {
+            'href': f"{HREF}/bpm/{id_bpm}", 'type': "process management"}},
+        'type_doc': {'meta': {
+            'href': f"{HREF}/docs/types/{id_type_doc}",
+            'type': "document management system"}},
+        'company': {'meta': {
+            'href': f"{HREF}/company/{id_company}", 'type': "company"}},
+    }
+
+
+def gets_last_numbers(app, db) -> dict[tuple[int, int, int], int]:
+    """Получает последние выданные номера сочетаний теста."""
+    with app.app_context():
+        rows = db.session.execute(text("""
+            SELECT id_bpm, id_type_doc, id_company, last_number
+            FROM code_documents_sequence
+            WHERE id_bpm = 4
+        """)).all()
+    return {(*row[:3],): row[3] for row in rows}
+
+
+def gets_code_docs(app, db, ids: list[int]) -> list[tuple[int, ...]]:
+    """Получает (процесс, тип, компания, номер) кодов по id."""
+    with app.app_context():
+        rows = {row[0]: row[1:] for row in db.session.execute(text(f"""
+            SELECT id, id_bpm, id_type_doc, id_company, number
+            FROM code_documents
+            WHERE id IN ({", ".join(str(id) for id in ids)})
+        """))}
+    return [tuple(rows[id]) for id in ids]
+
+
+def test_batch_numbers_follow_request_order(app, db, client):
+    last_numbers = gets_last_numbers(app, db)
+    keys = [KEYS[0], KEYS[1], KEYS[0], KEYS[0], KEYS[1]]
+    response = client.post('/api/1.0/docs/code', json={
+        'rows': [creates_row(*key) for key in keys]})
+    assert response.status_code == 201, response.get_json()
+    ids = [row['id'] for row in response.get_json()['rows']]
+    code_docs = gets_code_docs(app, db, ids)
+    assert [code_doc[:3] for code_doc in code_docs] == keys
+    for key in KEYS:
+        first = last_numbers.get(key, 0) + 1
+        numbers = [code_doc[3] for code_doc in code_docs
+            if code_doc[:3] == key]
+        assert numbers == list(range(first, first + len(numbers)))
+    assert gets_last_numbers(app, db) == {
+        key: last_numbers.get(key, 0) + keys.count(key) for key in KEYS}
+
+
+def test_bad_href_rolls_back_batch(app, db, client):
+    last_numbers = gets_last_numbers(app, db)
+    with app.app_context():
+        count = db.session.execute(
+            text("SELECT count(*) FROM code_documents")).scalar()
+    response = client.post('/api/1.0/docs/code', json={'rows': [
+        creates_row(*KEYS[0]),
+        creates_row(999, 1, 1),
+        creates_row(*KEYS[1]),
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()['source'] == "ID не найдены"
+    assert gets_last_numbers(app, db) == last_numbers
+    with app.app_context():
+        assert db.session.execute(
+            text("SELECT count(*) FROM code_documents")).scalar() == count
@@ -0,0 +1,91 @@
+"""ETag ответов по счетчикам изменений таблиц: совпавший If-None-Match
+дает 304 без чтения моделей, запись в таблицу документа меняет ETag."""
+import pytest
+from sqlalchemy import event, text
+from controller.service_layer import reference_cache
+
+
+#(url, таблица, запись в таблицу)
+RESOURCES = [
+    ("/api/1.0/company", 'company',
+        "UPDATE company SET name = name WHERE id = 1"),
+    ("/api/1.0/docs/types", 'types_documents',
+        "UPDATE types_documents SET layer = layer WHERE id = 1"),
+    ("/api/1.0/bpm", 'bpm', "UPDATE bpm SET name = name WHERE id = 4"),
+    ("/api/1.0/docs/code", 'code_documents',
+        "UPDATE code_documents SET used = used WHERE id = 1"),
+    ("/api/1.0/docs/", 'documents',
+        "UPDATE documents SET actual = actual WHERE id = 1"),
+]
+
+
+def gets(client, url: str, etag: str | None = None):
+    headers = {'If-None-Match': etag} if etag is not None else {}
+    return client.get(url, headers=headers, follow_redirects=True)
+
+
+def gets_etag(client, url: str) -> str:
+    response = gets(client, url)
+    assert response.status_code == 200, response.get_json()
+    assert response.headers['ETag']
+    return response.headers['ETag']
+
+
+def selects(db, client, url: str, etag: str) -> tuple[int, list[str]]:
+    """Выполняет условный запрос. Получает статус ответа и запросы
+    SELECT к БД."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = gets(client, url, etag)
+    finally:
+        event.remove(
+            db.engine, 'before_cursor_execute', before_cursor_execute)
+    return response.status_code, statements
+
+
+@pytest.mark.parametrize('url, table, statement', RESOURCES)
+def test_not_modified_without_models(db, client, url, table, statement):
+    etag = gets_etag(client, url)
+    status_code, statements = selects(db, client, url, etag)
+    assert status_code == 304
+    assert not any(f"FROM {table}" in select for select in statements)
+    #Без совпадения модели читаются: документ справочника не из кэша
+    reference_cache.invalidates(table)
+    status_code, statements = selects(db, client, url, '"other"')
+    assert status_code == 200
+    assert any(f"FROM {table}" in select for select in statements)
+
+
+@pytest.mark.parametrize('url, table, statement', RESOURCES)
+def test_write_changes_etag(app, db, client, url, table, statement):
+    etag = gets_etag(client, url)
+    assert gets_etag(client, url) == etag
+    with app.app_context():
+        db.session.execute(text(statement))
+        db.session.commit()
+    assert gets_etag(client, url) != etag
+    assert gets(client, url, etag).status_code == 200
+
+
+def test_url_changes_etag(client):
+    urls = [
+        "/api/1.0/docs/",
+        "/api/1.0/docs/?limit=1",
+        "/api/1.0/docs/?limit=2",
+        "/api/1.0/docs/?fields=id",
+        "/api/1.0/docs/code",
+    ]
+    etags = [gets_etag(client, url) for url in urls]
+    assert len(set(etags)) == len(urls)
+
+
+def test_error_without_etag(client):
+    response = gets(client, "/api/1.0/docs/?limit=0")
+    assert response.status_code == 400
+    assert 'ETag' not in response.headers
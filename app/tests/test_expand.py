@@ -0,0 +1,52 @@
+"""Раскрытые связанные объекты: их изменения меняют ETag и ключ кэша
+документа, раскрываются только выбранные поля."""
+import pytest
+from sqlalchemy import text
+
+
+@pytest.fixture
+def renames_user(app, db):
+    """Меняет отчество пользователя 1, после теста возвращает прежнее."""
+    def renames(patronymic: str) -> None:
+        with app.app_context():
+            db.session.execute(
+                text("UPDATE users SET patronymic = :patronymic WHERE id = 1"),
+                {'patronymic': patronymic}
+            )
+            db.session.commit()
+    yield renames
+    renames('Иванович')
+
+
+def gets(client, url: str):
+    response = client.get(url, follow_redirects=True)
+    assert response.status_code == 200, response.get_json()
+    return response
+
+
+def test_etag_depends_on_expanded_tables(client, renames_user):
+    url_expand = "/api/1.0/docs/?expand=creator"
+    etag_expand = gets(client, url_expand).headers['ETag']
+    etag = gets(client, "/api/1.0/docs/").headers['ETag']
+    renames_user('Иоаннович')
+    assert gets(client, url_expand).headers['ETag'] != etag_expand
+    assert gets(client, "/api/1.0/docs/").headers['ETag'] == etag
+
+
+def test_cached_document_sees_expanded_changes(client, renames_user):
+    url = "/api/1.0/bpm?expand=owner"
+    row = gets(client, url).get_json()['rows'][0]
+    assert row['owner']['patronymic'] == 'Иванович'
+    renames_user('Иоаннович')
+    row = gets(client, url).get_json()['rows'][0]
+    assert row['owner']['patronymic'] == 'Иоаннович'
+
+
+def test_expand_only_selected_fields(client):
+    url = "/api/1.0/bpm?expand=company,owner&fields=code,company"
+    row = gets(client, url).get_json()['rows'][0]
+    assert set(row) == {'code', 'company'}
+    assert row['company']['name']
+    url = "/api/1.0/bpm?expand=owner&fields=code,owner"
+    row = gets(client, url).get_json()['rows'][0]
+    assert set(row) == {'code', 'owner'}
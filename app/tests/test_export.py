@@ -0,0 +1,90 @@
+"""Выгрузка документов: формат по заголовку Accept, CSV со ссылками href и
+булевыми true/false, ошибки фильтра и полей - JSON до начала потока."""
+import csv
+import json
+from io import StringIO
+import pytest
+from controller.api.handlers.handler import LIMIT_MAX
+
+
+NDJSON = 'application/x-ndjson'
+CSV = 'text/csv'
+
+
+def exports(client, url: str, accept: str | None):
+    headers = {'Accept': accept} if accept is not None else {}
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response
+
+
+def gets_rows(client, url: str) -> list[dict]:
+    response = client.get(url, follow_redirects=True)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['rows']
+
+
+@pytest.mark.parametrize('accept, mimetype', [
+    (None, NDJSON),
+    ('*/*', NDJSON),
+    (NDJSON, NDJSON),
+    (CSV, CSV),
+    (f'{CSV};q=0.5, {NDJSON};q=0.9', NDJSON),
+    (f'{NDJSON};q=0.5, {CSV}', CSV),
+    ('application/xml', NDJSON),
+])
+def test_accept(client, accept, mimetype):
+    response = exports(client, "/api/1.0/docs/export", accept)
+    assert response.mimetype == mimetype
+    extension = 'csv' if mimetype == CSV else 'ndjson'
+    assert response.headers['Content-Disposition'] == \
+        f'attachment; filename="docs.{extension}"'
+
+
+@pytest.mark.parametrize('path', ["/api/1.0/docs/", "/api/1.0/docs/code"])
+def test_ndjson_rows(client, path):
+    rows = gets_rows(client, f"{path}?limit={LIMIT_MAX}")
+    response = exports(client, f"{path.rstrip('/')}/export", NDJSON)
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == rows
+
+
+def test_csv(client):
+    rows = gets_rows(client, f"/api/1.0/docs/?limit={LIMIT_MAX}")
+    response = exports(client, "/api/1.0/docs/export", CSV)
+    reader = csv.reader(StringIO(response.get_data(as_text=True)))
+    header = next(reader)
+    assert set(header) == set(rows[0])
+    cells = list(reader)
+    assert len(cells) == len(rows)
+    for row, line in zip(rows, cells):
+        row_csv = dict(zip(header, line))
+        assert row_csv['id'] == str(row['id'])
+        assert row_csv['meta'] == row['meta']['href']
+        assert row_csv['code_doc'] == row['code_doc']['href']
+        assert row_csv['creator'] == row['creator']['href']
+        assert row_csv['actual'] == ('true' if row['actual'] else 'false')
+        assert row_csv['date_start'] == row['date_start']
+
+
+def test_csv_fields(client):
+    response = exports(
+        client, "/api/1.0/docs/export?fields=actual,id", CSV)
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == "id,actual"
+    assert all(line.endswith((',true', ',false')) for line in lines[1:])
+
+
+@pytest.mark.parametrize('query, type', [
+    ("filter=(unknown=1)", 'FILTER_ERROR'),
+    ("filter=(actual=yes)", 'FILTER_ERROR'),
+    ("fields=id,unknown", 'FIELDS_ERROR'),
+])
+@pytest.mark.parametrize('accept', [NDJSON, CSV])
+def test_errors_before_stream(client, query, type, accept):
+    response = client.get(
+        f"/api/1.0/docs/export?{query}", headers={'Accept': accept})
+    assert response.status_code == 400
+    assert response.mimetype == 'application/json'
+    assert 'Content-Disposition' not in response.headers
+    assert response.get_json()['type'] == type
@@ -0,0 +1,55 @@
+"""Выбор полей параметром fields: из БД читаются только столбцы выбранных
+полей, неизвестное поле - ошибка выбора полей."""
+import pytest
+from sqlalchemy import event
+
+
+def selects_documents(db, client, url: str) -> list[str]:
+    """Выполняет запрос к API и получает запросы SELECT таблицы
+    документов."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT') \
+            and 'FROM documents' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url, follow_redirects=True)
+    finally:
+        event.remove(
+            db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200, response.get_json()
+    return statements
+
+
+def test_fields_narrow_select(db, client):
+    [statement] = selects_documents(
+        db, client, "/api/1.0/docs/?fields=id,date_start")
+    assert 'documents.date_start' in statement
+    for column in ('fullname', 'date_finish', 'id_responsible', 'version'):
+        assert f'documents.{column}' not in statement
+    [statement] = selects_documents(db, client, "/api/1.0/docs/")
+    for column in ('fullname', 'date_finish', 'id_responsible', 'version'):
+        assert f'documents.{column}' in statement
+
+
+def test_fields_select_rows(client):
+    response = client.get(
+        "/api/1.0/docs/?fields=id, fullname", follow_redirects=True)
+    assert response.status_code == 200, response.get_json()
+    rows = response.get_json()['rows']
+    assert rows
+    assert all(set(row) == {'id', 'fullname'} for row in rows)
+
+
+@pytest.mark.parametrize('url', [
+    "/api/1.0/docs/?fields=id,unknown",
+    "/api/1.0/docs/code?fields=",
+    "/api/1.0/bpm?expand=unknown",
+])
+def test_unknown_fields(client, url):
+    response = client.get(url, follow_redirects=True)
+    assert response.status_code == 400
+    assert response.get_json()['type'] == 'FIELDS_ERROR'
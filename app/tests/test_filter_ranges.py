@@ -0,0 +1,88 @@
+"""Фильтры диапазонов дат и версий документов. Даты хранятся в формате
+ISO 8601: триггеры отклоняют дату в другом формате."""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+
+#Документы теста: (название, начало, окончание, версия). Даты 2031 года
+#не пересекаются с документами других тестов
+DOCUMENTS = [
+    ("Диапазон 1", '2031-01-10', '2031-06-30', 1),
+    ("Диапазон 2", '2031-02-01', '2031-12-31', 2),
+    ("Диапазон 3", '2031-03-15', '2032-03-15', 3),
+]
+YEAR = "(date_start>=2031-01-01),(date_start<2032-01-01)"
+
+
+@pytest.fixture
+def documents(app, db) -> dict[str, int]:
+    """Добавляет документы теста. Получает id документов по названию."""
+    with app.app_context():
+        for name, date_start, date_finish, version in DOCUMENTS:
+            db.session.execute(text("""
+                INSERT INTO documents (
+                    id_code_doc, name, date_start, date_finish,
+                    id_responsible, version, id_creator
+                )
+                SELECT 3, :name, :date_start, :date_finish, 2, :version, 1
+                WHERE NOT EXISTS (SELECT 1 FROM documents WHERE name = :name)
+            """), {
+                'name': name, 'date_start': date_start,
+                'date_finish': date_finish, 'version': version
+            })
+        db.session.commit()
+        return dict(db.session.execute(text(
+            "SELECT name, id FROM documents WHERE name LIKE 'Диапазон %'"
+        )).all())
+
+
+def gets_ids(client, filter: str) -> list[int]:
+    response = client.get(
+        f"/api/1.0/docs/?filter={filter}", follow_redirects=True)
+    assert response.status_code == 200, response.get_json()
+    return [row['id'] for row in response.get_json()['rows']]
+
+
+@pytest.mark.parametrize('filter, names', [
+    (YEAR, ["Диапазон 1", "Диапазон 2", "Диапазон 3"]),
+    (f"{YEAR},(date_start>2031-01-10)", ["Диапазон 2", "Диапазон 3"]),
+    (f"{YEAR},(date_start<=2031-02-01)", ["Диапазон 1", "Диапазон 2"]),
+    (f"{YEAR},(date_finish>=2032-01-01)", ["Диапазон 3"]),
+    (f"{YEAR},(date_start!=2031-02-01)", ["Диапазон 1", "Диапазон 3"]),
+    (f"{YEAR},(version>=2),(version<3)", ["Диапазон 2"]),
+    (f"{YEAR},(version=1;version=3)", ["Диапазон 1", "Диапазон 3"]),
+    (f"{YEAR},(version>3)", []),
+])
+def test_ranges(client, documents, filter, names):
+    assert gets_ids(client, filter) == sorted(documents[name] for name in names)
+
+
+@pytest.mark.parametrize('filter', [
+    "(date_start>=01.01.2031)",
+    "(date_start>=2031-13-01)",
+    "(version>=v2)",
+])
+def test_bad_range_value(client, filter):
+    response = client.get(
+        f"/api/1.0/docs/?filter={filter}", follow_redirects=True)
+    assert response.status_code == 400
+    assert response.get_json()['type'] == 'FILTER_ERROR'
+
+
+@pytest.mark.parametrize('statement', [
+    """INSERT INTO documents (
+        id_code_doc, name, date_start, date_finish, id_responsible, id_creator
+    )
+    VALUES (3, 'Дата', '01.01.2031', '2031-12-31', 2, 1)""",
+    """INSERT INTO documents (
+        id_code_doc, name, date_start, date_finish, id_responsible, id_creator
+    )
+    VALUES (3, 'Дата', '2031-01-01', '2031-13-01', 2, 1)""",
+    "UPDATE documents SET date_finish = '31.12.2031' WHERE id = 1",
+])
+def test_triggers_reject_not_iso_dates(app, db, statement):
+    with app.app_context():
+        with pytest.raises(IntegrityError, match='date must be YYYY-MM-DD'):
+            db.session.execute(text(statement))
+        db.session.rollback()
@@ -0,0 +1,55 @@
+"""Кэш разобранных фильтров: повторный фильтр берется из кэша, ключ
+зависит от обработчика и url_root."""
+from controller.api.handlers.handler import filters_cache
+
+
+FILTER = "(responsible={root}api/1.0/users/2)"
+
+
+def gets_rows(client, url: str, base_url: str = "http://localhost/"):
+    response = client.get(url, base_url=base_url, follow_redirects=True)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['rows']
+
+
+def counts(function) -> tuple[int, int]:
+    """Выполняет функцию и считает попадания и промахи кэша фильтров."""
+    info = filters_cache.get_info()
+    function()
+    info_after = filters_cache.get_info()
+    return info_after.hits - info.hits, info_after.misses - info.misses
+
+
+def test_repeated_filter_hits(client):
+    filters_cache.clear()
+    url = "/api/1.0/docs/?filter=" + FILTER.format(root="http://localhost/")
+    assert counts(lambda: gets_rows(client, url)) == (0, 1)
+    assert counts(lambda: gets_rows(client, url)) == (1, 0)
+    #Та же строка фильтра другого ресурса - другой ключ
+    url = "/api/1.0/docs/code?filter=" \
+        + "(creator=http://localhost/api/1.0/users/1)"
+    assert counts(lambda: gets_rows(client, url)) == (0, 1)
+
+
+def test_url_root_in_key(client):
+    filters_cache.clear()
+    for root in ("http://localhost/", "http://bein.example/"):
+        url = "/api/1.0/docs/?filter=" + FILTER.format(root=root)
+        hits_misses = counts(lambda: gets_rows(client, url, base_url=root))
+        assert hits_misses == (0, 1)
+    #Фильтр с префиксом другого хоста не берется из кэша этого хоста
+    url = "/api/1.0/docs/?filter=" + FILTER.format(root="http://localhost/")
+    rows = gets_rows(client, url, base_url="http://localhost/")
+    rows_other = gets_rows(client, "/api/1.0/docs/?filter="
+        + FILTER.format(root="http://bein.example/"),
+        base_url="http://bein.example/")
+    assert rows
+    assert [row['id'] for row in rows] == [row['id'] for row in rows_other]
+    assert all(
+        row['responsible']['href'].startswith("http://bein.example/")
+        for row in rows_other)
+    response = client.get(
+        "/api/1.0/docs/?filter=" + FILTER.format(root="http://localhost/"),
+        base_url="http://bein.example/", follow_redirects=True)
+    assert response.status_code == 400
+    assert response.get_json()['type'] == 'FILTER_ERROR'
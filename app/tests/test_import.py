@@ -0,0 +1,168 @@
+"""Импорт доступен только пользователям с разрешением на /app/import.
+Родитель процесса задается кодом, ошибка в любой строке отменяет импорт."""
+import pytest
+from sqlalchemy import text
+from controller.service_layer.cookies import CreatorCookieSession
+
+
+CSV_COMPANY = "name\nИмпорт 1\nИмпорт 2\n"
+
+
+def posts_company(client):
+    return client.post(
+        '/api/1.0/import/company',
+        data=CSV_COMPANY.encode(),
+        content_type='text/csv'
+    )
+
+
+def test_import_without_permit_is_forbidden(client):
+    response = posts_company(client)
+    assert response.status_code == 403
+
+
+def test_import_with_permit(app, db):
+    with app.app_context():
+        db.session.execute(text("""
+            INSERT INTO permit_view_page (user_id, page_id)
+            SELECT 3, page_id FROM pages WHERE page_uri = '/app/import'
+        """))
+        db.session.commit()
+    client = app.test_client()
+    client.set_cookie(
+        'localhost', 'Session', CreatorCookieSession().creates(3, 0))
+    response = posts_company(client)
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()['rows'] == 2
+
+
+@pytest.fixture
+def client_import(app, db):
+    """Клиент пользователя 3 с разрешением на импорт. Удаляет процессы
+    импорта до и после теста."""
+    def deletes() -> None:
+        with app.app_context():
+            while db.session.execute(text("""
+                DELETE FROM bpm
+                WHERE code LIKE 'Имп%' and id NOT IN (
+                    SELECT id_parent FROM bpm WHERE id_parent IS NOT NULL)
+            """)).rowcount:
+                pass
+            db.session.commit()
+    with app.app_context():
+        db.session.execute(text("""
+            INSERT INTO permit_view_page (user_id, page_id)
+            SELECT 3, page_id FROM pages
+            WHERE page_uri = '/app/import' and NOT EXISTS (
+                SELECT 1 FROM permit_view_page as p
+                WHERE p.user_id = 3 and p.page_id = pages.page_id)
+        """))
+        db.session.commit()
+    deletes()
+    client = app.test_client()
+    client.set_cookie(
+        'localhost', 'Session', CreatorCookieSession().creates(3, 0))
+    yield client
+    deletes()
+
+
+def imports(client, table: str, csv: str):
+    return client.post(
+        f'/api/1.0/import/{table}', data=csv.encode(), content_type='text/csv')
+
+
+def gets_bpm(app, db) -> dict[str, tuple]:
+    """Получает процессы импорта: код -> (уровень, код родителя,
+    предки по возрастанию глубины)."""
+    with app.app_context():
+        rows = db.session.execute(text("""
+            SELECT b.code, b.lvl, p.code, (
+                SELECT group_concat(code, ' ') FROM (
+                    SELECT a.code FROM bpm_closure as c
+                    JOIN bpm as a ON a.id = c.id_ancestor
+                    WHERE c.id_descendant = b.id and c.depth > 0
+                    ORDER BY c.depth)
+            )
+            FROM bpm as b
+            LEFT JOIN bpm as p ON p.id = b.id_parent
+            WHERE b.code LIKE 'Имп%'
+        """)).all()
+    return {code: (lvl, parent, ancestors) for code, lvl, parent, ancestors
+        in rows}
+
+
+def test_import_bpm_parent_by_code(app, db, client_import):
+    #Потомок идет раньше родителя из файла, родитель корня - процесс из БД
+    response = imports(client_import, 'bpm', (
+        "code,name,company,owner,parent\n"
+        "Имп1.1.1,Лист,1,,Имп1.1\n"
+        "Имп1.1,Ветвь,1,2,Имп1\n"
+        "Имп1,Корень,1,1,П1\n"
+        "Имп2,Корень 2,1,,\n"
+    ))
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()['rows'] == 4
+    assert gets_bpm(app, db) == {
+        'Имп1': (2, 'П1', 'П1'),
+        'Имп1.1': (3, 'Имп1', 'Имп1 П1'),
+        'Имп1.1.1': (4, 'Имп1.1', 'Имп1.1 Имп1 П1'),
+        'Имп2': (1, None, None),
+    }
+
+
+@pytest.mark.parametrize('csv, source', [
+    ("Имп1,Процесс,1,,Имп2\nИмп2,Процесс,1,,Имп1\n",
+        "Строка 1: цикл в дереве процессов"),
+    ("Имп1,Процесс,1,,Имп1\n", "Строка 1: цикл в дереве процессов"),
+    ("Имп1,Процесс,1,,Имп3\n", "Строка 1: родитель Имп3 не найден"),
+    ("Имп1,Процесс,1,,\nИмп1,Процесс,1,,\n", "Строка 2: code Имп1 уже есть"),
+    ("Имп1,Процесс,1,,\nП1,Процесс,1,,\n", "Строка 2: code П1 уже есть"),
+    ("Имп1,Процесс,999,,\n", "Строка 1: компания 999 не найдена"),
+])
+def test_import_bpm_errors(app, db, client_import, csv, source):
+    response = imports(
+        client_import, 'bpm', "code,name,company,owner,parent\n" + csv)
+    assert response.status_code == 400
+    assert response.get_json()['type'] == 'IMPORT_ERROR'
+    assert response.get_json()['source'].startswith(source)
+    assert gets_bpm(app, db) == {}
+
+
+@pytest.mark.parametrize('csv, source', [
+    ("Импорт,ИМ,in\nИмпорт,ИМ2,out\n", "Строка 2: name Импорт уже есть"),
+    ("Импорт,ИМ,in\nИмпорт 2,ИМ,out\n", "Строка 2: abv ИМ уже есть"),
+    ("Инструкция,ИМ,in\n", "Строка 1: name Инструкция уже есть"),
+    ("Импорт,И,in\n", "Строка 1: abv И уже есть"),
+])
+def test_import_types_docs_duplicates(client_import, csv, source):
+    response = imports(
+        client_import, 'types_documents', "name,abv,layer\n" + csv)
+    assert response.status_code == 400
+    assert response.get_json()['source'] == source
+
+
+def test_import_rolls_back_on_write_error(app, db, client_import):
+    with app.app_context():
+        db.session.execute(text("""
+            CREATE TRIGGER tr_test_import_abort
+            BEFORE INSERT ON company WHEN NEW.name = 'Откат'
+            BEGIN
+                SELECT RAISE(ABORT, 'import aborted');
+            END
+        """))
+        db.session.commit()
+        count = db.session.execute(
+            text("SELECT count(*) FROM company")).scalar()
+    try:
+        response = imports(
+            client_import, 'company', "name\nИмпорт отката\nОткат\n")
+    finally:
+        with app.app_context():
+            db.session.execute(text("DROP TRIGGER tr_test_import_abort"))
+            db.session.commit()
+    assert response.status_code == 400
+    assert response.get_json()['type'] == 'IMPORT_ERROR'
+    assert 'import aborted' in response.get_json()['source']
+    with app.app_context():
+        assert db.session.execute(
+            text("SELECT count(*) FROM company")).scalar() == count
@@ -0,0 +1,108 @@
+"""Горячие запросы используют индексы миграций, а не полный просмотр
+таблиц. Планы проверяются через EXPLAIN QUERY PLAN."""
+import pytest
+from sqlalchemy import event
+from database import db_auth, db_app_interface, db_docs
+
+
+def gets_query_plan(db, statement: str, parameters=()) -> str:
+    """Получает план запроса: строки EXPLAIN QUERY PLAN через перенос."""
+    with db.engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+def traces_raw_statements(app, db, appeal) -> list[str]:
+    """Выполняет обращение к БД через сырой SQL и получает выполненные
+    SELECT с подставленными значениями. Транзакция откатывается."""
+    statements = []
+    with app.test_request_context():
+        connection = db.session.connection().connection
+        connection.set_trace_callback(statements.append)
+        try:
+            appeal()
+        finally:
+            connection.set_trace_callback(None)
+            db.session.rollback()
+    return [statement for statement in statements
+        if statement.lstrip().upper().startswith('SELECT')]
+
+
+def traces_orm_statements(db, request) -> list[tuple[str, tuple]]:
+    """Выполняет запрос к API и получает выполненные ORM запросы SELECT
+    с параметрами."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = request()
+    finally:
+        event.remove(
+            db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200, response.get_json()
+    return statements
+
+
+RAW_QUERIES = [
+    ("invitation token", lambda: db_auth.get_user_id('token-2'),
+        ['ix_invitation_tokens_invitation_token']),
+    ("email and password",
+        lambda: db_auth.get_user_id(('ivan@bein.ru', 'X')),
+        ['ix_users_email', 'ix_user_authorization_user_id']),
+    ("user authentication",
+        lambda: db_auth.check_user_authentication(1),
+        ['ix_user_authorization_user_id']),
+    ("user password", lambda: db_auth.check_user_password(1, 'X'),
+        ['ix_user_authorization_user_id']),
+    ("permit view page",
+        lambda: db_app_interface.get_permit_view_page(1, '/app'),
+        ['ix_permit_view_page_user_id_page_id']),
+    ("code documents",
+        lambda: db_docs.add_code_docs([db_docs.DataForAddCodeDoc(
+            id_bpm=4, id_type_doc=2, id_company=1, id_creator=1)]),
+        ['ux_code_documents_code']),
+]
+
+
+@pytest.mark.parametrize(
+    'appeal, indexes',
+    [(appeal, indexes) for _, appeal, indexes in RAW_QUERIES],
+    ids=[name for name, _, _ in RAW_QUERIES])
+def test_raw_queries_use_indexes(app, db, appeal, indexes):
+    plans = "\n".join(
+        gets_query_plan(db, statement)
+        for statement in traces_raw_statements(app, db, appeal))
+    for index in indexes:
+        assert f"INDEX {index}" in plans, plans
+
+
+USERS = "http://localhost/api/1.0/users"
+
+LIST_QUERIES = [
+    (f"/api/1.0/docs/?filter=(responsible={USERS}/1)",
+        'documents', 'ix_documents_id_responsible'),
+    ("/api/1.0/docs/?filter=(actual=true)",
+        'documents', 'ix_documents_actual'),
+    (f"/api/1.0/docs/?filter=(creator={USERS}/1)",
+        'documents', 'ix_documents_id_creator'),
+    (f"/api/1.0/docs/code?filter=(creator={USERS}/1)",
+        'code_documents', 'ix_code_documents_id_creator'),
+]
+
+
+@pytest.mark.parametrize('url, table, index', LIST_QUERIES)
+def test_filtered_lists_use_indexes(db, client, url, table, index):
+    statements = traces_orm_statements(
+        db, lambda: client.get(url, follow_redirects=True))
+    plans = [gets_query_plan(db, statement, parameters)
+        for statement, parameters in statements
+        if f"FROM {table}" in statement]
+    assert plans
+    for plan in plans:
+        assert f"INDEX {index}" in plan, plan
+        assert f"SCAN {table}" not in plan, plan
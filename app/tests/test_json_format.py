@@ -0,0 +1,36 @@
+"""Формат JSON ответов совпадает с jsonify: ключи отсортированы, даты -
+HTTP-date."""
+import json
+import pytest
+
+
+@pytest.mark.parametrize('url', [
+    "/api/1.0/docs/",
+    "/api/1.0/docs/code?expand=creator,company",
+    "/api/1.0/company",
+])
+def test_keys_are_sorted(client, url):
+    response = client.get(url, follow_redirects=True)
+    assert response.status_code == 200
+    document = response.get_json()
+    assert response.data == json.dumps(
+        document, ensure_ascii=False, separators=(',', ':'), sort_keys=True
+    ).encode()
+
+
+def test_dates_are_http_date(client):
+    href = "http://localhost/api/1.0"
+    response = client.post("/api/1.0/docs/", follow_redirects=True, json={
+        'code_doc': {'meta': {
+            'href': f"{href}/docs/code/2",
+            'type': "document management system"}},
+        'name': "О датах",
+        'date_start': "2022-01-01",
+        'date_finish': "2023-01-01",
+        'responsible': {'meta': {
+            'href': f"{href}/users/1", 'type': "app users"}},
+    })
+    assert response.status_code == 201, response.get_json()
+    document = response.get_json()
+    assert document['date_start'] == "Sat, 01 Jan 2022 00:00:00 GMT"
+    assert document['date_finish'] == "Sun, 01 Jan 2023 00:00:00 GMT"
@@ -0,0 +1,47 @@
+"""Ключевая пагинация списков: границы limit, ссылка на следующую
+страницу сохраняет параметры запроса."""
+from urllib.parse import urlsplit, parse_qs
+import pytest
+from controller.api.handlers.handler import LIMIT_MAX
+
+
+USERS = "http://localhost/api/1.0/users/"
+
+
+def gets(client, url: str) -> dict:
+    response = client.get(url, follow_redirects=True)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+@pytest.mark.parametrize('limit', [0, -1, LIMIT_MAX + 1])
+def test_limit_out_of_bounds(client, limit):
+    response = client.get(f"/api/1.0/docs/code?limit={limit}")
+    assert response.status_code == 400
+    assert response.get_json()['type'] == 'BAD_REQUEST'
+
+
+def test_limit_max(client):
+    document = gets(client, f"/api/1.0/docs/code?limit={LIMIT_MAX}")
+    assert document['meta']['size'] == len(document['rows'])
+
+
+@pytest.mark.parametrize('path', ["/api/1.0/docs/code", "/api/1.0/docs/"])
+def test_next_keeps_params(client, path):
+    params = f"filter=(creator={USERS}1)&fields=id,creator"
+    expected = [row['id'] for row in gets(
+        client, f"{path}?{params}&limit={LIMIT_MAX}")['rows']]
+    assert len(expected) >= 2
+    document = gets(client, f"{path}?{params}&limit=1")
+    ids = [row['id'] for row in document['rows']]
+    while document['meta']['next'] is not None:
+        query = parse_qs(urlsplit(document['meta']['next']).query)
+        assert query['filter'] == [f"(creator={USERS}1)"]
+        assert query['fields'] == ["id,creator"]
+        assert query['limit'] == ["1"]
+        assert query['after'] == [str(ids[-1])]
+        document = gets(client, document['meta']['next'])
+        assert len(document['rows']) == 1
+        assert all(set(row) == {'id', 'creator'} for row in document['rows'])
+        ids += [row['id'] for row in document['rows']]
+    assert ids == expected == sorted(expected)
@@ -0,0 +1,101 @@
+"""Счетчики смены пароля: читаются из БД по одному пользователю, кука из
+кэша проверенных кук сверяется с текущим счетчиком. Смена пароля в другом
+процессе видна не позже PASSWORD_GENERATIONS_TTL."""
+import sqlite3
+from contextlib import closing
+from types import SimpleNamespace
+import time
+import pytest
+from sqlalchemy import text
+from controller.service_layer import password_generations as module
+from controller.service_layer.cookies import CreatorCookieSession
+
+
+USER_ID = 5
+USER_ID_OTHER_PROCESS = 6
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Запоминает id пользователей, чьи счетчики читаются из БД."""
+    user_ids = []
+    get_password_generation = module.db_auth.get_password_generation
+
+    def reading(user_id):
+        user_ids.append(user_id)
+        return get_password_generation(user_id)
+
+    monkeypatch.setattr(module.db_auth, 'get_password_generation', reading)
+    return user_ids
+
+
+def test_loads_only_missing_user(app, reads):
+    generations = module.PasswordGenerations(ttl=300)
+    with app.app_context():
+        assert generations.get(1) == 0
+        assert generations.get(1) == 0
+        assert generations.get(999) is None
+        assert generations.get(999) is None
+    assert reads == [1, 999]
+
+
+def test_reloads_after_ttl(app, reads):
+    generations = module.PasswordGenerations(ttl=0)
+    with app.app_context():
+        generations.get(1)
+        generations.get(1)
+    assert reads == [1, 1]
+
+
+def adds_user(app, db, user_id: int) -> None:
+    with app.app_context():
+        db.session.execute(text("""
+            INSERT OR IGNORE INTO users
+                (id, last_name, first_name, patronymic, email, company_id)
+            VALUES (:id, 'Кузнецов', 'Козьма', 'Козьмич', :email, 1)
+        """), {'id': user_id, 'email': f"kuz{user_id}@bein.ru"})
+        db.session.commit()
+
+
+def test_cached_cookie_checks_generation(app, db):
+    adds_user(app, db, USER_ID)
+    with app.app_context():
+        generation = module.password_generations.loads(USER_ID)
+    client = app.test_client()
+    client.set_cookie(
+        'localhost', 'Session',
+        CreatorCookieSession().creates(USER_ID, generation))
+    assert client.get('/api/1.0/company').status_code == 200
+    #Пароль сменили в другом процессе; счетчик прочитан по истечении ttl
+    with app.app_context():
+        db.session.execute(text("""
+            UPDATE users SET password_generation = password_generation + 1
+            WHERE id = :id
+        """), {'id': USER_ID})
+        db.session.commit()
+        module.password_generations.loads(USER_ID)
+    assert client.get('/api/1.0/company').status_code == 401
+
+
+def test_other_process_bounded_by_ttl(app, db, monkeypatch):
+    #Другой процесс меняет пароль своим соединением: этот процесс о смене
+    #не знает и принимает старую куку, пока не истечет ttl счетчика
+    adds_user(app, db, USER_ID_OTHER_PROCESS)
+    with app.app_context():
+        generation = module.password_generations.loads(USER_ID_OTHER_PROCESS)
+    client = app.test_client()
+    client.set_cookie(
+        'localhost', 'Session',
+        CreatorCookieSession().creates(USER_ID_OTHER_PROCESS, generation))
+    assert client.get('/api/1.0/company').status_code == 200
+    with closing(sqlite3.connect(db.engine.url.database)) as connection:
+        with connection:
+            connection.execute("""
+                UPDATE users SET password_generation = password_generation + 1
+                WHERE id = ?
+            """, (USER_ID_OTHER_PROCESS,))
+    assert client.get('/api/1.0/company').status_code == 200
+    loaded_at = time.monotonic()
+    monkeypatch.setattr(module, 'time', SimpleNamespace(
+        monotonic=lambda: loaded_at + module.PASSWORD_GENERATIONS_TTL))
+    assert client.get('/api/1.0/company').status_code == 401
@@ -0,0 +1,57 @@
+"""Число запросов SELECT списка не зависит от числа строк страницы: связи
+строк загружаются вместе со строками, а не отдельным запросом на строку."""
+import pytest
+from sqlalchemy import event, text
+
+
+ROWS = 40
+
+
+@pytest.fixture
+def documents(app, db):
+    """Добавляет документы, чтобы страницы были полными."""
+    with app.app_context():
+        count = db.session.execute(
+            text("SELECT count(*) FROM documents")).scalar()
+        if count >= ROWS:
+            return
+        db.session.execute(text("""
+            INSERT INTO documents (
+                id_code_doc, name, date_start, date_finish,
+                id_responsible, id_creator
+            )
+            VALUES (3, :name, '2022-01-01', '2023-01-01', 2, 1)
+        """), [{'name': f"Документ {i}"} for i in range(ROWS - count)])
+        db.session.commit()
+
+
+def counts_selects(db, client, url: str) -> int:
+    """Выполняет запрос к API и считает запросы SELECT."""
+    selects = 0
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        nonlocal selects
+        if statement.lstrip().upper().startswith('SELECT'):
+            selects += 1
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url, follow_redirects=True)
+    finally:
+        event.remove(
+            db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200, response.get_json()
+    return selects
+
+
+@pytest.mark.parametrize('url', [
+    "/api/1.0/docs/",
+    "/api/1.0/docs/code",
+    "/api/1.0/docs/?expand=code_doc,responsible,creator",
+    "/api/1.0/docs/code?expand=creator,company,bpm,type_doc",
+])
+def test_selects_do_not_depend_on_rows(db, client, documents, url):
+    separator = '&' if '?' in url else '?'
+    small = counts_selects(db, client, f"{url}{separator}limit=2")
+    large = counts_selects(db, client, f"{url}{separator}limit={ROWS}")
+    assert small == large
@@ -0,0 +1,90 @@
+"""Парсер фильтра: грамматика, позиция ошибки, объединение равенств одного
+поля в условие "in"."""
+from datetime import date
+import pytest
+from controller.api.query_string_parser import (
+    QueryStringParser, FieldQuery, LogicCondition, ErrorQueryStringParsing)
+
+
+USERS = "http://localhost/api/1.0/users/"
+
+FIELDS = [
+    FieldQuery(
+        name_in_db='id_creator', name='creator',
+        operators=['!=', '='], prefix=USERS, null=True, type=str),
+    FieldQuery(
+        name_in_db='actual', name='actual',
+        operators=['!=', '='], prefix='', null=False, type=bool),
+    FieldQuery(
+        name_in_db='version', name='version',
+        operators=['!=', '=', '>=', '>', '<=', '<'], prefix='', null=False,
+        type=int),
+    FieldQuery(
+        name_in_db='date_start', name='date_start',
+        operators=['!=', '=', '>=', '>', '<=', '<'], prefix='', null=False,
+        type=date),
+]
+
+
+def parses(string: str) -> list[list[LogicCondition]]:
+    return QueryStringParser(
+        string=string, fields=FIELDS).get_list_logic_conditions()
+
+
+def test_groups_and_conditions():
+    assert parses(
+        f" ( creator = {USERS}1 ; actual=false ) ,(version>=2;"
+        "date_start<2022-12-31)"
+    ) == [
+        [LogicCondition('id_creator', '=', 1),
+            LogicCondition('actual', '=', 0)],
+        [LogicCondition('version', '>=', 2),
+            LogicCondition('date_start', '<', '2022-12-31')],
+    ]
+
+
+def test_null():
+    assert parses("(creator=null;creator!=null)") == [[
+        LogicCondition('id_creator', '=', None),
+        LogicCondition('id_creator', '!=', None),
+    ]]
+
+
+def test_equalities_merge_into_in():
+    assert parses(f"(creator={USERS}1;version=3;creator={USERS}2)") == [[
+        LogicCondition('id_creator', 'in', [1, 2]),
+        LogicCondition('version', '=', 3),
+    ]]
+
+
+def test_inequalities_do_not_merge():
+    assert parses(f"(creator!={USERS}1;creator!={USERS}2)") == [[
+        LogicCondition('id_creator', '!=', 1),
+        LogicCondition('id_creator', '!=', 2),
+    ]]
+    assert parses(f"(creator!={USERS}1;creator={USERS}2)") == [[
+        LogicCondition('id_creator', '!=', 1),
+        LogicCondition('id_creator', '=', 2),
+    ]]
+
+
+@pytest.mark.parametrize('string, source, position', [
+    ("actual=true", "actual", 0),                   #нет "("
+    ("(actual=true", "конец строки", 12),           #нет ")"
+    ("(actual=true)(version=1)", "(", 13),          #нет ","
+    ("(actual=true),", "конец строки", 14),
+    ("(unknown=1)", "unknown", 1),                  #неизвестное поле
+    ("(actual>true)", "actual>", 7),                #оператор не для поля
+    ("(actual true)", "true", 8),                   #нет оператора
+    ("(version=one)", "version=one", 9),            #значение не int
+    ("(creator=http://other/1)", "creator=http://other/1", 9),
+    ("(date_start=31.12.2022)", "date_start=31.12.2022", 12),
+    ("(date_start=2022-02-30)", "date_start=2022-02-30", 12),
+    ("(actual=true;)", ")", 13),                    #пустое условие
+    ("(actual=true) #", "#", 14),                   #неизвестный символ
+])
+def test_error_position(string, source, position):
+    with pytest.raises(ErrorQueryStringParsing) as e:
+        parses(string)
+    assert e.value.source == \
+        f"Не удалось прочитать: {source} (позиция {position})"
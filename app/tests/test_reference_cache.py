@@ -0,0 +1,106 @@
+"""Кэш справочных данных: попадание не обращается к БД, запись в этом
+процессе сбрасывает счетчики изменений таблиц при фиксации, откат кэш не
+меняет. Запись из другого процесса видна по истечении VERSIONS_TTL."""
+import sqlite3
+from contextlib import closing
+import pytest
+from sqlalchemy import event, text
+from controller.service_layer import reference_cache as module
+from utilities.cache import LRUCache
+
+
+URL = "/api/1.0/company"
+
+
+@pytest.fixture
+def reads(monkeypatch) -> list[tuple[str, ...]]:
+    """Очищает кэши перед тестом. Запоминает чтения счетчиков изменений
+    таблиц из БД."""
+    module.reference_cache.clear()
+    module.versions_cache.clear()
+    tables_read = []
+    get_versions_tables = module.db_table_versions.get_versions_tables
+
+    def reading(tables):
+        tables_read.append(tables)
+        return get_versions_tables(tables)
+
+    monkeypatch.setattr(
+        module.db_table_versions, 'get_versions_tables', reading)
+    return tables_read
+
+
+def gets(db, client) -> tuple[int, int, int]:
+    """Выполняет запрос списка компаний. Получает изменение числа
+    попаданий и промахов кэша документов и число запросов моделей."""
+    selects = 0
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        nonlocal selects
+        if 'FROM company' in statement:
+            selects += 1
+
+    info = module.reference_cache.get_info()
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(URL, follow_redirects=True)
+    finally:
+        event.remove(
+            db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200, response.get_json()
+    info_after = module.reference_cache.get_info()
+    return (
+        info_after.hits - info.hits, info_after.misses - info.misses, selects)
+
+
+def updates_company(app, db, commit: bool) -> None:
+    """Изменяет компанию 1 в транзакции сессии."""
+    with app.app_context():
+        db.session.execute(text("UPDATE company SET name = name WHERE id = 1"))
+        if commit:
+            db.session.commit()
+        else:
+            db.session.rollback()
+
+
+def test_hit_without_db(db, client, reads):
+    assert gets(db, client) == (0, 1, 1)
+    assert reads == [('company',)]
+    assert gets(db, client) == (1, 0, 0)
+    assert reads == [('company',)]
+
+
+def test_commit_invalidates(app, db, client, reads):
+    gets(db, client)
+    updates_company(app, db, commit=True)
+    assert gets(db, client) == (0, 1, 1)
+    assert len(reads) == 2
+
+
+def test_read_commit_keeps_cache(app, db, client, reads):
+    gets(db, client)
+    with app.app_context():
+        db.session.execute(text("SELECT count(*) FROM company")).scalar()
+        db.session.commit()
+    assert gets(db, client) == (1, 0, 0)
+    assert len(reads) == 1
+
+
+def test_rollback_keeps_cache(app, db, client, reads):
+    gets(db, client)
+    updates_company(app, db, commit=False)
+    assert gets(db, client) == (1, 0, 0)
+    assert len(reads) == 1
+
+
+def test_other_process_after_ttl(db, client, reads, monkeypatch):
+    #Другой процесс пишет своим соединением: сессия этого процесса о записи
+    #не знает, счетчики перечитываются по истечении VERSIONS_TTL
+    gets(db, client)
+    with closing(sqlite3.connect(db.engine.url.database)) as connection:
+        with connection:
+            connection.execute("UPDATE company SET name = name WHERE id = 1")
+    assert gets(db, client) == (1, 0, 0)
+    monkeypatch.setattr(module, 'versions_cache', LRUCache(maxsize=1, ttl=0))
+    assert gets(db, client) == (0, 1, 1)
+    assert len(reads) == 2
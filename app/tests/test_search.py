@@ -0,0 +1,59 @@
+"""Страницы поиска документов: ключевая пагинация по (rank, id) отдает
+все найденные документы по одному разу в порядке релевантности."""
+import pytest
+from sqlalchemy import text
+
+
+ROWS = 12
+
+
+@pytest.fixture
+def documents(app, db):
+    """Добавляет документы с разной и одинаковой релевантностью."""
+    with app.app_context():
+        count = db.session.execute(text(
+            "SELECT count(*) FROM documents WHERE name LIKE 'Регламент%'"
+        )).scalar()
+        if count >= ROWS:
+            return
+        db.session.execute(text("""
+            INSERT INTO documents (
+                id_code_doc, name, date_start, date_finish,
+                id_responsible, id_creator
+            )
+            VALUES (3, :name, '2022-01-01', '2023-01-01', 2, 1)
+        """), [
+            {'name': "Регламент " + "регламент " * (i % 3) + str(i)}
+            for i in range(ROWS - count)
+        ])
+        db.session.commit()
+
+
+def gets_ids(client, url: str) -> tuple[list[int], str | None]:
+    """Получает id строк страницы и ссылку на следующую."""
+    response = client.get(url, follow_redirects=True)
+    assert response.status_code == 200, response.get_json()
+    document = response.get_json()
+    ids = [int(row['meta']['href'].rsplit('/', 1)[1])
+        for row in document['rows']]
+    return ids, document['meta']['next']
+
+
+def test_search_pages_cover_all_found(client, documents):
+    expected, next = gets_ids(
+        client, "/api/1.0/docs/?search=регламент&limit=1000")
+    assert len(expected) == ROWS and next is None
+    ids, next = gets_ids(client, "/api/1.0/docs/?search=регламент&limit=5")
+    pages = 1
+    while next is not None:
+        page, next = gets_ids(client, next)
+        ids += page
+        pages += 1
+    assert ids == expected
+    assert pages == 3
+
+
+def test_search_after_requires_after_rank(client, documents):
+    response = client.get(
+        "/api/1.0/docs/?search=регламент&after=1", follow_redirects=True)
+    assert response.status_code == 400
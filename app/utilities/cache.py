@@ -0,0 +1,112 @@
+from typing import Any, Callable, Hashable, NamedTuple
+from collections import OrderedDict
+import threading
+import time
+
+
+class CacheInfo(NamedTuple):
+	"""Статистика кэша"""
+	hits: int                       #120
+	misses: int                     #3
+	evictions: int                  #0, вытеснено при переполнении
+	expirations: int                #2, удалено по истечении TTL
+	maxsize: int                    #256
+	size: int                       #3
+
+
+class LRUCache:
+	"""Кэш ограниченного размера. При переполнении вытесняется запись,
+	которая дольше всех не запрашивалась. Если задан ttl (секунды), запись
+	живет не дольше ttl. Потокобезопасен."""
+
+	__maxsize: int
+	__ttl: float | None
+	#ключ -> (момент истечения или None, значение)
+	__data: OrderedDict
+	__hits: int
+	__misses: int
+	__evictions: int
+	__expirations: int
+
+	def __init__(self, maxsize, ttl = None):
+		self.__maxsize = maxsize
+		self.__ttl = ttl
+		self.__data = OrderedDict()
+		self.__lock = threading.Lock()
+		self.__hits = 0
+		self.__misses = 0
+		self.__evictions = 0
+		self.__expirations = 0
+
+	def get(self, key: Hashable) -> Any | None:
+		"""Получает значение по ключу. None - значения нет."""
+		with self.__lock:
+			if key not in self.__data:
+				self.__misses += 1
+				return None
+			expires, value = self.__data[key]
+			if expires is not None and expires <= time.monotonic():
+				del self.__data[key]
+				self.__expirations += 1
+				self.__misses += 1
+				return None
+			self.__data.move_to_end(key)
+			self.__hits += 1
+			return value
+
+	def get_or_creates(self, key: Hashable, creates: Callable[[], Any]) -> Any:
+		"""Получает значение по ключу. Если значения нет - создает и
+		сохраняет его. Значение создается вне блокировки: другие потоки не
+		ждут, а одновременный промах лишь создаст значение дважды."""
+		value = self.get(key)
+		if value is None:
+			value = creates()
+			self.set(key, value)
+		return value
+
+	def set(self, key: Hashable, value: Any) -> None:
+		"""Сохраняет значение по ключу."""
+		expires = (time.monotonic() + self.__ttl
+			if self.__ttl is not None else None)
+		with self.__lock:
+			self.__data[key] = (expires, value)
+			self.__data.move_to_end(key)
+			if len(self.__data) > self.__maxsize:
+				self.__data.popitem(last=False)
+				self.__evictions += 1
+
+	def clear_if(self, predicate: Callable[[Hashable], bool]) -> int:
+		"""Удаляет записи, ключи которых подходят под условие. Возвращает
+		число удаленных записей."""
+		with self.__lock:
+			keys = [key for key in self.__data if predicate(key)]
+			for key in keys:
+				del self.__data[key]
+			return len(keys)
+
+	def clear_if_value(self, predicate: Callable[[Any], bool]) -> int:
+		"""Удаляет записи, значения которых подходят под условие. Возвращает
+		число удаленных записей."""
+		with self.__lock:
+			keys = [key for key, (_, value) in self.__data.items()
+				if predicate(value)]
+			for key in keys:
+				del self.__data[key]
+			return len(keys)
+
+	def clear(self) -> None:
+		"""Очищает кэш."""
+		with self.__lock:
+			self.__data.clear()
+
+	def get_info(self) -> CacheInfo:
+		"""Получает статистику кэша."""
+		with self.__lock:
+			return CacheInfo(
+				hits=self.__hits,
+				misses=self.__misses,
+				evictions=self.__evictions,
+				expirations=self.__expirations,
+				maxsize=self.__maxsize,
+				size=len(self.__data)
+			)
@@ -6,8 +6,11 @@ from resources.users import Users, UsersPassword
 from resources.pages import App, Account
 from resources.account import AccountPassword
 from resources.company import AllCompany, Company
-from resources.bpm import AllBpm
-from resources.docs import AllTypesDocs, AllCodesDocs, CodeDoc, AllDocs
+from resources.bpm import AllBpm, TreeBpm
+from resources.docs import (AllTypesDocs, AllCodesDocs, CodeDoc, AllDocs,
+ExportCodesDocs, ExportDocs)
+from resources.importing import Import
+from resources.batch import Batch
 
 
 api = Api(app)
@@ -23,10 +26,15 @@ api.add_resource(
 api.add_resource(AllCompany, f'/{prefix_api}/company')
 api.add_resource(Company, f'/{prefix_api}/company/<int:company_id>')
 api.add_resource(AllBpm, f'/{prefix_api}/bpm')
+api.add_resource(TreeBpm, f'/{prefix_api}/bpm/tree')
 api.add_resource(AllTypesDocs, f'/{prefix_api}/docs/types')
 api.add_resource(AllCodesDocs, f'/{prefix_api}/docs/code')
 api.add_resource(CodeDoc, f'/{prefix_api}/docs/code/<int:id_code_doc>')
+api.add_resource(ExportCodesDocs, f'/{prefix_api}/docs/code/export')
 api.add_resource(AllDocs, f'/{prefix_api}/docs/')
+api.add_resource(ExportDocs, f'/{prefix_api}/docs/export')
+api.add_resource(Import, f'/{prefix_api}/import/<string:table>')
+api.add_resource(Batch, f'/{prefix_api}/batch')
 
 #PAGES:
 api.add_resource(SessionNew, '/') #Страница авторизации и регистрации